@@ -1,7 +1,14 @@
 from django.contrib import admin
 from .models import Usuario
 from .models import Ativo
+from .models import Indexador
 
 
 admin.site.register(Usuario)
-admin.site.register(Ativo)
\ No newline at end of file
+admin.site.register(Ativo)
+
+
+@admin.register(Indexador)
+class IndexadorAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'taxa', 'atualizado_em')
+    readonly_fields = ('versao', 'atualizado_em')
@@ -1,6 +1,29 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+def garantir_indice_busca(sender, using, **kwargs):
+    from django.db import connections
+    from .busca import TABELA_ATIVO, criar_indice_busca
+
+    connection = connections[using]
+    if TABELA_ATIVO in connection.introspection.table_names():
+        criar_indice_busca(connection)
 
 
 class ApiRestConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api_rest"
+
+    def ready(self):
+        post_migrate.connect(garantir_indice_busca, sender=self)
+
+        from .filtro_emails import usuario_removido, usuario_salvo
+        usuario = self.get_model('Usuario')
+        post_save.connect(usuario_salvo, sender=usuario, dispatch_uid='filtro_emails_salvo')
+        post_delete.connect(usuario_removido, sender=usuario, dispatch_uid='filtro_emails_removido')
+
+        from .metricas import instalar_contador
+        connection_created.connect(instalar_contador, dispatch_uid='metricas_contador_consultas')
+        instalar_contador()
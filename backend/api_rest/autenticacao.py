@@ -0,0 +1,44 @@
+"""
+Autenticação JWT sem consulta ao banco por requisição.
+
+O ``JWTAuthentication`` do simplejwt carrega o ``Usuario`` do banco a cada
+chamada. Nos endpoints de leitura de ativos as views só precisam do id do
+usuário, que já vem no token (junto com ``email`` e ``nome``, ver
+``CustomTokenObtainPairSerializer``). ``JWTSemConsulta`` monta um
+``UsuarioToken`` (``SIMPLE_JWT['TOKEN_USER_CLASS']``) a partir das claims e
+só confere ``is_active`` pelo cache de ``Usuario.esta_ativo``, para que
+usuários desativados percam o acesso.
+"""
+
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BasicAuthentication, SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+from .models import Usuario
+
+
+class UsuarioToken(TokenUser):
+    """Usuário apoiado só nas claims do token; use ``pk`` nas consultas."""
+
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+
+    @cached_property
+    def nome(self):
+        return self.token.get('nome', '')
+
+
+class JWTSemConsulta(JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        usuario = super().get_user(validated_token)
+        if not Usuario.esta_ativo(usuario.pk):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return usuario
+
+
+# Para os endpoints somente leitura: mesma ordem de DEFAULT_AUTHENTICATION_CLASSES
+AUTENTICACAO_LEITURA = [JWTSemConsulta, SessionAuthentication, BasicAuthentication]
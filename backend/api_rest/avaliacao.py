@@ -0,0 +1,410 @@
+"""
+Motor de avaliação em lote dos ativos.
+
+Os métodos ``Ativo.rendimento_esperado`` e ``Ativo.calcular_resgate`` fazem uma
+potência fracionária ``Decimal ** Decimal`` por ativo, o que torna a listagem de
+carteiras grandes limitada por CPU. Aqui os mesmos cálculos são feitos de uma
+vez para todas as linhas com arrays NumPy, agrupando as linhas por
+``tipo_juros``.
+
+Os resultados coincidem com os métodos do modelo até o centavo. Quando o valor
+calculado em ponto flutuante fica próximo demais de meio centavo para decidir o
+arredondamento com segurança, a linha é recalculada pelo método do próprio
+modelo.
+"""
+
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from django.db.models import QuerySet
+
+from .models import Ativo, TAXA_INDEXADOR_PADRAO, cache_indexadores
+
+
+CAMPOS_AVALIACAO = (
+    'valor_unitario',
+    'quantidade',
+    'tipo_juros',
+    'taxa_fixa',
+    'indexador',
+    'percentual_sobre_indexador',
+    'data_emissao',
+    'data_vencimento',
+    'liquidez',
+    'possuiImposto',
+    'aliquotaImposto',
+)
+
+# Margem relativa (em centavos) abaixo da qual a distância até meio centavo é
+# considerada ambígua e a linha volta para o cálculo exato em Decimal.
+_TOLERANCIA_RELATIVA = 1e-11
+
+_CENTAVO = Decimal('0.01')
+
+PASSOS_SERIE = ('dia', 'semana', 'mes')
+
+
+def _normalizar_linhas(ativos):
+    """Aceita queryset, lista de instâncias ou lista de dicts (``values()``)."""
+    if isinstance(ativos, QuerySet):
+        return list(ativos.values(*CAMPOS_AVALIACAO))
+    return list(ativos)
+
+
+def _coluna(linhas, campo):
+    if linhas and isinstance(linhas[0], dict):
+        return [linha.get(campo) for linha in linhas]
+    return [getattr(linha, campo) for linha in linhas]
+
+
+def _como_instancia(linha):
+    if isinstance(linha, Ativo):
+        return linha
+    return Ativo(**{campo: linha.get(campo) for campo in CAMPOS_AVALIACAO})
+
+
+def _decimais(valores):
+    return np.array([np.nan if v is None else float(v) for v in valores], dtype=float)
+
+
+def _datas(valores):
+    return np.array([np.nan if d is None else d.toordinal() for d in valores], dtype=float)
+
+
+class _Lote:
+    """Colunas numéricas de um conjunto de ativos, prontas para o cálculo vetorizado."""
+
+    def __init__(self, linhas):
+        self.linhas = linhas
+        valor_unitario = _coluna(linhas, 'valor_unitario')
+        quantidade = _coluna(linhas, 'quantidade')
+
+        # valor investido exato (Decimal), usado para o rendimento do resgate
+        self.valor_decimal = [
+            None if v is None or q is None else v * q
+            for v, q in zip(valor_unitario, quantidade)
+        ]
+        self.valor = _decimais(self.valor_decimal)
+
+        self.tipo_juros = np.array(_coluna(linhas, 'tipo_juros'), dtype=object)
+        self.taxa_fixa = _decimais(_coluna(linhas, 'taxa_fixa'))
+        self.percentual = _decimais(_coluna(linhas, 'percentual_sobre_indexador'))
+
+        # uma única leitura do cache de taxas para o lote inteiro
+        taxas = {nome: float(taxa) for nome, taxa in cache_indexadores.taxas().items()}
+        padrao = float(TAXA_INDEXADOR_PADRAO)
+        indexadores = _coluna(linhas, 'indexador')
+        self.possui_indexador = np.array([bool(i) for i in indexadores], dtype=bool)
+        self.taxa_indexador = np.array([
+            taxas.get(i, padrao) if i else np.nan
+            for i in indexadores
+        ], dtype=float)
+
+        self.data_emissao = _datas(_coluna(linhas, 'data_emissao'))
+        self.data_vencimento = _datas(_coluna(linhas, 'data_vencimento'))
+        self.liquidez = np.array(_coluna(linhas, 'liquidez'), dtype=object)
+
+        possui_imposto = np.array([bool(p) for p in _coluna(linhas, 'possuiImposto')], dtype=bool)
+        aliquota = _decimais(_coluna(linhas, 'aliquotaImposto'))
+        self.tributado = possui_imposto & ~np.isnan(aliquota)
+        self.aliquota = np.where(self.tributado, aliquota, 0.0)
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def taxas(self):
+        """
+        Taxa anual efetiva de cada linha, calculada por grupo de ``tipo_juros``.
+
+        Returns:
+            tuple: (taxas, validas) — linhas com dados insuficientes ficam com
+            ``validas == False`` e taxa ``nan``.
+        """
+        taxas = np.full(len(self), np.nan)
+        validas = np.zeros(len(self), dtype=bool)
+
+        com_fixa = ~np.isnan(self.taxa_fixa)
+        com_indexador = self.possui_indexador & ~np.isnan(self.percentual)
+        variavel = (self.percentual / 100) * self.taxa_indexador
+
+        grupo = self.tipo_juros == 'prefixado'
+        mascara = grupo & com_fixa
+        taxas[mascara] = self.taxa_fixa[mascara] / 100
+        validas |= mascara
+
+        grupo = self.tipo_juros == 'posfixado'
+        mascara = grupo & com_indexador
+        taxas[mascara] = variavel[mascara]
+        validas |= mascara
+
+        grupo = self.tipo_juros == 'hibrido'
+        mascara = grupo & com_fixa & com_indexador
+        taxas[mascara] = self.taxa_fixa[mascara] / 100 + variavel[mascara]
+        validas |= mascara
+
+        return taxas, validas
+
+
+def _periodos_em_anos(dias):
+    """Replica ``Ativo.periodo_em_anos`` (``round(dias / 365.25, 6)``) para um array de dias."""
+    periodos = np.full(dias.shape, np.nan)
+    conhecidos = ~np.isnan(dias)
+    if conhecidos.any():
+        unicos, inverso = np.unique(dias[conhecidos], return_inverse=True)
+        arredondados = np.array([round(int(d) / 365.25, 6) for d in unicos], dtype=float)
+        periodos[conhecidos] = arredondados[inverso]
+    return periodos
+
+
+def _fatores(taxas, periodos):
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        return (1 + taxas) ** periodos
+
+
+def _ambiguos(valores):
+    """Linhas cujo arredondamento para centavos não é seguro em ponto flutuante."""
+    with np.errstate(invalid='ignore', over='ignore'):
+        centavos = valores * 100
+        distancia = np.abs(centavos - np.floor(centavos) - 0.5)
+        tolerancia = np.abs(centavos) * _TOLERANCIA_RELATIVA
+        return ~np.isfinite(centavos) | (distancia <= tolerancia)
+
+
+def _para_centavos(valor):
+    return Decimal(int(np.rint(valor * 100))).scaleb(-2)
+
+
+def _rendimentos_brutos(lote):
+    """Rendimento líquido em float e a máscara de linhas que devem ir para o cálculo exato."""
+    taxas, validas = lote.taxas()
+    dias = lote.data_vencimento - lote.data_emissao
+    periodos = _periodos_em_anos(dias)
+    validas &= ~np.isnan(periodos) & ~np.isnan(lote.valor)
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        bruto = lote.valor * _fatores(taxas, periodos)
+        liquido = bruto - bruto * (lote.aliquota / 100)
+
+    # base negativa com expoente fracionário não tem resultado real; o método
+    # do modelo decide (e levanta o mesmo erro que levantaria sozinho)
+    exatas = validas & ~np.isfinite(liquido)
+    return liquido, validas, exatas
+
+
+def rendimentos_esperados(ativos):
+    """
+    Equivalente em lote de ``Ativo.rendimento_esperado``, em float.
+
+    Args:
+        ativos: queryset, lista de ``Ativo`` ou lista de dicts com ``CAMPOS_AVALIACAO``.
+
+    Returns:
+        list: float ou None para cada ativo, na ordem recebida.
+    """
+    linhas = _normalizar_linhas(ativos)
+    if not linhas:
+        return []
+
+    lote = _Lote(linhas)
+    liquido, validas, exatas = _rendimentos_brutos(lote)
+
+    resultado = [float(v) if ok else None for v, ok in zip(liquido.tolist(), validas)]
+    for i in np.flatnonzero(exatas):
+        exato = _como_instancia(linhas[i]).rendimento_esperado()
+        resultado[i] = None if exato is None else float(exato)
+    return resultado
+
+
+def rendimentos_esperados_centavos(ativos):
+    """
+    Equivalente em lote de ``Ativo.rendimento_esperado`` arredondado para centavos.
+
+    Returns:
+        list: Decimal com duas casas ou None, igual a
+        ``ativo.rendimento_esperado().quantize(Decimal('0.01'))``. Linhas sem
+        resultado real (taxa abaixo de -100%) também ficam None.
+    """
+    linhas = _normalizar_linhas(ativos)
+    if not linhas:
+        return []
+
+    lote = _Lote(linhas)
+    liquido, validas, exatas = _rendimentos_brutos(lote)
+    exatas |= validas & _ambiguos(liquido)
+
+    resultado = []
+    for i, valor in enumerate(liquido.tolist()):
+        if not validas[i]:
+            resultado.append(None)
+        elif exatas[i]:
+            try:
+                exato = _como_instancia(linhas[i]).rendimento_esperado()
+            except InvalidOperation:
+                exato = None
+            resultado.append(None if exato is None else exato.quantize(_CENTAVO))
+        else:
+            resultado.append(_para_centavos(valor))
+    return resultado
+
+
+def _matriz_resgates(lote, datas):
+    """
+    Replica ``Ativo.calcular_resgate`` para cada par (ativo, data) de uma vez.
+
+    Returns:
+        tuple: matrizes ``len(lote) x len(datas)`` — (valores, dias, validas,
+        exatas), com ``exatas`` marcando as células que devem ir para o método
+        do modelo.
+    """
+    taxas, validas = lote.taxas()
+    validas &= (lote.liquidez == 'diaria') & ~np.isnan(lote.valor)
+
+    resgates = np.array([d.toordinal() for d in datas], dtype=float)[np.newaxis, :]
+    emissao = lote.data_emissao[:, np.newaxis]
+    with np.errstate(invalid='ignore'):
+        validas = validas[:, np.newaxis] & ~(resgates < emissao)
+
+    dias = np.minimum(resgates, lote.data_vencimento[:, np.newaxis]) - emissao
+    with np.errstate(invalid='ignore', over='ignore'):
+        valores = lote.valor[:, np.newaxis] * _fatores(taxas[:, np.newaxis], dias / 365.25)
+    exatas = validas & _ambiguos(valores)
+    return valores, dias, validas, exatas
+
+
+def calcular_resgates(ativos, data_resgate=None):
+    """
+    Equivalente em lote de ``Ativo.calcular_resgate``.
+
+    Args:
+        ativos: queryset, lista de ``Ativo`` ou lista de dicts com ``CAMPOS_AVALIACAO``.
+        data_resgate (date): Data de resgate (padrão: hoje)
+
+    Returns:
+        list: para cada ativo, o mesmo dict retornado por ``calcular_resgate``
+        ou None quando o resgate não é possível.
+    """
+    if not data_resgate:
+        data_resgate = date.today()
+    return [serie[0] for serie in serie_resgates(ativos, [data_resgate])]
+
+
+def _somar_meses(data, meses):
+    ano, mes = divmod(data.month - 1 + meses, 12)
+    ano, mes = data.year + ano, mes + 1
+    return data.replace(year=ano, month=mes, day=min(data.day, calendar.monthrange(ano, mes)[1]))
+
+
+def datas_da_serie(inicio, fim, passo, limite=None):
+    """
+    Datas de ``inicio`` a ``fim`` (inclusive) a cada ``passo`` ('dia', 'semana'
+    ou 'mes'). Meses são contados a partir de ``inicio``, com o dia limitado ao
+    fim do mês (31/01 -> 29/02 -> 31/03). ``fim`` sempre é o último ponto.
+
+    Raises:
+        ValueError: se a série passar de ``limite`` datas.
+    """
+    datas = []
+    k = 0
+    while True:
+        if limite is not None and len(datas) >= limite:
+            raise ValueError(f'A série pode ter no máximo {limite} datas.')
+        if passo == 'dia':
+            data = inicio + timedelta(days=k)
+        elif passo == 'semana':
+            data = inicio + timedelta(weeks=k)
+        else:
+            data = _somar_meses(inicio, k)
+        if data >= fim:
+            break
+        datas.append(data)
+        k += 1
+    datas.append(fim)
+    return datas
+
+
+def serie_resgates(ativos, datas):
+    """
+    ``Ativo.calcular_resgate`` de cada ativo em cada uma das ``datas``, numa
+    única passada vetorizada sobre a matriz ativos x datas.
+
+    Returns:
+        list: para cada ativo, uma lista com o dict de ``calcular_resgate`` (ou
+        None) para cada data, na ordem recebida.
+    """
+    linhas = _normalizar_linhas(ativos)
+    if not linhas or not datas:
+        return [[] for _ in linhas]
+
+    lote = _Lote(linhas)
+    valores, dias, validas, exatas = _matriz_resgates(lote, datas)
+
+    resultado = []
+    for i, (valores_ativo, dias_ativo) in enumerate(zip(valores.tolist(), dias.tolist())):
+        serie = []
+        for j, valor in enumerate(valores_ativo):
+            if not validas[i, j]:
+                serie.append(None)
+            elif exatas[i, j]:
+                serie.append(_como_instancia(linhas[i]).calcular_resgate(datas[j]))
+            else:
+                valor_atual = _para_centavos(valor)
+                serie.append({
+                    'valor_acumulado': valor_atual,
+                    'dias_corridos': int(dias_ativo[j]),
+                    'rendimento': (valor_atual - lote.valor_decimal[i]).quantize(_CENTAVO),
+                })
+        resultado.append(serie)
+    return resultado
+
+
+def serie_resgates_carteira(ativos, datas, tamanho_bloco=1000):
+    """
+    Soma de ``Ativo.calcular_resgate`` sobre todos os ``ativos`` em cada data.
+
+    As somas são feitas em centavos inteiros, então cada total é exatamente a
+    soma dos resgates individuais. Os ativos são processados em blocos de
+    ``tamanho_bloco`` linhas para limitar o tamanho da matriz em memória.
+
+    Returns:
+        list: um dict por data com 'data', 'ativos' (quantos podiam ser
+        resgatados), 'valor_investido', 'valor_acumulado' e 'rendimento'.
+    """
+    linhas = _normalizar_linhas(ativos)
+    quantidade = np.zeros(len(datas), dtype=np.int64)
+    investido = np.zeros(len(datas), dtype=np.int64)
+    acumulado = np.zeros(len(datas), dtype=np.int64)
+
+    for inicio in range(0, len(linhas), tamanho_bloco):
+        bloco = linhas[inicio:inicio + tamanho_bloco]
+        lote = _Lote(bloco)
+        valores, _, validas, exatas = _matriz_resgates(lote, datas)
+
+        centavos = np.zeros(valores.shape, dtype=np.int64)
+        aproximadas = validas & ~exatas
+        centavos[aproximadas] = np.rint(valores[aproximadas] * 100).astype(np.int64)
+        for i, j in zip(*np.nonzero(exatas)):
+            resgate = _como_instancia(bloco[i]).calcular_resgate(datas[j])
+            if resgate is None:
+                validas[i, j] = False
+            else:
+                centavos[i, j] = int(resgate['valor_acumulado'] * 100)
+
+        investido_ativo = np.array([
+            0 if v is None else int(v * 100) for v in lote.valor_decimal
+        ], dtype=np.int64)
+        quantidade += validas.sum(axis=0)
+        investido += (validas * investido_ativo[:, np.newaxis]).sum(axis=0)
+        acumulado += centavos.sum(axis=0)
+
+    return [
+        {
+            'data': data,
+            'ativos': int(quantidade[j]),
+            'valor_investido': Decimal(int(investido[j])).scaleb(-2),
+            'valor_acumulado': Decimal(int(acumulado[j])).scaleb(-2),
+            'rendimento': Decimal(int(acumulado[j] - investido[j])).scaleb(-2),
+        }
+        for j, data in enumerate(datas)
+    ]
@@ -0,0 +1,129 @@
+"""
+Busca de ativos por trecho do nome usando índice em vez de varredura.
+
+- PostgreSQL (ambiente ``RENDER``): índice GIN de trigramas (``pg_trgm``) sobre
+  ``UPPER(nome)``, a mesma expressão que o ``nome__icontains`` do Django gera,
+  com ordenação por ``similarity()``.
+- SQLite (ambiente local e testes): tabela FTS5 com tokenizador ``trigram``
+  espelhando ``api_rest_ativo.nome``, mantida por triggers.
+
+Os dois lados devolvem o mesmo conjunto de ativos que ``nome__icontains`` e
+ordenam pela similaridade entre o termo e o nome. Termos com menos de três
+caracteres não formam trigramas e continuam usando ``icontains``.
+"""
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+
+
+TABELA_ATIVO = 'api_rest_ativo'
+TABELA_BUSCA = 'api_rest_ativo_busca'
+INDICE_TRIGRAMA = 'ativo_nome_trgm_idx'
+TAMANHO_MINIMO_TRIGRAMA = 3
+
+_TRIGGERS_SQLITE = {
+    f'{TABELA_BUSCA}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {TABELA_BUSCA}_ai AFTER INSERT ON {TABELA_ATIVO} BEGIN
+            INSERT INTO {TABELA_BUSCA}(rowid, nome) VALUES (new.id, new.nome);
+        END
+    """,
+    f'{TABELA_BUSCA}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {TABELA_BUSCA}_ad AFTER DELETE ON {TABELA_ATIVO} BEGIN
+            INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}, rowid, nome) VALUES ('delete', old.id, old.nome);
+        END
+    """,
+    f'{TABELA_BUSCA}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {TABELA_BUSCA}_au AFTER UPDATE OF nome ON {TABELA_ATIVO} BEGIN
+            INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}, rowid, nome) VALUES ('delete', old.id, old.nome);
+            INSERT INTO {TABELA_BUSCA}(rowid, nome) VALUES (new.id, new.nome);
+        END
+    """,
+}
+
+
+def criar_indice_busca(connection):
+    """
+    Cria (se faltar) a estrutura de busca do banco da conexão.
+
+    No SQLite, recriar a tabela de ativos em uma migração derruba os triggers;
+    por isso esta função também roda no ``post_migrate`` e reconstrói a tabela
+    FTS sempre que precisou recriar algum trigger.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {INDICE_TRIGRAMA} '
+                f'ON {TABELA_ATIVO} USING gin (UPPER(nome) gin_trgm_ops)'
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} USING fts5("
+                f"nome, content='{TABELA_ATIVO}', content_rowid='id', tokenize='trigram')"
+            )
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+                [TABELA_ATIVO],
+            )
+            existentes = {linha[0] for linha in cursor.fetchall()}
+            faltando = [nome for nome in _TRIGGERS_SQLITE if nome not in existentes]
+            for nome in faltando:
+                cursor.execute(_TRIGGERS_SQLITE[nome])
+            if faltando:
+                cursor.execute(f"INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}) VALUES ('rebuild')")
+
+
+def remover_indice_busca(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {INDICE_TRIGRAMA}')
+        elif connection.vendor == 'sqlite':
+            for nome in _TRIGGERS_SQLITE:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+            cursor.execute(f'DROP TABLE IF EXISTS {TABELA_BUSCA}')
+
+
+def _frase_fts(termo):
+    # entre aspas o termo vira uma frase: casa como substring, sem operadores FTS
+    return '"' + termo.replace('"', '""') + '"'
+
+
+def buscar_por_nome(ativos, termo, ranquear=True):
+    """
+    Filtra ``ativos`` pelos nomes que contêm ``termo`` (sem diferenciar maiúsculas).
+
+    Args:
+        ativos: queryset de ``Ativo``.
+        termo (str): trecho do nome.
+        ranquear (bool): ordena do mais para o menos similar (desempate por id).
+
+    Returns:
+        QuerySet
+    """
+    vendor = connections[ativos.db].vendor
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        # icontains gera UPPER(nome) LIKE UPPER(...), coberto pelo índice GIN
+        ativos = ativos.filter(nome__icontains=termo)
+        if ranquear:
+            ativos = ativos.annotate(
+                similaridade=TrigramSimilarity('nome', termo)
+            ).order_by('-similaridade', 'id')
+        return ativos
+
+    if vendor == 'sqlite' and len(termo) >= TAMANHO_MINIMO_TRIGRAMA:
+        ativos = ativos.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {TABELA_BUSCA} WHERE {TABELA_BUSCA} MATCH %s',
+            [_frase_fts(termo)],
+        ))
+    else:
+        ativos = ativos.filter(nome__icontains=termo)
+
+    if ranquear:
+        # todo resultado contém o termo inteiro, então a similaridade de
+        # trigramas cai conforme o nome cresce: nomes mais curtos primeiro
+        ativos = ativos.order_by(Length('nome'), 'id')
+    return ativos
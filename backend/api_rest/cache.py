@@ -0,0 +1,66 @@
+"""
+Backend de cache em arquivos com descarte LRU.
+
+O ``FileBasedCache`` do Django descarta entradas ao acaso quando chega a
+``MAX_ENTRIES`` e lista o diretório inteiro a cada ``set``. Esta variante marca
+o último acesso no mtime do arquivo (a cada leitura bem-sucedida) e, ao
+descartar, remove primeiro os arquivos usados há mais tempo. Em ``set_many`` o
+descarte é verificado uma única vez, antes de gravar o lote.
+
+O ``LocMemCache`` já descarta em ordem LRU e pode ser usado como está.
+"""
+
+import os
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+_AUSENTE = object()
+
+
+class CacheArquivoLRU(FileBasedCache):
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._em_lote = False
+
+    def get(self, key, default=None, version=None):
+        valor = super().get(key, _AUSENTE, version)
+        if valor is _AUSENTE:
+            return default
+        try:
+            os.utime(self._key_to_file(key, version))
+        except FileNotFoundError:
+            pass
+        return valor
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        self._cull(extra=len(data))
+        self._em_lote = True
+        try:
+            return super().set_many(data, timeout, version)
+        finally:
+            self._em_lote = False
+
+    def _cull(self, extra=1):
+        if self._em_lote:
+            return
+        arquivos = self._list_cache_files()
+        total = len(arquivos) + extra - 1
+        if total < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            return self.clear()
+
+        acessos = []
+        for nome in arquivos:
+            try:
+                acessos.append((os.stat(nome).st_mtime_ns, nome))
+            except FileNotFoundError:
+                pass
+        acessos.sort()
+        # remove a fração de sempre e, num lote grande, o que faltar para ele caber
+        quantidade = max(int(total / self._cull_frequency), total - self._max_entries + 1)
+        for _, nome in acessos[:quantidade]:
+            self._delete(nome)
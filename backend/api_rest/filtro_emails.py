@@ -0,0 +1,153 @@
+"""
+Filtro de Bloom dos emails cadastrados, na frente de ``checar_email``.
+
+O formulário de cadastro consulta ``checar_email`` a cada tecla digitada e
+quase sempre o email ainda não existe. O filtro responde "com certeza não
+existe" sem ir ao banco; só os prováveis positivos (cadastrados ou falsos
+positivos, ~1%) são confirmados com a consulta de sempre.
+
+O filtro é montado por processo no primeiro uso e mantido assim:
+
+- ``post_save`` / ``post_delete`` de ``Usuario`` (ligados em ``apps.py``)
+  acrescentam o email na hora. Um filtro de Bloom não remove itens, então as
+  exclusões só são contadas; quando passam de ``FRAÇÃO_REMOVIDOS`` o filtro é
+  remontado para não acumular falsos positivos.
+- Usuários criados por outros processos (ou por ``bulk_create``, que não
+  dispara sinais) entram por uma consulta incremental ``id > último id``, feita
+  no máximo a cada ``FILTRO_EMAILS_SEGUNDOS``.
+
+Entre processos a resposta pode atrasar: um email cadastrado por outro worker
+aparece como inexistente por até ``FILTRO_EMAILS_SEGUNDOS`` (5 s por padrão),
+até a próxima consulta incremental. Serve para o aviso do formulário; a
+unicidade de verdade continua garantida pelo banco no cadastro.
+
+A consulta incremental supõe ids crescentes; emails alterados por
+``QuerySet.update`` em outro processo só entram quando o filtro for remontado.
+
+A leitura sem lock usa só uma cópia local de ``_filtro``, e a remontagem troca
+o filtro pronto de uma vez: quem lê nunca vê o filtro pela metade nem ``None``.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+
+
+CAPACIDADE_MINIMA = 1024
+TAXA_FALSOS_POSITIVOS = 0.01
+FRAÇÃO_REMOVIDOS = 0.1
+
+
+def normalizar_email(email):
+    """Mesma normalização da consulta de ``checar_email``."""
+    return email.lower()
+
+
+class FiltroBloom:
+    """Filtro de Bloom em ``bytearray`` com hash duplo sobre blake2b."""
+
+    def __init__(self, capacidade, taxa_falsos_positivos=TAXA_FALSOS_POSITIVOS):
+        self.capacidade = max(capacidade, 1)
+        bits = -self.capacidade * math.log(taxa_falsos_positivos) / math.log(2) ** 2
+        self.total_bits = max(int(math.ceil(bits)), 8)
+        self.num_hashes = max(1, round(self.total_bits / self.capacidade * math.log(2)))
+        self.bits = bytearray((self.total_bits + 7) // 8)
+        self.itens = 0
+
+    def _posicoes(self, valor):
+        resumo = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(resumo[:8], 'little')
+        h2 = int.from_bytes(resumo[8:], 'little') | 1
+        return ((h1 + i * h2) % self.total_bits for i in range(self.num_hashes))
+
+    def add(self, valor):
+        for posicao in self._posicoes(valor):
+            self.bits[posicao >> 3] |= 1 << (posicao & 7)
+        self.itens += 1
+
+    def __contains__(self, valor):
+        return all(self.bits[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(valor))
+
+
+class FiltroEmails:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._filtro = None
+        self._ultimo_id = 0
+        self._removidos = 0
+        self._verificado_em = None
+
+    def _intervalo(self):
+        return getattr(settings, 'FILTRO_EMAILS_SEGUNDOS', 5)
+
+    def _montar(self):
+        from .models import Usuario
+
+        total = Usuario.objects.count()
+        filtro = FiltroBloom(max(CAPACIDADE_MINIMA, 2 * total))
+        ultimo_id = 0
+        for pk, email in Usuario.objects.order_by().values_list('pk', 'email').iterator(chunk_size=5000):
+            filtro.add(normalizar_email(email))
+            ultimo_id = max(ultimo_id, pk)
+        self._filtro, self._ultimo_id, self._removidos = filtro, ultimo_id, 0
+
+    def _acrescentar_novos(self):
+        from .models import Usuario
+
+        novos = Usuario.objects.filter(pk__gt=self._ultimo_id).values_list('pk', 'email')
+        for pk, email in novos.iterator(chunk_size=5000):
+            self._adicionar(email)
+            self._ultimo_id = max(self._ultimo_id, pk)
+
+    def _adicionar(self, email):
+        if self._filtro.itens >= self._filtro.capacidade:
+            # cheio: remonta com o dobro da capacidade (o próprio email entra na leitura);
+            # até a troca as leituras continuam no filtro antigo
+            self._montar()
+        else:
+            self._filtro.add(normalizar_email(email))
+
+    def _atualizar(self):
+        agora = time.monotonic()
+        filtro, verificado_em = self._filtro, self._verificado_em
+        if filtro is not None and verificado_em is not None and agora - verificado_em < self._intervalo():
+            return filtro
+        with self._lock:
+            if self._filtro is None or self._removidos > FRAÇÃO_REMOVIDOS * self._filtro.itens:
+                self._montar()
+            else:
+                self._acrescentar_novos()
+            self._verificado_em = agora
+            return self._filtro
+
+    def pode_existir(self, email):
+        """False quando o email com certeza não está cadastrado."""
+        return normalizar_email(email) in self._atualizar()
+
+    def adicionar(self, email):
+        with self._lock:
+            if self._filtro is None:
+                return  # montado no primeiro uso, já com este email
+            self._adicionar(email)
+
+    def registrar_remocao(self):
+        with self._lock:
+            self._removidos += 1
+
+    def invalidar(self):
+        with self._lock:
+            self._filtro = None
+
+
+filtro_emails = FiltroEmails()
+
+
+def usuario_salvo(sender, instance, **kwargs):
+    filtro_emails.adicionar(instance.email)
+
+
+def usuario_removido(sender, instance, **kwargs):
+    filtro_emails.registrar_remocao()
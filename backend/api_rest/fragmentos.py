@@ -0,0 +1,123 @@
+"""
+Cache de fragmentos JSON por ativo.
+
+Cada ativo serializado (o item de ``AtivoSerializer`` já renderizado em JSON)
+fica no cache ``fragmentos`` sob a chave ``(formato, id, atualizado_em, versão
+das taxas dos indexadores)``. Qualquer gravação no ativo muda ``atualizado_em`` e
+qualquer taxa nova muda a versão, então uma chave nunca fica desatualizada: as
+entradas antigas só deixam de ser lidas e saem do cache por LRU (ver
+``api_rest.cache``).
+
+O formato junta ``VERSAO_FRAGMENTOS`` a um hash das colunas de ``AtivoLeitura``.
+Com ``FRAGMENTOS_CACHE_DIR`` o cache sobrevive a deploys: um campo novo ou
+renomeado muda o hash sozinho, e qualquer outra mudança na saída do serializer
+(formato de um valor, por exemplo) exige incrementar ``VERSAO_FRAGMENTOS``.
+
+As listas são montadas concatenando os fragmentos; só os ativos ausentes do
+cache passam por ``AtivoLeitura`` (e pelo cálculo do rendimento esperado).
+"""
+
+import json
+import zlib
+
+from django.core.cache import caches
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .models import cache_indexadores
+from .serializers import ativo_leitura
+
+
+ALIAS_CACHE_FRAGMENTOS = 'fragmentos'
+
+# Incrementar sempre que a representação JSON de um ativo mudar
+VERSAO_FRAGMENTOS = 1
+
+
+def formato_fragmentos():
+    """Identifica a representação dos fragmentos: versão manual e hash das colunas serializadas."""
+    colunas = ','.join(ativo_leitura().colunas)
+    return f'{VERSAO_FRAGMENTOS}.{zlib.crc32(colunas.encode()):08x}'
+
+
+def _chave(linha, versao, formato):
+    return f"ativo:{formato}:{linha['id']}:{linha['atualizado_em'].timestamp():.6f}:{versao}"
+
+
+def colunas_fragmentos():
+    """Colunas de ``values()`` exigidas por ``fragmentos_ativos``."""
+    return [*ativo_leitura().colunas, 'atualizado_em']
+
+
+def fragmentos_ativos(linhas):
+    """
+    Args:
+        linhas: dicts de ``values(*colunas_fragmentos())``.
+
+    Returns:
+        list: o JSON (bytes) de cada linha, na mesma ordem, lido do cache ou
+        serializado e gravado nele.
+    """
+    linhas = list(linhas)
+    versao = cache_indexadores.versao()
+    cache = caches[ALIAS_CACHE_FRAGMENTOS]
+
+    formato = formato_fragmentos()
+    chaves = [_chave(linha, versao, formato) for linha in linhas]
+    fragmentos = cache.get_many(chaves)
+    faltantes = [(chave, linha) for chave, linha in zip(chaves, linhas) if chave not in fragmentos]
+    if faltantes:
+        renderizador = JSONRenderer()
+        itens = ativo_leitura().serializar(linha for _, linha in faltantes)
+        novos = {chave: renderizador.render(item) for (chave, _), item in zip(faltantes, itens)}
+        cache.set_many(novos)
+        fragmentos.update(novos)
+    return [fragmentos[chave] for chave in chaves]
+
+
+def _separadores():
+    return (b',', b':') if api_settings.COMPACT_JSON else (b', ', b': ')
+
+
+def lista_json(fragmentos):
+    """Junta os fragmentos num array JSON igual ao que o JSONRenderer geraria."""
+    return b'[' + _separadores()[0].join(fragmentos) + b']'
+
+
+class RespostaFragmentos(Response):
+    """
+    Response do DRF com o corpo JSON já pronto: não passa pelo renderizador.
+    ``data`` é decodificado do corpo só se alguém pedir (testes, middlewares).
+    """
+
+    def __init__(self, corpo, **kwargs):
+        super().__init__(None, **kwargs)
+        self._corpo = corpo
+
+    @property
+    def data(self):
+        if self._dados is None and self._corpo is not None:
+            self._dados = json.loads(self._corpo)
+        return self._dados
+
+    @data.setter
+    def data(self, valor):
+        self._dados = valor
+
+    @property
+    def rendered_content(self):
+        self['Content-Type'] = self.content_type or JSONRenderer.media_type
+        return self._corpo
+
+
+def resposta_fragmentos(fragmentos, envelope=None):
+    """
+    Resposta JSON com a lista de fragmentos; com ``envelope`` (dict não vazio,
+    ex.: next/previous da paginação) a lista vai na chave ``results``.
+    """
+    corpo = lista_json(fragmentos)
+    if envelope:
+        virgula, dois_pontos = _separadores()
+        corpo = JSONRenderer().render(envelope)[:-1] + virgula + b'"results"' + dois_pontos + corpo + b'}'
+    return RespostaFragmentos(corpo)
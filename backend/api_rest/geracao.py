@@ -0,0 +1,243 @@
+"""
+Geração de carteiras sintéticas para testes de escala.
+
+Os ativos seguem um catálogo de produtos do mercado brasileiro (CDB, LCI/LCA,
+Tesouro, debêntures, CRI/CRA), cada um com seus emissores, formas de
+remuneração, prazos, liquidez e tributação: LCI, LCA, CRI e CRA são isentos,
+os demais pagam IR pela tabela regressiva conforme o prazo. Todo ativo gerado
+passa em ``Ativo.clean``.
+
+A sequência é determinística: a mesma semente, quantidade de usuários e
+ativos por usuário geram exatamente as mesmas linhas.
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate, islice, repeat
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .models import Ativo, Usuario
+
+
+TAMANHO_LOTE_GERACAO = 5000
+
+# vencimentos e emissões são sorteados em torno desta data, não de hoje, para a
+# geração não depender do dia em que roda
+DATA_REFERENCIA = date(2025, 6, 30)
+ANOS_DE_EMISSAO = 6
+
+BANCOS = ['Itaú', 'Bradesco', 'Banco do Brasil', 'Caixa', 'Santander', 'BTG Pactual', 'Banco Inter', 'Banco Master',
+          'Banco Pan', 'Banco BMG', 'Banco Daycoval', 'XP']
+EMPRESAS = ['Petrobras', 'Vale', 'Eletrobras', 'Rumo', 'Localiza', 'Sabesp', 'Copel', 'CCR', 'Raízen', 'Equatorial']
+SECURITIZADORAS = ['Opea', 'True Securitizadora', 'Virgo', 'Ecoagro', 'Vert']
+
+# (mínimo, máximo) em centésimos de ponto percentual
+FAIXAS_TAXA = {
+    'CDB': (950, 1450),
+    'LCI': (850, 1200),
+    'Tesouro Prefixado': (1000, 1350),
+    'Debênture': (1100, 1500),
+    'IPCA+ Tesouro': (500, 750),
+    'IPCA+ bancário': (450, 800),
+    'IPCA+ crédito': (550, 900),
+}
+
+# produto: peso, tipo, emissores, negociação, remunerações [(peso, tipo_juros, indexador, faixa_percentual, faixa_taxa)],
+# prazo em dias (mínimo, máximo), chance de liquidez diária e isenção de IR
+CATALOGO = {
+    'CDB': {
+        'peso': 30, 'tipo': 'renda_fixa_bancaria', 'emissores': BANCOS, 'negociacao': 'balcao',
+        'remuneracoes': [
+            (60, 'posfixado', 'CDI', (9000, 13000), None),
+            (25, 'prefixado', None, None, 'CDB'),
+            (15, 'hibrido', 'IPCA', (10000, 10000), 'IPCA+ bancário'),
+        ],
+        'prazo': (180, 1825), 'diaria': 0.6, 'isento': False,
+    },
+    'LCI': {
+        'peso': 12, 'tipo': 'renda_fixa_bancaria', 'emissores': BANCOS, 'negociacao': 'balcao',
+        'remuneracoes': [(70, 'posfixado', 'CDI', (8500, 10000), None), (30, 'prefixado', None, None, 'LCI')],
+        'prazo': (90, 1095), 'diaria': 0.1, 'isento': True,
+    },
+    'LCA': {
+        'peso': 10, 'tipo': 'renda_fixa_bancaria', 'emissores': BANCOS, 'negociacao': 'balcao',
+        'remuneracoes': [(70, 'posfixado', 'CDI', (8500, 10000), None), (30, 'prefixado', None, None, 'LCI')],
+        'prazo': (90, 1095), 'diaria': 0.1, 'isento': True,
+    },
+    'Tesouro Selic': {
+        'peso': 12, 'tipo': 'titulos_publicos', 'emissores': ['Tesouro Nacional'], 'negociacao': 'balcao',
+        'remuneracoes': [(100, 'posfixado', 'SELIC', (10000, 10000), None)],
+        'prazo': (730, 2190), 'diaria': 1.0, 'isento': False,
+    },
+    'Tesouro Prefixado': {
+        'peso': 8, 'tipo': 'titulos_publicos', 'emissores': ['Tesouro Nacional'], 'negociacao': 'balcao',
+        'remuneracoes': [(100, 'prefixado', None, None, 'Tesouro Prefixado')],
+        'prazo': (730, 3650), 'diaria': 1.0, 'isento': False,
+    },
+    'Tesouro IPCA+': {
+        'peso': 10, 'tipo': 'titulos_publicos', 'emissores': ['Tesouro Nacional'], 'negociacao': 'balcao',
+        'remuneracoes': [(100, 'hibrido', 'IPCA', (10000, 10000), 'IPCA+ Tesouro')],
+        'prazo': (1095, 10950), 'diaria': 1.0, 'isento': False,
+    },
+    'Debênture': {
+        'peso': 8, 'tipo': 'debentures_creditos', 'emissores': EMPRESAS, 'negociacao': 'bolsa',
+        'remuneracoes': [
+            (50, 'hibrido', 'IPCA', (10000, 10000), 'IPCA+ crédito'),
+            (30, 'posfixado', 'CDI', (10000, 12000), None),
+            (20, 'prefixado', None, None, 'Debênture'),
+        ],
+        'prazo': (1095, 5475), 'diaria': 0.0, 'isento': False,
+    },
+    'CRI': {
+        'peso': 5, 'tipo': 'debentures_creditos', 'emissores': SECURITIZADORAS, 'negociacao': 'balcao',
+        'remuneracoes': [
+            (60, 'hibrido', 'IPCA', (10000, 10000), 'IPCA+ crédito'),
+            (25, 'posfixado', 'CDI', (9000, 10500), None),
+            (15, 'hibrido', 'IGPM', (10000, 10000), 'IPCA+ crédito'),
+        ],
+        'prazo': (1095, 5475), 'diaria': 0.0, 'isento': True,
+    },
+    'CRA': {
+        'peso': 5, 'tipo': 'debentures_creditos', 'emissores': SECURITIZADORAS, 'negociacao': 'balcao',
+        'remuneracoes': [
+            (60, 'hibrido', 'IPCA', (10000, 10000), 'IPCA+ crédito'),
+            (40, 'posfixado', 'CDI', (9000, 10500), None),
+        ],
+        'prazo': (1095, 3650), 'diaria': 0.0, 'isento': True,
+    },
+}
+
+# pesos acumulados calculados uma vez: rng.choices não precisa refazê-los a cada ativo
+_PRODUTOS = list(CATALOGO)
+_PESOS_PRODUTOS = list(accumulate(CATALOGO[produto]['peso'] for produto in _PRODUTOS))
+_PESOS_REMUNERACOES = {
+    produto: list(accumulate(remuneracao[0] for remuneracao in spec['remuneracoes']))
+    for produto, spec in CATALOGO.items()
+}
+
+
+def aliquota_regressiva(dias):
+    """Alíquota de IR da tabela regressiva da renda fixa para o prazo em dias."""
+    if dias <= 180:
+        return Decimal('22.50')
+    if dias <= 360:
+        return Decimal('20.00')
+    if dias <= 720:
+        return Decimal('17.50')
+    return Decimal('15.00')
+
+
+def _centesimos(rng, faixa):
+    return Decimal(rng.randint(*faixa)).scaleb(-2)
+
+
+def gerar_ativo(rng, usuario_id):
+    """Ativo sintético (não gravado) sorteado do catálogo."""
+    produto = rng.choices(_PRODUTOS, cum_weights=_PESOS_PRODUTOS)[0]
+    spec = CATALOGO[produto]
+    _, tipo_juros, indexador, faixa_percentual, faixa_taxa = rng.choices(
+        spec['remuneracoes'], cum_weights=_PESOS_REMUNERACOES[produto]
+    )[0]
+
+    emissao = DATA_REFERENCIA - timedelta(days=rng.randrange(ANOS_DE_EMISSAO * 365))
+    prazo = rng.randint(*spec['prazo'])
+    vencimento = emissao + timedelta(days=prazo)
+    emissor = rng.choice(spec['emissores'])
+
+    # valor aplicado log-normal (mediana de R$ 10 mil) repartido em unidades do produto
+    total = min(max(rng.lognormvariate(9.2, 1.1), 100), 5_000_000)
+    if spec['tipo'] == 'titulos_publicos':
+        valor_unitario = Decimal(rng.randint(9_000, 1_600_000)).scaleb(-2)
+    else:
+        valor_unitario = Decimal(rng.choice([100, 500, 1000]))
+    quantidade = max(1, round(total / float(valor_unitario)))
+
+    isento = spec['isento']
+    return Ativo(
+        usuario_id=usuario_id,
+        nome=f'{produto} {emissor} {vencimento.year}' if emissor != 'Tesouro Nacional' else f'{produto} {vencimento.year}',
+        tipo=spec['tipo'],
+        emissor=emissor,
+        tipo_negociacao=spec['negociacao'],
+        valor_unitario=valor_unitario,
+        quantidade=quantidade,
+        tipo_juros=tipo_juros,
+        taxa_fixa=_centesimos(rng, FAIXAS_TAXA[faixa_taxa]) if faixa_taxa else None,
+        indexador=indexador,
+        percentual_sobre_indexador=_centesimos(rng, faixa_percentual) if faixa_percentual else None,
+        data_emissao=emissao,
+        data_vencimento=vencimento,
+        liquidez='diaria' if rng.random() < spec['diaria'] else 'apos_vencimento',
+        possuiImposto=not isento,
+        aliquotaImposto=None if isento else aliquota_regressiva(prazo),
+    )
+
+
+def _criar_usuarios(indices, prefixo, senha_hash):
+    novos = Usuario.objects.bulk_create([
+        Usuario(email=f'{prefixo}-{indice}@exemplo.com', nome=f'Usuário Sintético {indice}', password=senha_hash)
+        for indice in indices
+    ])
+    if novos and novos[0].pk is None:
+        # bancos sem RETURNING no bulk_create
+        novos = list(Usuario.objects.filter(email__in=[usuario.email for usuario in novos]).order_by('pk'))
+    return novos
+
+
+def gerar_carteiras(
+    usuarios, ativos_por_usuario, seed=42, prefixo='sintetico', senha=None,
+    tamanho_lote=TAMANHO_LOTE_GERACAO, ao_gravar_lote=None,
+):
+    """
+    Cria ``usuarios`` usuários com ``ativos_por_usuario`` ativos cada.
+
+    Os usuários (``{prefixo}-{n}@exemplo.com``) são criados em ``bulk_create``
+    de até ``tamanho_lote``, à medida que os ativos precisam deles; todos
+    compartilham a mesma senha, hasheada uma vez (sem senha, ficam com senha
+    inutilizável). Os ativos formam uma sequência única, gravada em
+    ``bulk_create`` de exatamente ``tamanho_lote`` linhas (o último pode ser
+    menor), cada lote numa transação: uma carteira maior que o lote é dividida
+    entre lotes e a memória fica limitada ao lote.
+
+    ``ao_gravar_lote(usuarios_completos, ativos_criados)`` é chamado após cada
+    lote, com os usuários cujas carteiras já foram gravadas por inteiro.
+
+    Returns:
+        tuple: (usuarios_criados, ativos_criados)
+    """
+    rng = random.Random(seed)
+    senha_hash = make_password(senha)
+    tamanho_lote = max(tamanho_lote, 1)
+    usuarios_criados = 0
+
+    def donos():
+        """O id do dono de cada ativo, na ordem de geração, criando os usuários por lote."""
+        nonlocal usuarios_criados
+        for inicio in range(0, usuarios, tamanho_lote):
+            novos = _criar_usuarios(range(inicio, min(usuarios, inicio + tamanho_lote)), prefixo, senha_hash)
+            usuarios_criados += len(novos)
+            for usuario in novos:
+                yield from repeat(usuario.pk, ativos_por_usuario)
+
+    ativos_criados = 0
+    sequencia = donos()
+    while True:
+        ativos = [gerar_ativo(rng, usuario_id) for usuario_id in islice(sequencia, tamanho_lote)]
+        if not ativos:
+            break
+        for ativo in ativos:
+            ativo.clean()
+        with transaction.atomic():
+            Ativo.objects.bulk_create(ativos)
+
+        ativos_criados += len(ativos)
+        if ao_gravar_lote is not None:
+            ao_gravar_lote(ativos_criados // ativos_por_usuario, ativos_criados)
+
+    # sem ativos a sequência só cria os usuários
+    if not ativos_criados and ao_gravar_lote is not None:
+        ao_gravar_lote(usuarios_criados, 0)
+    return usuarios_criados, ativos_criados
@@ -0,0 +1,91 @@
+"""
+Importação de ativos a partir de CSV, em blocos e com memória limitada.
+
+O arquivo é lido como gerador (uma linha por vez), agrupado em blocos e cada
+bloco é validado com as mesmas regras de ``criar_ativo`` (``AtivoSerializer``
+e ``Ativo.clean``) e gravado com um único ``bulk_create``. Linhas inválidas
+não interrompem a importação: são entregues ao chamador para compor o
+relatório de erros, e cada bloco é gravado na sua própria transação.
+
+O formato de entrada é o mesmo da exportação (``exportacao.linhas_csv``):
+colunas somente leitura, como ``id`` e ``rendimento_esperado``, são ignoradas.
+"""
+
+import csv
+from itertools import islice
+
+from django.db import transaction
+
+from .models import Ativo
+from .serializers import validar_novos_ativos
+
+
+TAMANHO_BLOCO_IMPORTACAO = 1000
+
+
+def linhas_csv_upload(arquivo):
+    """Decodifica um ``UploadedFile`` linha a linha, sem carregá-lo inteiro."""
+    for linha in arquivo:
+        yield linha.decode('utf-8-sig')
+
+
+def ler_csv(linhas):
+    """
+    Gera ``(numero_da_linha, registro)`` para cada registro do CSV.
+
+    Células vazias são omitidas do registro, o que equivale a não informar o
+    campo (os opcionais ficam nulos, como em ``criar_ativo``).
+    """
+    leitor = csv.DictReader(linhas)
+    for registro in leitor:
+        yield leitor.line_num, {
+            campo: valor for campo, valor in registro.items()
+            if campo is not None and valor not in ('', None)
+        }
+
+
+def mensagens_erro(erros):
+    """Achata o dicionário de erros de um item em pares ``(campo, mensagem)``."""
+    for campo, mensagens in erros.items():
+        if not isinstance(mensagens, (list, tuple)):
+            mensagens = [mensagens]
+        for mensagem in mensagens:
+            yield campo, str(mensagem)
+
+
+def importar_ativos(registros, usuario, tamanho_bloco=TAMANHO_BLOCO_IMPORTACAO,
+                    ao_rejeitar=None, ao_gravar_bloco=None):
+    """
+    Valida e grava os registros de ``ler_csv`` em blocos de ``tamanho_bloco``.
+
+    Args:
+        registros: iterável de ``(numero_da_linha, dict)``.
+        usuario: dono dos ativos importados.
+        ao_rejeitar: chamado com ``(numero_da_linha, erros)`` para cada linha rejeitada.
+        ao_gravar_bloco: chamado com ``(importados, rejeitados)`` acumulados após cada bloco.
+
+    Returns:
+        tuple: (importados, rejeitados)
+    """
+    importados = rejeitados = 0
+    registros = iter(registros)
+
+    while True:
+        bloco = list(islice(registros, tamanho_bloco))
+        if not bloco:
+            return importados, rejeitados
+
+        numeros = [numero for numero, _ in bloco]
+        ativos, erros = validar_novos_ativos([registro for _, registro in bloco], usuario)
+        for erro in erros:
+            if ao_rejeitar is not None:
+                ao_rejeitar(numeros[erro['indice']], erro['erros'])
+
+        if ativos:
+            with transaction.atomic():
+                Ativo.objects.bulk_create(ativos, batch_size=tamanho_bloco)
+
+        importados += len(ativos)
+        rejeitados += len(erros)
+        if ao_gravar_bloco is not None:
+            ao_gravar_bloco(importados, rejeitados)
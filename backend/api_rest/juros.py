@@ -0,0 +1,66 @@
+"""
+Fator de crescimento dos juros compostos, ``(1 + taxa) ** (dias / 365.25)``,
+usado por ``Ativo.rendimento_esperado`` e ``Ativo.calcular_resgate``.
+
+A potência fracionária em ``Decimal`` é a parte cara dessas avaliações, e numa
+carteira real muitos ativos repetem a mesma taxa e o mesmo prazo (110% do CDI
+por dois anos, Tesouro Selic, etc.). Por isso o fator fica numa memória LRU
+limitada, indexada por (taxa, dias, período arredondado).
+
+Política de precisão: o fator é sempre calculado em ``CONTEXTO_FATOR``, com 28
+dígitos e arredondamento half-even (o contexto padrão do Python), não no
+contexto da thread que chama. Assim um valor da memória é o mesmo que seria
+calculado na hora, e os resultados são iguais aos de antes da memória. A
+multiplicação pelo valor investido continua no contexto de quem chama.
+"""
+
+from decimal import ROUND_HALF_EVEN, Context, Decimal
+from functools import lru_cache
+
+
+CONTEXTO_FATOR = Context(prec=28, rounding=ROUND_HALF_EVEN)
+
+DIAS_POR_ANO = 365.25
+
+# Pares (taxa, dias) distintos guardados; cada entrada ocupa poucas centenas de bytes
+TAMANHO_CACHE_FATORES = 8192
+
+
+def periodo_em_anos(dias, arredondado):
+    """
+    Período em anos como ``Decimal``, como cada método o calcula: arredondado a
+    seis casas em ``rendimento_esperado`` (igual a ``Ativo.periodo_em_anos``)
+    e com o float completo em ``calcular_resgate``.
+    """
+    anos = dias / DIAS_POR_ANO
+    return Decimal(str(round(anos, 6) if arredondado else anos))
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_FATORES)
+def fator_crescimento(taxa, dias, periodo_arredondado=False):
+    """
+    ``(1 + taxa) ** periodo_em_anos(dias, periodo_arredondado)`` em ``CONTEXTO_FATOR``.
+
+    Args:
+        taxa (Decimal): taxa anual efetiva (0.1 para 10% a.a.).
+        dias (int): dias corridos.
+        periodo_arredondado (bool): período arredondado a seis casas.
+
+    Raises:
+        InvalidOperation: taxa abaixo de -100% com período fracionário (não é memorizado).
+    """
+    return CONTEXTO_FATOR.power(CONTEXTO_FATOR.add(1, taxa), periodo_em_anos(dias, periodo_arredondado))
+
+
+def estatisticas_fatores():
+    """
+    Returns:
+        dict: acertos, faltas, entradas guardadas e limite da memória.
+    """
+    info = fator_crescimento.cache_info()
+    return {'acertos': info.hits, 'faltas': info.misses, 'entradas': info.currsize, 'limite': info.maxsize}
+
+
+def limpar_fatores():
+    """Esvazia a memória e zera os contadores."""
+    fator_crescimento.cache_clear()
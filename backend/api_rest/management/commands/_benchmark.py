@@ -0,0 +1,84 @@
+"""Utilitários compartilhados pelos comandos benchmark_*."""
+
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from api_rest.models import Ativo, Usuario
+
+
+EMISSORES = ['Banco Inter', 'Itaú', 'Bradesco', 'XP', 'BTG Pactual', 'Tesouro Nacional', 'Petrobras', 'Vale']
+PRODUTOS = ['CDB', 'LCI', 'LCA', 'Tesouro IPCA+', 'Tesouro Selic', 'Debênture', 'CRI', 'CRA']
+
+
+class Descartar(Exception):
+    """Levantada para desfazer os dados criados pelo benchmark."""
+
+
+@contextmanager
+def dados_descartaveis():
+    """Executa o bloco numa transação que é sempre desfeita ao final."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Descartar
+    except Descartar:
+        pass
+
+
+def medir(funcao, repeticoes):
+    """
+    Executa ``funcao`` ``repeticoes`` vezes.
+
+    Returns:
+        dict: mediana, mínimo e p95 em milissegundos.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        'mediana_ms': statistics.median(tempos),
+        'min_ms': tempos[0],
+        'p95_ms': tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))],
+    }
+
+
+def ativo_sintetico(rng, usuario, tipo_juros='prefixado', com_imposto=False):
+    """Ativo válido do ``tipo_juros`` pedido, com nome e valores sorteados."""
+    emissao = date(2020, 1, 1) + timedelta(days=rng.randint(0, 1500))
+    indexado = tipo_juros != 'prefixado'
+    return Ativo(
+        usuario=usuario,
+        nome=f'{rng.choice(PRODUTOS)} {rng.choice(EMISSORES)} {emissao.year + rng.randint(1, 10)}',
+        tipo='renda_fixa_bancaria',
+        valor_unitario=Decimal(rng.randint(100, 500_000)) / 100,
+        quantidade=rng.randint(1, 100),
+        tipo_juros=tipo_juros,
+        taxa_fixa=Decimal(rng.randint(500, 1500)) / 100 if tipo_juros != 'posfixado' else None,
+        indexador=rng.choice(['CDI', 'SELIC', 'IPCA', 'IGPM']) if indexado else None,
+        percentual_sobre_indexador=Decimal(rng.randint(8000, 12000)) / 100 if indexado else None,
+        data_emissao=emissao,
+        data_vencimento=emissao + timedelta(days=rng.randint(180, 3650)),
+        liquidez=rng.choice(['diaria', 'apos_vencimento']),
+        possuiImposto=com_imposto,
+        aliquotaImposto=Decimal(rng.choice([150, 175, 200, 225])) / 10 if com_imposto else None,
+    )
+
+
+def criar_carteira(quantidade, seed=42, email='benchmark@exemplo.com', lote=5000, senha=None):
+    """Cria um usuário com ``quantidade`` ativos sintéticos."""
+    rng = random.Random(seed)
+    usuario = Usuario.objects.create_user(email=email, nome='Benchmark', password=senha)
+    for inicio in range(0, quantidade, lote):
+        Ativo.objects.bulk_create(
+            [ativo_sintetico(rng, usuario) for _ in range(min(lote, quantidade - inicio))]
+        )
+    return usuario
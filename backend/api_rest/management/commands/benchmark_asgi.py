@@ -0,0 +1,99 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ._benchmark import criar_carteira
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a vazão de requisições concorrentes à listagem de ativos: views "
+        "síncronas sob WSGI (um thread por requisição, como o gunicorn com --threads), "
+        "as mesmas sob ASGI e as views assíncronas (api_rest.views_async) sob ASGI. "
+        "Roda em processo, pelos handlers WSGI e ASGI do Django, sem rede. Os dados "
+        "criados são gravados e apagados ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ativos', type=int, default=200)
+        parser.add_argument('--requisicoes', type=int, default=400)
+        parser.add_argument('--concorrencia', type=int, nargs='+', default=[1, 8, 32])
+        parser.add_argument('--seed', type=int, default=42)
+
+    def linha(self, modo, concorrencia, total, decorrido, latencias):
+        latencias.sort()
+        self.stdout.write(
+            f"{modo:<12} {concorrencia:>12} {total / decorrido:>10,.0f} "
+            f"{statistics.median(latencias):>10.1f} {latencias[int(len(latencias) * 0.95) - 1]:>10.1f}"
+        )
+
+    def wsgi(self, url, cabecalhos, total, concorrencia):
+        locais = threading.local()
+
+        def requisitar(_):
+            if not hasattr(locais, 'client'):
+                locais.client = Client()
+            inicio = time.perf_counter()
+            resposta = locais.client.get(url, headers=cabecalhos)
+            assert resposta.status_code == 200, resposta.status_code
+            return (time.perf_counter() - inicio) * 1000
+
+        def fechar_conexoes(_):
+            connections.close_all()
+
+        with ThreadPoolExecutor(concorrencia) as executor:
+            inicio = time.perf_counter()
+            latencias = list(executor.map(requisitar, range(total)))
+            decorrido = time.perf_counter() - inicio
+            list(executor.map(fechar_conexoes, range(concorrencia)))
+        return decorrido, latencias
+
+    def asgi(self, url, cabecalhos, total, concorrencia):
+        async def principal():
+            client = AsyncClient()
+            limite = asyncio.Semaphore(concorrencia)
+
+            async def requisitar():
+                async with limite:
+                    inicio = time.perf_counter()
+                    resposta = await client.get(url, headers=cabecalhos)
+                    assert resposta.status_code == 200, resposta.status_code
+                    return (time.perf_counter() - inicio) * 1000
+
+            inicio = time.perf_counter()
+            latencias = await asyncio.gather(*(requisitar() for _ in range(total)))
+            return time.perf_counter() - inicio, list(latencias)
+
+        return asyncio.run(principal())
+
+    def handle(self, *args, **options):
+        usuario = criar_carteira(options['ativos'], seed=options['seed'], email='benchmark-asgi@exemplo.com')
+        try:
+            cabecalhos = {'Authorization': f'Bearer {AccessToken.for_user(usuario)}'}
+            modos = [
+                ('wsgi', self.wsgi, reverse('listar_ativos')),
+                ('asgi sync', self.asgi, reverse('listar_ativos')),
+                ('asgi async', self.asgi, reverse('listar_ativos_async')),
+            ]
+            total = options['requisicoes']
+
+            self.stdout.write(f"Banco: {connection.vendor}, {options['ativos']} ativos, {total} requisições por linha")
+            self.stdout.write(f"{'modo':<12} {'concorrência':>12} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+            # os clients de teste do Django usam o host "testserver"
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for concorrencia in options['concorrencia']:
+                    for modo, executar, url in modos:
+                        executar(url, cabecalhos, min(total, 10), concorrencia)  # aquecimento
+                        decorrido, latencias = executar(url, cabecalhos, total, concorrencia)
+                        self.linha(modo, concorrencia, total, decorrido, latencias)
+        finally:
+            usuario.delete()
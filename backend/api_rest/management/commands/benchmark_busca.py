@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api_rest.busca import buscar_por_nome
+from api_rest.models import Ativo
+
+from ._benchmark import criar_carteira, dados_descartaveis, medir
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a latência da busca por nome (icontains x índice de trigramas) "
+        "conforme o tamanho da carteira. Os dados criados são descartados ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanhos', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+        parser.add_argument('--termos', nargs='+', default=['Pactual', 'Itaú 2030', 'Inexistente'])
+        parser.add_argument('--repeticoes', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Banco: {connection.vendor}")
+        self.stdout.write(f"{'ativos':>9} {'termo':<16} {'icontains ms':>13} {'índice ms':>10} {'resultados':>11}")
+
+        for tamanho in options['tamanhos']:
+            with dados_descartaveis():
+                usuario = criar_carteira(tamanho, seed=options['seed'])
+                ativos = Ativo.objects.filter(usuario=usuario)
+
+                for termo in options['termos']:
+                    # linhas completas, como nas views
+                    def varredura():
+                        return list(ativos.filter(nome__icontains=termo))
+
+                    def indice():
+                        return list(buscar_por_nome(ativos, termo))
+
+                    resultados = len(indice())
+                    if resultados != len(varredura()):
+                        self.stderr.write(f"Resultados divergentes para '{termo}'")
+
+                    base = medir(varredura, options['repeticoes'])
+                    busca = medir(indice, options['repeticoes'])
+                    self.stdout.write(
+                        f"{tamanho:>9} {termo:<16} {base['mediana_ms']:>13.2f} "
+                        f"{busca['mediana_ms']:>10.2f} {resultados:>11}"
+                    )
@@ -0,0 +1,110 @@
+import random
+import statistics
+import time
+from datetime import date
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from api_rest import models
+from api_rest.geracao import gerar_ativo
+from api_rest.juros import estatisticas_fatores, fator_crescimento, limpar_fatores
+from api_rest.models import Ativo, cache_indexadores
+
+
+DATA_RESGATE = date(2025, 6, 30)
+
+
+def carteira_diversa(rng, quantidade):
+    """Cada ativo sorteado do catálogo: taxas e prazos quase nunca se repetem."""
+    return [gerar_ativo(rng, None) for _ in range(quantidade)]
+
+
+def carteira_ofertas(rng, quantidade, ofertas):
+    """
+    Ativos comprados de um conjunto de ofertas (a mesma emissão de CDB, o mesmo
+    título do Tesouro para vários investidores): mesmas taxas e datas, valores
+    e quantidades diferentes. É o caso da base inteira de uma corretora.
+    """
+    modelos = [gerar_ativo(rng, None) for _ in range(ofertas)]
+    ativos = []
+    for _ in range(quantidade):
+        oferta = rng.choice(modelos)
+        ativos.append(Ativo(**{
+            campo.attname: getattr(oferta, campo.attname) for campo in Ativo._meta.concrete_fields
+            if campo.attname != 'id'
+        }))
+        ativos[-1].quantidade = rng.randint(1, 200)
+    return ativos
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede rendimento_esperado e calcular_resgate sobre carteiras sintéticas com e "
+        "sem a memória do fator de crescimento (api_rest.juros): sem memória, com a "
+        "memória esvaziada a cada rodada e com a memória já preenchida. Mostra µs por "
+        "ativo, o ganho sobre a versão sem memória e a taxa de acerto."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ativos', type=int, default=5000)
+        parser.add_argument('--ofertas', type=int, default=200, help="Ofertas distintas na carteira de ofertas.")
+        parser.add_argument('--repeticoes', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def medir(self, funcao, ativos, repeticoes, antes_da_rodada):
+        tempos = []
+        for _ in range(repeticoes):
+            antes_da_rodada()
+            inicio = time.perf_counter()
+            for ativo in ativos:
+                funcao(ativo)
+            tempos.append((time.perf_counter() - inicio) / len(ativos) * 1e6)
+        return statistics.median(tempos)
+
+    def handle(self, *args, **options):
+        if options['ativos'] < 1 or options['ofertas'] < 1 or options['repeticoes'] < 1:
+            raise CommandError("--ativos, --ofertas e --repeticoes devem ser positivos.")
+
+        rng = random.Random(options['seed'])
+        carteiras = {
+            'diversa': carteira_diversa(rng, options['ativos']),
+            f"{options['ofertas']} ofertas": carteira_ofertas(rng, options['ativos'], options['ofertas']),
+        }
+        for ativos in carteiras.values():
+            for ativo in ativos:
+                ativo.liquidez = 'diaria'  # calcular_resgate só avalia ativos de liquidez diária
+        metodos = {
+            'rendimento_esperado': lambda ativo: ativo.rendimento_esperado(),
+            'calcular_resgate': lambda ativo: ativo.calcular_resgate(DATA_RESGATE),
+        }
+        nada = lambda: None  # noqa: E731
+
+        self.stdout.write(
+            f"{options['ativos']} ativos por carteira, mediana de {options['repeticoes']} rodadas, "
+            f"memória de {fator_crescimento.cache_info().maxsize} fatores"
+        )
+        self.stdout.write(
+            f"{'carteira':<14} {'método':<20} {'sem memória':>12} {'fria':>12} {'quente':>12} "
+            f"{'ganho fria':>11} {'ganho quente':>13} {'acertos':>8}"
+        )
+        # as taxas dos indexadores ficam em memória durante toda a medição
+        with override_settings(INDEXADORES_CACHE_SEGUNDOS=10 ** 9):
+            cache_indexadores.invalidar()
+            cache_indexadores.taxas()
+            for nome_carteira, ativos in carteiras.items():
+                for nome_metodo, funcao in metodos.items():
+                    # a conta de antes: a mesma potência, sem passar pela memória
+                    with mock.patch.object(models, 'fator_crescimento', fator_crescimento.__wrapped__):
+                        sem_memoria = self.medir(funcao, ativos, options['repeticoes'], nada)
+                    fria = self.medir(funcao, ativos, options['repeticoes'], limpar_fatores)
+                    acertos = estatisticas_fatores()
+                    taxa_acerto = acertos['acertos'] / ((acertos['acertos'] + acertos['faltas']) or 1)
+                    quente = self.medir(funcao, ativos, options['repeticoes'], nada)
+                    self.stdout.write(
+                        f"{nome_carteira:<14} {nome_metodo:<20} {sem_memoria:>10.1f}µs {fria:>10.1f}µs "
+                        f"{quente:>10.1f}µs {sem_memoria / fria:>10.1f}x {sem_memoria / quente:>12.1f}x "
+                        f"{taxa_acerto:>8.0%}"
+                    )
+        limpar_fatores()
@@ -0,0 +1,181 @@
+import gc
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from api_rest.models import cache_indexadores
+from api_rest.serializers import AtivoSerializer
+
+from ._benchmark import ativo_sintetico
+
+
+DATA_RESGATE = date(2025, 6, 30)
+
+VARIANTES = [
+    (tipo_juros, com_imposto)
+    for tipo_juros in ('prefixado', 'posfixado', 'hibrido')
+    for com_imposto in (False, True)
+]
+
+
+def _entrada_serializer(ativo):
+    """Corpo de criar_ativo equivalente ao ativo (valores como o cliente envia)."""
+    dados = {}
+    for campo in ('nome', 'tipo', 'tipo_negociacao', 'tipo_juros', 'indexador', 'liquidez', 'possuiImposto',
+                  'quantidade', 'valor_unitario', 'taxa_fixa', 'percentual_sobre_indexador', 'aliquotaImposto',
+                  'data_emissao', 'data_vencimento'):
+        valor = getattr(ativo, campo)
+        if valor is not None:
+            dados[campo] = valor if isinstance(valor, (bool, int)) else str(valor)
+    return dados
+
+
+# caminho -> função que recebe (ativo, entrada do serializer)
+CAMINHOS = {
+    'periodo_em_anos': lambda ativo, entrada: ativo.periodo_em_anos(),
+    'rendimento_esperado': lambda ativo, entrada: ativo.rendimento_esperado(),
+    'calcular_resgate': lambda ativo, entrada: ativo.calcular_resgate(DATA_RESGATE),
+    'clean': lambda ativo, entrada: ativo.clean(),
+    'serializer_leitura': lambda ativo, entrada: AtivoSerializer(ativo).data,
+    'serializer_validacao': lambda ativo, entrada: AtivoSerializer(data=entrada).is_valid(raise_exception=True),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmarks dos caminhos quentes de Ativo (periodo_em_anos, "
+        "rendimento_esperado, calcular_resgate, clean e AtivoSerializer) por tipo de "
+        "juros, com e sem imposto: ns por chamada e memória alocada por chamada "
+        "(tracemalloc). Ativos sorteados com semente fixa e sem gravar no banco. "
+        "Com --saida grava o resultado em JSON; com --comparar mostra a variação "
+        "em relação a um JSON anterior."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ativos', type=int, default=200, help="Ativos sorteados por variante.")
+        parser.add_argument('--repeticoes', type=int, default=7, help="Rodadas cronometradas por caminho.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--caminhos', nargs='+', choices=list(CAMINHOS), default=list(CAMINHOS))
+        parser.add_argument('--saida', help="Grava os resultados neste arquivo JSON.")
+        parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar.")
+        parser.add_argument(
+            '--tolerancia', type=float, default=10.0,
+            help="Variação percentual de ns/chamada acima da qual a comparação marca regressão.",
+        )
+
+    def cronometrar(self, funcao, ativos, entradas, repeticoes):
+        """ns por chamada de cada rodada, com o coletor de lixo desligado (como o timeit)."""
+        rodadas = []
+        gc_ligado = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(repeticoes):
+                inicio = time.perf_counter_ns()
+                for ativo, entrada in zip(ativos, entradas):
+                    funcao(ativo, entrada)
+                rodadas.append((time.perf_counter_ns() - inicio) / len(ativos))
+        finally:
+            if gc_ligado:
+                gc.enable()
+        return rodadas
+
+    def alocacoes(self, funcao, ativos, entradas):
+        """Média, por chamada, do pico de memória alocada e do que fica retido."""
+        pico = retido = 0
+        tracemalloc.start()
+        try:
+            for ativo, entrada in zip(ativos, entradas):
+                antes = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                funcao(ativo, entrada)
+                atual, maximo = tracemalloc.get_traced_memory()
+                pico += maximo - antes
+                retido += atual - antes
+        finally:
+            tracemalloc.stop()
+        return pico / len(ativos), retido / len(ativos)
+
+    def handle(self, *args, **options):
+        if options['ativos'] < 1 or options['repeticoes'] < 1:
+            raise CommandError("--ativos e --repeticoes devem ser positivos.")
+        anterior = None
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as arquivo:
+                anterior = {
+                    (r['caminho'], r['tipo_juros'], r['imposto']): r for r in json.load(arquivo)['resultados']
+                }
+
+        resultados = []
+        # as taxas dos indexadores ficam em memória durante toda a medição
+        with override_settings(INDEXADORES_CACHE_SEGUNDOS=10 ** 9):
+            cache_indexadores.invalidar()
+            cache_indexadores.taxas()
+
+            self.stdout.write(
+                f"{'caminho':<22} {'juros':<10} {'imposto':<8} {'ns/chamada':>11} {'mín':>11} "
+                f"{'pico B':>9} {'retido B':>9}" + (f" {'variação':>9}" if anterior else '')
+            )
+            for tipo_juros, com_imposto in VARIANTES:
+                rng = random.Random(f"{options['seed']}-{tipo_juros}-{com_imposto}")
+                ativos = [ativo_sintetico(rng, None, tipo_juros, com_imposto) for _ in range(options['ativos'])]
+                for ativo in ativos:
+                    ativo.liquidez = 'diaria'  # calcular_resgate só avalia ativos de liquidez diária
+                entradas = [_entrada_serializer(ativo) for ativo in ativos]
+
+                for caminho in options['caminhos']:
+                    funcao = CAMINHOS[caminho]
+                    self.cronometrar(funcao, ativos, entradas, 1)  # aquecimento
+                    rodadas = self.cronometrar(funcao, ativos, entradas, options['repeticoes'])
+                    pico, retido = self.alocacoes(funcao, ativos, entradas)
+                    resultado = {
+                        'caminho': caminho,
+                        'tipo_juros': tipo_juros,
+                        'imposto': com_imposto,
+                        'ns_por_chamada': round(statistics.median(rodadas), 1),
+                        'ns_min': round(min(rodadas), 1),
+                        'pico_bytes': round(pico, 1),
+                        'retido_bytes': round(retido, 1),
+                    }
+                    resultados.append(resultado)
+                    self.linha(resultado, anterior, options['tolerancia'])
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump({
+                    'meta': {
+                        'gerado_em': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                        'seed': options['seed'],
+                        'ativos': options['ativos'],
+                        'repeticoes': options['repeticoes'],
+                        'data_resgate': DATA_RESGATE.isoformat(),
+                        'python': platform.python_version(),
+                        'django': django.get_version(),
+                        'plataforma': platform.platform(),
+                        'processador': platform.processor() or platform.machine(),
+                    },
+                    'resultados': resultados,
+                }, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {options['saida']}."))
+
+    def linha(self, resultado, anterior, tolerancia):
+        texto = (
+            f"{resultado['caminho']:<22} {resultado['tipo_juros']:<10} {'sim' if resultado['imposto'] else 'não':<8} "
+            f"{resultado['ns_por_chamada']:>11,.0f} {resultado['ns_min']:>11,.0f} "
+            f"{resultado['pico_bytes']:>9,.0f} {resultado['retido_bytes']:>9,.0f}"
+        )
+        base = anterior and anterior.get((resultado['caminho'], resultado['tipo_juros'], resultado['imposto']))
+        if base:
+            variacao = (resultado['ns_por_chamada'] / base['ns_por_chamada'] - 1) * 100
+            texto += f" {variacao:>+8.1f}%"
+            if variacao > tolerancia:
+                self.stdout.write(self.style.WARNING(texto + '  REGRESSÃO'))
+                return
+        self.stdout.write(texto)
@@ -0,0 +1,66 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from api_rest.models import Ativo
+from api_rest.fragmentos import colunas_fragmentos, fragmentos_ativos, lista_json
+from api_rest.serializers import AtivoSerializer, ativo_leitura, serializar_ativos
+
+from ._benchmark import criar_carteira, dados_descartaveis, medir
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara AtivoSerializer(many=True) com o caminho rápido AtivoLeitura na "
+        "listagem de ativos, em linhas por segundo: só a serialização e o caminho "
+        "completo (consulta + serialização + JSON), este também com o cache de "
+        "fragmentos por ativo já preenchido. Os dados criados são descartados ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanhos', type=int, nargs='+', default=[100, 1_000, 10_000])
+        parser.add_argument('--repeticoes', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def linha(self, tamanho, etapa, base, novo):
+        self.stdout.write(
+            f"{tamanho:>8} {etapa:<14} {tamanho / base * 1000:>20,.0f} "
+            f"{tamanho / novo * 1000:>16,.0f} {base / novo:>6.1f}x"
+        )
+
+    def handle(self, *args, **options):
+        renderizador = JSONRenderer()
+        leitura = ativo_leitura()
+        repeticoes = options['repeticoes']
+
+        self.stdout.write(f"Banco: {connection.vendor}")
+        self.stdout.write(f"{'ativos':>8} {'etapa':<14} {'serializer linhas/s':>20} {'rápido linhas/s':>16} {'ganho':>7}")
+
+        for tamanho in options['tamanhos']:
+            with dados_descartaveis():
+                usuario = criar_carteira(tamanho, seed=options['seed'])
+                ativos = Ativo.objects.filter(usuario=usuario).order_by('id')
+
+                esperado = renderizador.render(AtivoSerializer(ativos.all(), many=True).data)
+                if renderizador.render(serializar_ativos(ativos)) != esperado:
+                    self.stderr.write(f"JSON divergente para {tamanho} ativos")
+
+                # só a serialização: instâncias e linhas já carregadas
+                instancias = list(ativos)
+                linhas = list(ativos.values(*leitura.colunas))
+                base = medir(lambda: AtivoSerializer(instancias, many=True).data, repeticoes)['mediana_ms']
+                novo = medir(lambda: leitura.serializar(linhas), repeticoes)['mediana_ms']
+                self.linha(tamanho, 'serialização', base, novo)
+
+                # caminho completo da view: consulta, serialização e renderização
+                base = medir(lambda: renderizador.render(AtivoSerializer(ativos.all(), many=True).data), repeticoes)['mediana_ms']
+                novo = medir(lambda: renderizador.render(serializar_ativos(ativos)), repeticoes)['mediana_ms']
+                self.linha(tamanho, 'completo', base, novo)
+
+                # caminho completo com todos os fragmentos já no cache
+                if lista_json(fragmentos_ativos(ativos.values(*colunas_fragmentos()))) != esperado:
+                    self.stderr.write(f"JSON divergente (fragmentos) para {tamanho} ativos")
+                novo = medir(lambda: lista_json(fragmentos_ativos(ativos.values(*colunas_fragmentos()))), repeticoes)['mediana_ms']
+                self.linha(tamanho, 'fragmentos', base, novo)
+                caches['fragmentos'].clear()
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_rest.geracao import TAMANHO_LOTE_GERACAO, gerar_carteiras
+from api_rest.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera usuários com carteiras sintéticas para testes de escala: N usuários com "
+        "M ativos cada, sorteados de um catálogo realista de produtos de renda fixa "
+        "(tipos, remunerações, indexadores, prazos e IR), com semente fixa e gravados "
+        "em bulk_create por lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=100)
+        parser.add_argument('--ativos', type=int, default=100, help="Ativos por usuário.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--prefixo', default='sintetico',
+            help="Os usuários são criados como <prefixo>-<n>@exemplo.com.",
+        )
+        parser.add_argument('--senha', help="Senha comum a todos os usuários (padrão: senha inutilizável).")
+        parser.add_argument(
+            '--lote', type=int, default=TAMANHO_LOTE_GERACAO,
+            help="Ativos gravados por lote (cada lote numa transação).",
+        )
+        parser.add_argument(
+            '--apagar', action='store_true',
+            help="Apaga antes os usuários gerados com o mesmo prefixo (e seus ativos).",
+        )
+
+    def handle(self, *args, **options):
+        if options['usuarios'] < 1 or options['ativos'] < 0 or options['lote'] < 1:
+            raise CommandError("--usuarios e --lote devem ser positivos e --ativos não pode ser negativo.")
+
+        existentes = Usuario.objects.filter(
+            email__startswith=f"{options['prefixo']}-", email__endswith='@exemplo.com'
+        )
+        if options['apagar']:
+            apagados = existentes.delete()[1].get('api_rest.Usuario', 0)
+            self.stdout.write(f"{apagados} usuário(s) gerado(s) anteriormente apagado(s).")
+        elif existentes.exists():
+            raise CommandError(
+                f"Já existem usuários com o prefixo '{options['prefixo']}'. Use --apagar ou outro --prefixo."
+            )
+
+        inicio = time.perf_counter()
+        total = options['usuarios'] * options['ativos']
+
+        def ao_gravar_lote(usuarios, ativos):
+            decorrido = time.perf_counter() - inicio
+            self.stdout.write(
+                f"{usuarios} usuário(s), {ativos}/{total} ativo(s) [{decorrido:.1f}s, {ativos / decorrido:,.0f} ativos/s]"
+            )
+
+        usuarios, ativos = gerar_carteiras(
+            options['usuarios'], options['ativos'], seed=options['seed'], prefixo=options['prefixo'],
+            senha=options['senha'], tamanho_lote=options['lote'], ao_gravar_lote=ao_gravar_lote,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{usuarios} usuário(s) e {ativos} ativo(s) gerado(s) em {time.perf_counter() - inicio:.1f}s."
+        ))
@@ -0,0 +1,70 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_rest.importacao import TAMANHO_BLOCO_IMPORTACAO, importar_ativos, ler_csv, mensagens_erro
+from api_rest.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa ativos de um arquivo CSV (formato da exportação) para um usuário, "
+        "em blocos e com memória limitada. Linhas inválidas vão para o relatório de erros."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do arquivo CSV.")
+        parser.add_argument('--usuario', required=True, help="Email do dono dos ativos.")
+        parser.add_argument(
+            '--lote', type=int, default=TAMANHO_BLOCO_IMPORTACAO,
+            help="Quantidade de linhas validadas e gravadas por bloco.",
+        )
+        parser.add_argument(
+            '--relatorio',
+            help="Grava as linhas rejeitadas neste CSV (linha, campo, mensagem) em vez de na saída de erro.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            usuario = Usuario.objects.get(email=options['usuario'].lower())
+        except Usuario.DoesNotExist:
+            raise CommandError(f"Usuário {options['usuario']} não encontrado.")
+
+        inicio = time.perf_counter()
+
+        def ao_gravar_bloco(importados, rejeitados):
+            decorrido = time.perf_counter() - inicio
+            self.stdout.write(
+                f"{importados + rejeitados} linha(s) processada(s): {importados} importada(s), "
+                f"{rejeitados} rejeitada(s) [{decorrido:.1f}s]"
+            )
+
+        with open(options['arquivo'], newline='', encoding='utf-8-sig') as entrada:
+            relatorio = open(options['relatorio'], 'w', newline='', encoding='utf-8') if options['relatorio'] else None
+            try:
+                if relatorio is not None:
+                    escritor = csv.writer(relatorio)
+                    escritor.writerow(['linha', 'campo', 'mensagem'])
+
+                    def ao_rejeitar(linha, erros):
+                        escritor.writerows([linha, campo, mensagem] for campo, mensagem in mensagens_erro(erros))
+                else:
+                    def ao_rejeitar(linha, erros):
+                        for campo, mensagem in mensagens_erro(erros):
+                            self.stderr.write(f"linha {linha}: {campo}: {mensagem}")
+
+                try:
+                    importados, rejeitados = importar_ativos(
+                        ler_csv(entrada), usuario, tamanho_bloco=options['lote'],
+                        ao_rejeitar=ao_rejeitar, ao_gravar_bloco=ao_gravar_bloco,
+                    )
+                except (UnicodeDecodeError, csv.Error) as exc:
+                    raise CommandError(f"Arquivo CSV inválido: {exc}")
+            finally:
+                if relatorio is not None:
+                    relatorio.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{importados} ativo(s) importado(s), {rejeitados} linha(s) rejeitada(s)."
+        ))
@@ -0,0 +1,72 @@
+import csv
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_rest.importacao import ler_csv, mensagens_erro
+from api_rest.provisionamento import TAMANHO_BLOCO_PROVISIONAMENTO, ler_ndjson, provisionar_usuarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria usuários em massa a partir de um arquivo NDJSON (um objeto por linha: "
+        "email, nome, password e ativos opcionais) ou CSV (email, nome, password), "
+        "com as senhas hasheadas em paralelo. Registros inválidos vão para o relatório de erros."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do arquivo .ndjson/.jsonl ou .csv.")
+        parser.add_argument(
+            '--processos', type=int, default=os.cpu_count(),
+            help="Processos para o hash das senhas (padrão: núcleos da máquina).",
+        )
+        parser.add_argument(
+            '--lote', type=int, default=TAMANHO_BLOCO_PROVISIONAMENTO,
+            help="Quantidade de usuários validados e gravados por bloco.",
+        )
+        parser.add_argument(
+            '--relatorio',
+            help="Grava os registros rejeitados neste CSV (linha, campo, mensagem) em vez de na saída de erro.",
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        leitor = ler_csv if options['arquivo'].lower().endswith('.csv') else ler_ndjson
+
+        def ao_gravar_bloco(usuarios, ativos, rejeitados):
+            decorrido = time.perf_counter() - inicio
+            self.stdout.write(
+                f"{usuarios + rejeitados} registro(s) processado(s): {usuarios} usuário(s), "
+                f"{ativos} ativo(s), {rejeitados} rejeitado(s) [{decorrido:.1f}s, "
+                f"{usuarios / decorrido:,.0f} usuários/s]"
+            )
+
+        with open(options['arquivo'], newline='', encoding='utf-8-sig') as entrada:
+            relatorio = open(options['relatorio'], 'w', newline='', encoding='utf-8') if options['relatorio'] else None
+            try:
+                if relatorio is not None:
+                    escritor = csv.writer(relatorio)
+                    escritor.writerow(['linha', 'campo', 'mensagem'])
+
+                    def ao_rejeitar(linha, erros):
+                        escritor.writerows([linha, campo, mensagem] for campo, mensagem in mensagens_erro(erros))
+                else:
+                    def ao_rejeitar(linha, erros):
+                        for campo, mensagem in mensagens_erro(erros):
+                            self.stderr.write(f"linha {linha}: {campo}: {mensagem}")
+
+                try:
+                    usuarios, ativos, rejeitados = provisionar_usuarios(
+                        leitor(entrada), processos=options['processos'], tamanho_bloco=options['lote'],
+                        ao_rejeitar=ao_rejeitar, ao_gravar_bloco=ao_gravar_bloco,
+                    )
+                except (UnicodeDecodeError, csv.Error) as exc:
+                    raise CommandError(f"Arquivo inválido: {exc}")
+            finally:
+                if relatorio is not None:
+                    relatorio.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{usuarios} usuário(s) e {ativos} ativo(s) criado(s), {rejeitados} registro(s) rejeitado(s)."
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from api_rest.models import Ativo, TAMANHO_LOTE_VALORES
+
+
+class Command(BaseCommand):
+    help = "Recalcula as colunas armazenadas de valor investido e rendimento esperado dos ativos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--usuario', type=int,
+            help="Recalcula apenas os ativos do usuário com este id.",
+        )
+        parser.add_argument(
+            '--indexador',
+            help="Recalcula apenas os ativos com este indexador (CDI, SELIC, IPCA, IGPM).",
+        )
+        parser.add_argument(
+            '--lote', type=int, default=TAMANHO_LOTE_VALORES,
+            help="Quantidade de ativos gravados por lote.",
+        )
+
+    def handle(self, *args, **options):
+        ativos = Ativo.objects.all()
+        if options['usuario'] is not None:
+            ativos = ativos.filter(usuario_id=options['usuario'])
+        if options['indexador']:
+            ativos = ativos.filter(indexador=options['indexador'])
+
+        total = ativos.recalcular_valores(tamanho_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f"{total} ativo(s) recalculado(s)."))
@@ -0,0 +1,322 @@
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from api_rest.models import Ativo, Usuario
+
+from ._benchmark import criar_carteira
+
+
+SENHA_CARGA = 'carga-senha-123'
+
+MIX_PADRAO = ['listar_ativos=5', 'consultar_ativo=3', 'solicitar_resgate=2', 'resumo_ativos=1', 'token=1']
+
+
+class Sessao:
+    """Usuário semeado: credenciais, token de acesso e ids dos seus ativos."""
+
+    def __init__(self, usuario, ativos, diarios):
+        self.email = usuario.email
+        self.ativos = ativos
+        self.diarios = diarios or ativos
+        self.cabecalhos = {}
+
+
+# endpoint -> função (sessão, rng) -> (método, caminho, corpo JSON ou None, autenticado)
+ENDPOINTS = {
+    'listar_ativos': lambda sessao, rng: ('GET', reverse('listar_ativos'), None, True),
+    'resumo_ativos': lambda sessao, rng: ('GET', reverse('resumo_ativos'), None, True),
+    'consultar_ativo': lambda sessao, rng: (
+        'GET', reverse('consultar_ativo_por_id', args=[rng.choice(sessao.ativos)]), None, True
+    ),
+    'solicitar_resgate': lambda sessao, rng: (
+        'GET', reverse('solicitar_resgate', args=[rng.choice(sessao.diarios)]), None, True
+    ),
+    'listar_ativos_async': lambda sessao, rng: ('GET', reverse('listar_ativos_async'), None, True),
+    'token': lambda sessao, rng: (
+        'POST', reverse('token_obtain_pair'), {'email': sessao.email, 'password': SENHA_CARGA}, False
+    ),
+}
+
+
+def percentil(ordenados, p):
+    """Percentil ``p`` (0-100) pelo posto mais próximo de uma lista já ordenada."""
+    return ordenados[max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))]
+
+
+class ClienteInterno:
+    """Requisições pelo handler ASGI do Django, no próprio processo e sem rede."""
+
+    def __init__(self):
+        self.client = AsyncClient()
+
+    async def requisitar(self, metodo, caminho, cabecalhos, corpo=None):
+        resposta = await self.client.generic(
+            metodo, caminho, json.dumps(corpo) if corpo is not None else '',
+            content_type='application/json', headers=cabecalhos,
+        )
+        return resposta.status_code, resposta.content
+
+    async def fechar(self):
+        pass
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP/1.1 mínimo sobre ``asyncio.open_connection``, com uma conexão
+    keep-alive por usuário virtual. Reabre a conexão quando o servidor a fecha
+    (o worker sync do gunicorn responde com ``Connection: close``).
+    """
+
+    def __init__(self, base):
+        partes = urlsplit(base)
+        if partes.scheme not in ('http', 'https') or not partes.hostname:
+            raise CommandError(f"URL inválida: {base}")
+        self.host = partes.hostname
+        self.porta = partes.port or (443 if partes.scheme == 'https' else 80)
+        self.ssl = partes.scheme == 'https'
+        self.cabecalho_host = partes.netloc
+        self.leitor = self.escritor = None
+
+    async def requisitar(self, metodo, caminho, cabecalhos, corpo=None):
+        for tentativa in range(2):
+            if self.escritor is None:
+                self.leitor, self.escritor = await asyncio.open_connection(self.host, self.porta, ssl=self.ssl)
+            try:
+                return await self._enviar(metodo, caminho, cabecalhos, corpo)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # conexão keep-alive encerrada pelo servidor entre duas requisições
+                await self.fechar()
+                if tentativa:
+                    raise
+
+    async def _enviar(self, metodo, caminho, cabecalhos, corpo):
+        dados = json.dumps(corpo).encode() if corpo is not None else b''
+        linhas = [f'{metodo} {caminho} HTTP/1.1', f'Host: {self.cabecalho_host}', 'Accept: application/json']
+        linhas += [f'{nome}: {valor}' for nome, valor in cabecalhos.items()]
+        if corpo is not None:
+            linhas += ['Content-Type: application/json', f'Content-Length: {len(dados)}']
+        self.escritor.write(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + dados)
+        await self.escritor.drain()
+
+        linha = await self.leitor.readline()
+        if not linha:
+            raise ConnectionResetError
+        status_http = int(linha.split()[1])
+        resposta = {}
+        while (linha := await self.leitor.readline()) not in (b'\r\n', b'\n', b''):
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            resposta[nome.strip().lower()] = valor.strip()
+
+        if 'content-length' in resposta:
+            conteudo = await self.leitor.readexactly(int(resposta['content-length']))
+        elif resposta.get('transfer-encoding', '').lower() == 'chunked':
+            partes = []
+            while (tamanho := int((await self.leitor.readline()).split(b';')[0], 16)):
+                partes.append(await self.leitor.readexactly(tamanho))
+                await self.leitor.readline()
+            await self.leitor.readline()
+            conteudo = b''.join(partes)
+        else:
+            conteudo = await self.leitor.read()
+            resposta['connection'] = 'close'
+
+        if resposta.get('connection', '').lower() == 'close':
+            await self.fechar()
+        return status_http, conteudo
+
+    async def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            try:
+                await self.escritor.wait_closed()
+            except ConnectionError:
+                pass
+        self.leitor = self.escritor = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga ponta a ponta: usuários virtuais (asyncio) disparam uma "
+        "mistura ponderada de requisições autenticadas contra dados semeados e o "
+        "comando reporta, por endpoint, vazão e latência p50/p95/p99 para cada nível "
+        "de concorrência. Sem --url as requisições passam pelo handler ASGI do Django "
+        "no próprio processo; com --url vão por HTTP a um servidor já rodando (runserver, "
+        "gunicorn), que precisa usar o mesmo banco deste comando. Os usuários e ativos "
+        "semeados são apagados ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="URL base de um servidor rodando, ex.: http://127.0.0.1:8000.")
+        parser.add_argument('--usuarios', type=int, default=5, help="Usuários semeados.")
+        parser.add_argument('--ativos', type=int, default=100, help="Ativos por usuário semeado.")
+        parser.add_argument('--concorrencia', type=int, nargs='+', default=[1, 8, 32], help="Usuários virtuais.")
+        parser.add_argument('--duracao', type=float, default=10.0, help="Segundos medidos por nível de concorrência.")
+        parser.add_argument('--aquecimento', type=int, default=2, help="Requisições descartadas por usuário virtual.")
+        parser.add_argument(
+            '--mix', nargs='+', default=MIX_PADRAO, metavar='ENDPOINT=PESO',
+            help=f"Peso de cada endpoint na mistura. Endpoints: {', '.join(ENDPOINTS)}.",
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--saida', help="Grava os resultados neste arquivo JSON.")
+
+    def ler_mix(self, itens):
+        mix = {}
+        for item in itens:
+            nome, _, peso = item.partition('=')
+            if nome not in ENDPOINTS:
+                raise CommandError(f"Endpoint desconhecido no --mix: {nome}")
+            try:
+                mix[nome] = float(peso or 1)
+            except ValueError:
+                raise CommandError(f"Peso inválido no --mix: {item}")
+        if not any(peso > 0 for peso in mix.values()):
+            raise CommandError("--mix precisa de ao menos um peso positivo.")
+        return mix
+
+    def semear(self, options):
+        emails = [f'carga-{indice}@exemplo.com' for indice in range(options['usuarios'])]
+        Usuario.objects.filter(email__in=emails).delete()  # sobras de uma execução interrompida
+        sessoes = []
+        for indice, email in enumerate(emails):
+            usuario = criar_carteira(options['ativos'], seed=options['seed'] + indice, email=email, senha=SENHA_CARGA)
+            linhas = list(Ativo.objects.filter(usuario=usuario).values_list('id', 'liquidez'))
+            sessoes.append(Sessao(
+                usuario, [pk for pk, _ in linhas], [pk for pk, liquidez in linhas if liquidez == 'diaria']
+            ))
+        return emails, sessoes
+
+    def novo_cliente(self, options):
+        return ClienteHTTP(options['url']) if options['url'] else ClienteInterno()
+
+    async def autenticar(self, sessoes, options):
+        cliente = self.novo_cliente(options)
+        try:
+            for sessao in sessoes:
+                status_http, conteudo = await cliente.requisitar(
+                    'POST', reverse('token_obtain_pair'), {}, {'email': sessao.email, 'password': SENHA_CARGA}
+                )
+                if status_http != 200:
+                    raise CommandError(
+                        f"Login de {sessao.email} falhou com {status_http}. O servidor usa o mesmo banco?"
+                    )
+                sessao.cabecalhos = {'Authorization': f"Bearer {json.loads(conteudo)['access']}"}
+        finally:
+            await cliente.fechar()
+
+    async def executar(self, sessoes, mix, concorrencia, options):
+        nomes, pesos = list(mix), list(mix.values())
+        latencias = defaultdict(list)
+        erros = defaultdict(int)
+        janela = {'aquecidos': 0}
+        pronto = asyncio.Event()
+
+        async def requisitar(cliente, sessao, rng, registrar):
+            nome = rng.choices(nomes, pesos)[0]
+            metodo, caminho, corpo, autenticado = ENDPOINTS[nome](sessao, rng)
+            inicio = time.perf_counter()
+            try:
+                status_http, _ = await cliente.requisitar(
+                    metodo, caminho, sessao.cabecalhos if autenticado else {}, corpo
+                )
+            except (OSError, asyncio.IncompleteReadError):
+                status_http = None
+            if registrar:
+                latencias[nome].append((time.perf_counter() - inicio) * 1000)
+                if status_http is None or status_http >= 400:
+                    erros[nome] += 1
+
+        async def usuario_virtual(indice):
+            rng = random.Random(f"{options['seed']}-{concorrencia}-{indice}")
+            sessao = sessoes[indice % len(sessoes)]
+            cliente = self.novo_cliente(options)
+            try:
+                for _ in range(options['aquecimento']):
+                    await requisitar(cliente, sessao, rng, registrar=False)
+                # a janela de medição abre quando o último usuário virtual termina o aquecimento
+                janela['aquecidos'] += 1
+                if janela['aquecidos'] == concorrencia:
+                    janela['inicio'] = time.perf_counter()
+                    janela['fim'] = janela['inicio'] + options['duracao']
+                    pronto.set()
+                await pronto.wait()
+                while time.perf_counter() < janela['fim']:
+                    await requisitar(cliente, sessao, rng, registrar=True)
+            finally:
+                await cliente.fechar()
+
+        await asyncio.gather(*(usuario_virtual(indice) for indice in range(concorrencia)))
+        return time.perf_counter() - janela['inicio'], latencias, erros
+
+    def relatorio(self, concorrencia, decorrido, latencias, erros):
+        total = sum(len(valores) for valores in latencias.values())
+        self.stdout.write(
+            f"\nConcorrência {concorrencia}: {total} requisições em {decorrido:.1f} s "
+            f"({total / decorrido:,.1f} req/s), {sum(erros.values())} erro(s)"
+        )
+        self.stdout.write(
+            f"{'endpoint':<22} {'req':>7} {'req/s':>9} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'máx ms':>9}"
+        )
+        linhas = []
+        for nome in sorted(latencias, key=lambda nome: -len(latencias[nome])):
+            ordenados = sorted(latencias[nome])
+            linha = {
+                'concorrencia': concorrencia,
+                'endpoint': nome,
+                'requisicoes': len(ordenados),
+                'req_s': round(len(ordenados) / decorrido, 2),
+                'erros': erros[nome],
+                'p50_ms': round(percentil(ordenados, 50), 2),
+                'p95_ms': round(percentil(ordenados, 95), 2),
+                'p99_ms': round(percentil(ordenados, 99), 2),
+                'max_ms': round(ordenados[-1], 2),
+            }
+            linhas.append(linha)
+            self.stdout.write(
+                f"{nome:<22} {linha['requisicoes']:>7} {linha['req_s']:>9,.1f} {linha['erros']:>6} "
+                f"{linha['p50_ms']:>9.1f} {linha['p95_ms']:>9.1f} {linha['p99_ms']:>9.1f} {linha['max_ms']:>9.1f}"
+            )
+        return linhas
+
+    def handle(self, *args, **options):
+        mix = self.ler_mix(options['mix'])
+        if options['usuarios'] < 1 or options['ativos'] < 1 or min(options['concorrencia']) < 1:
+            raise CommandError("--usuarios, --ativos e --concorrencia devem ser positivos.")
+
+        emails, sessoes = self.semear(options)
+        resultados = []
+        try:
+            # os clients de teste do Django usam o host "testserver"
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                asyncio.run(self.autenticar(sessoes, options))
+                alvo = options['url'] or 'ASGI no processo'
+                self.stdout.write(
+                    f"Alvo: {alvo}; {len(sessoes)} usuário(s) com {options['ativos']} ativos; "
+                    f"mix: {', '.join(f'{nome}={peso:g}' for nome, peso in mix.items())}"
+                )
+                for concorrencia in options['concorrencia']:
+                    decorrido, latencias, erros = asyncio.run(self.executar(sessoes, mix, concorrencia, options))
+                    resultados += self.relatorio(concorrencia, decorrido, latencias, erros)
+        finally:
+            Usuario.objects.filter(email__in=emails).delete()
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump({
+                    'alvo': options['url'] or 'asgi',
+                    'usuarios': options['usuarios'],
+                    'ativos': options['ativos'],
+                    'duracao': options['duracao'],
+                    'mix': mix,
+                    'resultados': resultados,
+                }, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {options['saida']}."))
@@ -0,0 +1,267 @@
+"""
+Métricas por requisição expostas em ``/metrics`` no formato texto do Prometheus.
+
+``metricas_middleware`` mede, para cada requisição, a duração, a quantidade e o
+tempo total das consultas SQL e o tamanho da resposta, e agrega tudo em
+histogramas em memória rotulados pelo nome da rota (``view_name`` do
+``resolver_match``), método e, na duração, o status.
+
+As consultas são contadas por um ``execute_wrapper`` instalado em toda conexão
+aberta (sinal ``connection_created``), que soma na medição da requisição
+corrente guardada numa ``ContextVar``. O ``sync_to_async`` do asgiref copia o
+contexto para as suas threads, então as consultas das views assíncronas, feitas
+em outra thread e em outra conexão, também entram na conta.
+
+O custo por requisição é o de uma ``ContextVar`` e de quatro buscas binárias
+sob um único lock; o texto só é montado quando alguém lê ``/metrics``. Os
+histogramas são do processo: com vários workers (gunicorn) cada um expõe os
+seus.
+"""
+
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+from django.views.decorators.http import require_GET
+
+
+LIMITES_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+LIMITES_TAMANHO = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+ROTA_NAO_RESOLVIDA = 'nao_resolvida'
+
+# Qualquer outro método vira METODO_OUTRO: o método vem do cliente, inclusive
+# em URLs não resolvidas, e cada rótulo novo criaria histogramas para sempre
+METODOS_HTTP = frozenset(['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'])
+METODO_OUTRO = 'outro'
+CONTENT_TYPE_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histograma:
+    """Contagens por faixa (não acumuladas), soma e total de observações."""
+
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # a última faixa é +Inf
+        self.soma = 0
+        self.total = 0
+
+    def observar(self, valor):
+        # bisect_left: valor igual ao limite conta na faixa (le="limite"), como no Prometheus
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+# nome: (ajuda, limites, rótulos)
+METRICAS = {
+    'api_requisicao_duracao_segundos': (
+        'Duração das requisições em segundos.', LIMITES_DURACAO, ('rota', 'metodo', 'status'),
+    ),
+    'api_requisicao_consultas': (
+        'Consultas SQL executadas por requisição.', LIMITES_CONSULTAS, ('rota', 'metodo'),
+    ),
+    'api_requisicao_consultas_duracao_segundos': (
+        'Tempo total das consultas SQL por requisição, em segundos.', LIMITES_DURACAO, ('rota', 'metodo'),
+    ),
+    'api_resposta_tamanho_bytes': (
+        'Tamanho do corpo das respostas em bytes.', LIMITES_TAMANHO, ('rota', 'metodo'),
+    ),
+}
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {nome: {} for nome in METRICAS}
+
+    def _histograma(self, nome, rotulos):
+        histogramas = self._histogramas[nome]
+        histograma = histogramas.get(rotulos)
+        if histograma is None:
+            histograma = histogramas[rotulos] = Histograma(METRICAS[nome][1])
+        return histograma
+
+    def registrar_requisicao(self, rota, metodo, status, duracao, consultas, duracao_consultas, tamanho):
+        """Registra uma requisição; ``tamanho`` None (resposta assíncrona em streaming) não é registrado."""
+        with self._lock:
+            self._histograma('api_requisicao_duracao_segundos', (rota, metodo, str(status))).observar(duracao)
+            self._histograma('api_requisicao_consultas', (rota, metodo)).observar(consultas)
+            self._histograma('api_requisicao_consultas_duracao_segundos', (rota, metodo)).observar(duracao_consultas)
+            if tamanho is not None:
+                self._histograma('api_resposta_tamanho_bytes', (rota, metodo)).observar(tamanho)
+
+    def limpar(self):
+        with self._lock:
+            for histogramas in self._histogramas.values():
+                histogramas.clear()
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (0.0.4)."""
+        with self._lock:
+            copia = {
+                nome: [(rotulos, list(h.contagens), h.soma, h.total) for rotulos, h in sorted(histogramas.items())]
+                for nome, histogramas in self._histogramas.items()
+            }
+
+        linhas = []
+        for nome, series in copia.items():
+            ajuda, limites, nomes_rotulos = METRICAS[nome]
+            linhas.append(f'# HELP {nome} {ajuda}')
+            linhas.append(f'# TYPE {nome} histogram')
+            for rotulos, contagens, soma, total in series:
+                base = ','.join(f'{rotulo}="{_escapar(valor)}"' for rotulo, valor in zip(nomes_rotulos, rotulos))
+                acumulado = 0
+                for limite, contagem in zip((*limites, '+Inf'), contagens):
+                    acumulado += contagem
+                    linhas.append(f'{nome}_bucket{{{base},le="{_numero(limite)}"}} {acumulado}')
+                linhas.append(f'{nome}_sum{{{base}}} {_numero(soma)}')
+                linhas.append(f'{nome}_count{{{base}}} {total}')
+        return '\n'.join(linhas) + '\n'
+
+
+def _escapar(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _numero(valor):
+    if isinstance(valor, str) or float(valor).is_integer():
+        return str(valor if isinstance(valor, str) else int(valor))
+    return repr(float(valor))
+
+
+registro = RegistroMetricas()
+
+
+class Medicao:
+    """Consultas SQL de uma requisição, somadas pelo ``contar_consultas``."""
+
+    __slots__ = ('consultas', 'duracao_consultas')
+
+    def __init__(self):
+        self.consultas = 0
+        self.duracao_consultas = 0.0
+
+
+_medicao = ContextVar('medicao_requisicao', default=None)
+
+
+def contar_consultas(execute, sql, params, many, context):
+    medicao = _medicao.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.consultas += 1
+        medicao.duracao_consultas += time.perf_counter() - inicio
+
+
+def instalar_contador(sender=None, connection=None, **kwargs):
+    """Receptor de ``connection_created``: instala ``contar_consultas`` na conexão (uma vez)."""
+    conexoes = [connection] if connection is not None else connections.all(initialized_only=True)
+    for conexao in conexoes:
+        if contar_consultas not in conexao.execute_wrappers:
+            conexao.execute_wrappers.append(contar_consultas)
+
+
+def _rota(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.view_name if resolver_match else ROTA_NAO_RESOLVIDA
+
+
+def _metodo(request):
+    return request.method if request.method in METODOS_HTTP else METODO_OUTRO
+
+
+def _streaming_medido(conteudo, medicao, finalizar):
+    """
+    Repassa o conteúdo de um ``StreamingHttpResponse`` e só registra a
+    requisição ao final, com o tamanho total e as consultas feitas durante a
+    geração (que acontecem depois de a view retornar).
+    """
+    tamanho = 0
+    iterador = iter(conteudo)
+    try:
+        while True:
+            token = _medicao.set(medicao)
+            try:
+                parte = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                _medicao.reset(token)
+            tamanho += len(parte)
+            yield parte
+    finally:
+        finalizar(tamanho)
+
+
+@sync_and_async_middleware
+def metricas_middleware(get_response):
+    def registrar(request, response, inicio, medicao):
+        def finalizar(tamanho):
+            registro.registrar_requisicao(
+                _rota(request), _metodo(request), response.status_code, time.perf_counter() - inicio,
+                medicao.consultas, medicao.duracao_consultas, tamanho,
+            )
+
+        if not response.streaming:
+            finalizar(len(response.content))
+        elif response.is_async:
+            finalizar(None)
+        else:
+            response.streaming_content = _streaming_medido(response.streaming_content, medicao, finalizar)
+        return response
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            inicio, medicao = time.perf_counter(), Medicao()
+            token = _medicao.set(medicao)
+            try:
+                response = await get_response(request)
+            finally:
+                _medicao.reset(token)
+            return registrar(request, response, inicio, medicao)
+    else:
+        def middleware(request):
+            inicio, medicao = time.perf_counter(), Medicao()
+            token = _medicao.set(medicao)
+            try:
+                response = get_response(request)
+            finally:
+                _medicao.reset(token)
+            return registrar(request, response, inicio, medicao)
+    return middleware
+
+
+@require_GET
+def exportar_metricas(request):
+    """
+    ``GET /metrics``. Com ``METRICAS_TOKEN`` definido exige
+    ``Authorization: Bearer <token>``; sem ele o endpoint só responde com
+    ``DEBUG`` ligado, para não expor as métricas em produção por descuido.
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', None)
+    if not token and not settings.DEBUG:
+        return HttpResponse(
+            'Defina METRICAS_TOKEN para expor as métricas.\n', status=403, content_type='text/plain; charset=utf-8'
+        )
+    if token:
+        enviado = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(enviado.encode(), token.encode()):
+            resposta = HttpResponse('Não autorizado.\n', status=401, content_type='text/plain; charset=utf-8')
+            resposta['WWW-Authenticate'] = 'Bearer realm="metrics"'
+            return resposta
+    return HttpResponse(registro.exportar(), content_type=CONTENT_TYPE_PROMETHEUS)
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api_rest", "0005_rename_incentivo_fiscal_ativo_possuiimposto_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ativo",
+            name="rendimento_esperado_armazenado",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, editable=False, max_digits=20, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="ativo",
+            name="valor_investido_armazenado",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, editable=False, max_digits=20, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "rendimento_esperado_armazenado"],
+                name="ativo_usuario_rendimento_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "valor_investido_armazenado"],
+                name="ativo_usuario_valor_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:44
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+TAXAS_INICIAIS = {
+    "CDI": Decimal("0.13"),
+    "SELIC": Decimal("0.12"),
+    "IPCA": Decimal("0.04"),
+    "IGPM": Decimal("0.06"),
+}
+
+
+def criar_indexadores(apps, schema_editor):
+    Indexador = apps.get_model("api_rest", "Indexador")
+    Indexador.objects.bulk_create(
+        [
+            Indexador(nome=nome, taxa=taxa, versao=1)
+            for nome, taxa in TAXAS_INICIAIS.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api_rest", "0006_ativo_valores_armazenados"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Indexador",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "nome",
+                    models.CharField(
+                        choices=[
+                            ("CDI", "CDI"),
+                            ("SELIC", "SELIC"),
+                            ("IPCA", "IPCA"),
+                            ("IGPM", "IGPM"),
+                        ],
+                        max_length=10,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "taxa",
+                    models.DecimalField(
+                        decimal_places=6,
+                        help_text="Taxa anual do indexador em fração decimal (ex.: 0.13 para 13%).",
+                        max_digits=8,
+                    ),
+                ),
+                ("versao", models.PositiveBigIntegerField(default=0, editable=False)),
+                ("atualizado_em", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(fields=["indexador"], name="ativo_indexador_idx"),
+        ),
+        migrations.RunPython(criar_indexadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api_rest", "0007_indexador"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="ativo",
+            name="ativo_usuario_rendimento_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ativo",
+            name="ativo_usuario_valor_idx",
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(fields=["usuario", "id"], name="ativo_usuario_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "nome", "id"], name="ativo_usuario_nome_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "data_emissao", "id"],
+                name="ativo_usuario_emissao_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "data_vencimento", "id"],
+                name="ativo_usuario_vencimento_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "rendimento_esperado_armazenado", "id"],
+                name="ativo_usuario_rend_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "valor_investido_armazenado", "id"],
+                name="ativo_usuario_valor_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:48
+
+from django.db import migrations
+
+
+# Cópia do DDL de api_rest/busca.py neste ponto do histórico: a migração não
+# importa o código do app, que pode mudar depois.
+
+TRIGGERS_SQLITE = [
+    """
+    CREATE TRIGGER IF NOT EXISTS api_rest_ativo_busca_ai AFTER INSERT ON api_rest_ativo BEGIN
+        INSERT INTO api_rest_ativo_busca(rowid, nome) VALUES (new.id, new.nome);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_rest_ativo_busca_ad AFTER DELETE ON api_rest_ativo BEGIN
+        INSERT INTO api_rest_ativo_busca(api_rest_ativo_busca, rowid, nome) VALUES ('delete', old.id, old.nome);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_rest_ativo_busca_au AFTER UPDATE OF nome ON api_rest_ativo BEGIN
+        INSERT INTO api_rest_ativo_busca(api_rest_ativo_busca, rowid, nome) VALUES ('delete', old.id, old.nome);
+        INSERT INTO api_rest_ativo_busca(rowid, nome) VALUES (new.id, new.nome);
+    END
+    """,
+]
+
+
+def criar(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS ativo_nome_trgm_idx ON api_rest_ativo USING gin (UPPER(nome) gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS api_rest_ativo_busca USING fts5("
+            "nome, content='api_rest_ativo', content_rowid='id', tokenize='trigram')"
+        )
+        for trigger in TRIGGERS_SQLITE:
+            schema_editor.execute(trigger)
+        schema_editor.execute("INSERT INTO api_rest_ativo_busca(api_rest_ativo_busca) VALUES ('rebuild')")
+
+
+def remover(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS ativo_nome_trgm_idx')
+    elif vendor == 'sqlite':
+        for sufixo in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS api_rest_ativo_busca_{sufixo}')
+        schema_editor.execute('DROP TABLE IF EXISTS api_rest_ativo_busca')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api_rest", "0008_ativo_indices_paginacao"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar, remover),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api_rest", "0009_busca_por_nome"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ativo",
+            name="usuario",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "tipo", "indexador"], name="ativo_usuario_tipo_idx"
+            ),
+        ),
+    ]
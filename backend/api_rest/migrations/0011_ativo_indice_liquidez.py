@@ -0,0 +1,19 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api_rest", "0010_ativo_indices_acesso"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ativo",
+            index=models.Index(
+                fields=["usuario", "liquidez"], name="ativo_usuario_liquidez_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api_rest", "0011_ativo_indice_liquidez"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersaoCarteira",
+            fields=[
+                (
+                    "usuario",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("versao", models.PositiveBigIntegerField(default=0)),
+                ("atualizado_em", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="ativo",
+            name="atualizado_em",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
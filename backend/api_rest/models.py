@@ -1,8 +1,16 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F, Max
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.exceptions import ValidationError
 from datetime import date
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+import threading
+import time
+
+from .juros import fator_crescimento
 
 class UsuarioManager(BaseUserManager):
     def create_user(self, email, nome, password=None):
@@ -37,6 +45,35 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.nome
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        cache.delete(self._chave_ativo(self.pk))
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        resultado = super().delete(*args, **kwargs)
+        cache.delete(self._chave_ativo(pk))
+        return resultado
+
+    @staticmethod
+    def _chave_ativo(pk):
+        return f'usuario_ativo:{pk}'
+
+    @classmethod
+    def esta_ativo(cls, pk):
+        """
+        ``is_active`` do usuário (False se ele não existe mais), guardado no cache
+        por ``USUARIO_ATIVO_CACHE_SEGUNDOS``. Usado pela autenticação sem consulta:
+        desativar ou apagar o usuário corta o acesso em no máximo esse intervalo
+        (na hora, quando feito por ``save``/``delete`` no mesmo cache).
+        """
+        chave = cls._chave_ativo(pk)
+        ativo = cache.get(chave)
+        if ativo is None:
+            ativo = cls.objects.filter(pk=pk, is_active=True).exists()
+            cache.set(chave, ativo, getattr(settings, 'USUARIO_ATIVO_CACHE_SEGUNDOS', 30))
+        return ativo
+
 
 TIPOS_ATIVO = [
     ('renda_fixa_bancaria', 'Renda Fixa Bancária (CDB, LCI, LCA)'),
@@ -67,6 +104,7 @@ INDEXADORES = [
     ('IGPM', 'IGPM'),
 ]
 
+# Taxas iniciais dos indexadores; as vigentes ficam na tabela Indexador.
 INDEXADORES_VALORES = {
     'CDI': Decimal('0.13'),
     'SELIC': Decimal('0.12'),
@@ -74,8 +112,221 @@ INDEXADORES_VALORES = {
     'IGPM': Decimal('0.06'),
 }
 
+TAXA_INDEXADOR_PADRAO = Decimal('0.10')
+
+
+class Indexador(models.Model):
+    nome = models.CharField(max_length=10, choices=INDEXADORES, unique=True)
+    taxa = models.DecimalField(
+        max_digits=8, decimal_places=6,
+        help_text="Taxa anual do indexador em fração decimal (ex.: 0.13 para 13%)."
+    )
+    versao = models.PositiveBigIntegerField(default=0, editable=False)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.nome} | {self.taxa}'
+
+    def save(self, *args, **kwargs):
+        """
+        Grava a taxa com uma nova versão global e, se ela mudou, revaloriza
+        somente os ativos que usam este indexador.
+        """
+        with transaction.atomic():
+            # trava as linhas para que duas atualizações simultâneas não gerem a mesma versão
+            versoes = Indexador.objects.select_for_update().values_list('versao', flat=True)
+            anterior = Indexador.objects.filter(pk=self.pk).values_list('taxa', flat=True).first() if self.pk else None
+            self.versao = max(versoes, default=0) + 1
+            super().save(*args, **kwargs)
+
+            cache_indexadores.invalidar()
+            if anterior is None or anterior != self.taxa:
+                Ativo.objects.filter(indexador=self.nome).recalcular_valores()
+
+
+class CacheIndexadores:
+    """
+    Cache das taxas dos indexadores local ao processo.
+
+    A tabela só é relida quando a versão gravada no banco muda, e a versão só é
+    consultada uma vez a cada ``INDEXADORES_CACHE_SEGUNDOS``, de modo que a
+    avaliação dos ativos nunca faz consultas por linha. Alterações feitas no
+    próprio processo invalidam o cache na hora.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._taxas = None
+        self._versao = None
+        self._verificado_em = None
+
+    def _intervalo(self):
+        return getattr(settings, 'INDEXADORES_CACHE_SEGUNDOS', 5)
+
+    def _atualizar(self):
+        agora = time.monotonic()
+        taxas, versao = self._taxas, self._versao
+        if taxas is not None and agora - self._verificado_em < self._intervalo():
+            return taxas, versao
+        with self._lock:
+            atual = Indexador.objects.aggregate(versao=Max('versao'))['versao'] or 0
+            if self._taxas is None or atual != self._versao:
+                taxas = dict(INDEXADORES_VALORES)
+                taxas.update(Indexador.objects.values_list('nome', 'taxa'))
+                self._taxas = taxas
+                self._versao = atual
+            self._verificado_em = agora
+            return self._taxas, self._versao
+
+    def taxas(self):
+        """Taxas vigentes, por nome do indexador."""
+        return self._atualizar()[0]
+
+    def taxa(self, indexador):
+        return self.taxas().get(indexador, TAXA_INDEXADOR_PADRAO)
+
+    def versao(self):
+        """Versão das taxas em cache; muda sempre que alguma taxa é gravada."""
+        return self._atualizar()[1]
+
+    def invalidar(self):
+        with self._lock:
+            self._taxas = None
+            self._versao = None
+
+
+cache_indexadores = CacheIndexadores()
+
+# Campos que entram no cálculo de valor_investido / rendimento_esperado
+CAMPOS_VALORIZACAO = frozenset([
+    'valor_unitario',
+    'quantidade',
+    'tipo_juros',
+    'taxa_fixa',
+    'indexador',
+    'percentual_sobre_indexador',
+    'data_emissao',
+    'data_vencimento',
+    'possuiImposto',
+    'aliquotaImposto',
+])
+
+CAMPOS_VALORES_ARMAZENADOS = ['valor_investido_armazenado', 'rendimento_esperado_armazenado']
+
+TAMANHO_LOTE_VALORES = 1000
+
+
+class AtivoQuerySet(models.QuerySet):
+    """
+    Mantém as colunas de valores armazenados, ``atualizado_em`` e a versão da
+    carteira em dia também nas operações em massa, que não passam por
+    ``Ativo.save`` / ``Ativo.delete``.
+    """
+
+    def _usuarios(self):
+        return list(self.order_by().values_list('usuario_id', flat=True).distinct())
+
+    def update(self, **kwargs):
+        kwargs.setdefault('atualizado_em', timezone.now())
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            usuarios = self._usuarios()
+            if 'usuario' in kwargs or 'usuario_id' in kwargs:
+                novo = kwargs.get('usuario_id', getattr(kwargs.get('usuario'), 'pk', kwargs.get('usuario')))
+                usuarios.append(novo)
+
+            if not CAMPOS_VALORIZACAO.intersection(kwargs):
+                linhas = super().update(**kwargs)
+            else:
+                pks = list(self.values_list('pk', flat=True))
+                linhas = super().update(**kwargs)
+                for inicio in range(0, len(pks), TAMANHO_LOTE_VALORES):
+                    self.model.objects.filter(pk__in=pks[inicio:inicio + TAMANHO_LOTE_VALORES]).recalcular_valores()
+
+            VersaoCarteira.incrementar(usuarios)
+        return linhas
+
+    def delete(self):
+        with transaction.atomic(using=self.db, savepoint=False):
+            usuarios = self._usuarios()
+            resultado = super().delete()
+            VersaoCarteira.incrementar(usuarios)
+        return resultado
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        Ativo.preencher_valores_armazenados(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            criados = super().bulk_create(objs, *args, **kwargs)
+            VersaoCarteira.incrementar(ativo.usuario_id for ativo in objs)
+        return criados
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        if CAMPOS_VALORIZACAO.intersection(fields):
+            Ativo.preencher_valores_armazenados(objs)
+            fields += [f for f in CAMPOS_VALORES_ARMAZENADOS if f not in fields]
+
+        agora = timezone.now()
+        for ativo in objs:
+            ativo.atualizado_em = agora
+        if 'atualizado_em' not in fields:
+            fields.append('atualizado_em')
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            # O bulk_update do Django grava com filter(...).update(...): num QuerySet
+            # comum, para não revalorizar nem versionar de novo em self.update.
+            linhas = models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, *args, **kwargs)
+            usuarios = {ativo.usuario_id for ativo in objs}
+            if None in usuarios:
+                usuarios = self.model.objects.filter(pk__in=[a.pk for a in objs])._usuarios()
+            VersaoCarteira.incrementar(usuarios)
+        return linhas
+
+    def recalcular_valores(self, tamanho_lote=None):
+        """
+        Recalcula as colunas armazenadas dos ativos do queryset, em lotes.
+
+        Returns:
+            int: quantidade de ativos recalculados.
+        """
+        from .avaliacao import CAMPOS_AVALIACAO
+
+        tamanho_lote = tamanho_lote or TAMANHO_LOTE_VALORES
+        linhas = self.order_by('pk').values('pk', 'usuario_id', *CAMPOS_AVALIACAO).iterator(chunk_size=tamanho_lote)
+
+        total = 0
+        lote = []
+        for linha in linhas:
+            lote.append(linha)
+            if len(lote) >= tamanho_lote:
+                total += self._gravar_valores(lote)
+                lote = []
+        if lote:
+            total += self._gravar_valores(lote)
+        return total
+
+    def _gravar_valores(self, linhas):
+        from .avaliacao import rendimentos_esperados_centavos
+
+        rendimentos = rendimentos_esperados_centavos(linhas)
+        objs = [
+            self.model(
+                pk=linha['pk'],
+                usuario_id=linha['usuario_id'],
+                valor_investido_armazenado=linha['valor_unitario'] * linha['quantidade'],
+                rendimento_esperado_armazenado=rendimento,
+            )
+            for linha, rendimento in zip(linhas, rendimentos)
+        ]
+        self.model.objects.bulk_update(objs, CAMPOS_VALORES_ARMAZENADOS)
+        return len(objs)
+
+
 class Ativo(models.Model):
-    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE)
+    # sem índice próprio: ativo_usuario_id_idx (usuario, id) já atende o FK
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, db_index=False)
 
     nome = models.CharField(max_length=150)
     tipo = models.CharField(max_length=50, choices=TIPOS_ATIVO)
@@ -114,6 +365,38 @@ class Ativo(models.Model):
         help_text="Percentual de imposto sobre o rendimento (ex: 15 para 15%)."
     )
 
+    # Valores calculados, gravados para permitir ordenação, filtro e agregação no banco.
+    # Mantidos por save(), AtivoQuerySet e pela revalorização quando um indexador muda.
+    valor_investido_armazenado = models.DecimalField(
+        max_digits=20, decimal_places=2,
+        null=True, blank=True, editable=False,
+    )
+    rendimento_esperado_armazenado = models.DecimalField(
+        max_digits=20, decimal_places=2,
+        null=True, blank=True, editable=False,
+    )
+
+    # Atualizado em toda gravação, inclusive pelas operações em massa de AtivoQuerySet
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    objects = AtivoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['indexador'], name='ativo_indexador_idx'),
+            # (usuario, chave, id): índices da paginação por cursor de listar_ativos
+            models.Index(fields=['usuario', 'id'], name='ativo_usuario_id_idx'),
+            models.Index(fields=['usuario', 'nome', 'id'], name='ativo_usuario_nome_idx'),
+            models.Index(fields=['usuario', 'data_emissao', 'id'], name='ativo_usuario_emissao_idx'),
+            models.Index(fields=['usuario', 'data_vencimento', 'id'], name='ativo_usuario_vencimento_idx'),
+            models.Index(fields=['usuario', 'rendimento_esperado_armazenado', 'id'], name='ativo_usuario_rend_id_idx'),
+            models.Index(fields=['usuario', 'valor_investido_armazenado', 'id'], name='ativo_usuario_valor_id_idx'),
+            # filtros de igualdade de listar_ativos (?tipo=, ?indexador=)
+            models.Index(fields=['usuario', 'tipo', 'indexador'], name='ativo_usuario_tipo_idx'),
+            # projeção da carteira (só liquidez diária)
+            models.Index(fields=['usuario', 'liquidez'], name='ativo_usuario_liquidez_idx'),
+        ]
+
     def __str__(self):
         return f'{self.nome} | {self.get_tipo_display()} | {self.valor_unitario}'
 
@@ -176,43 +459,42 @@ class Ativo(models.Model):
         - Pós-fixado: valor * (1 + percentual_indexador * CDI) ** periodo
         - Híbrido: valor * (1 + taxa_fixa + percentual_indexador * indexador) ** periodo
 
-        Obs.: indexadores fixos, podem ser atualizados via API.
+        Obs.: taxas dos indexadores vêm da tabela Indexador (atualizável via API/admin).
 
         O rendimento retornado já considera o desconto do imposto, caso possuaImposto seja True.
         """
 
-        periodo = self.periodo_em_anos()
-        if periodo is None:
+        if not (self.data_vencimento and self.data_emissao):
             return None
 
-        periodo = Decimal(str(periodo))
+        dias = (self.data_vencimento - self.data_emissao).days
         valor = self.valor_unitario * self.quantidade
 
         if self.tipo_juros == 'prefixado':
             if self.taxa_fixa is None:
                 return None
             taxa = self.taxa_fixa / Decimal('100')
-            rendimento_bruto = valor * (1 + taxa) ** periodo
 
         elif self.tipo_juros == 'posfixado':
             if not self.indexador or self.percentual_sobre_indexador is None:
                 return None
-            taxa_indexador = INDEXADORES_VALORES.get(self.indexador, Decimal('0.10'))
+            taxa_indexador = cache_indexadores.taxa(self.indexador)
             taxa = (self.percentual_sobre_indexador / Decimal('100')) * taxa_indexador
-            rendimento_bruto = valor * (1 + taxa) ** periodo
 
         elif self.tipo_juros == 'hibrido':
             if self.taxa_fixa is None or not self.indexador or self.percentual_sobre_indexador is None:
                 return None
-            taxa_indexador = INDEXADORES_VALORES.get(self.indexador, Decimal('0.10'))
+            taxa_indexador = cache_indexadores.taxa(self.indexador)
             taxa_fixa = self.taxa_fixa / Decimal('100')
             taxa_variavel = (self.percentual_sobre_indexador / Decimal('100')) * taxa_indexador
-            taxa_total = taxa_fixa + taxa_variavel
-            rendimento_bruto = valor * (1 + taxa_total) ** periodo
+            taxa = taxa_fixa + taxa_variavel
 
         else:
             return None
 
+        # período arredondado a seis casas, como em periodo_em_anos()
+        rendimento_bruto = valor * fator_crescimento(taxa, dias, periodo_arredondado=True)
+
         if self.possuiImposto and self.aliquotaImposto is not None:
             aliquota = self.aliquotaImposto / Decimal('100')
             imposto = rendimento_bruto * aliquota
@@ -254,29 +536,24 @@ class Ativo(models.Model):
             data_resgate = self.data_vencimento  
 
         dias_corridos = (data_resgate - self.data_emissao).days
-        periodo_anos = Decimal(str(dias_corridos / 365.25))
-
-        valor_atual = self.valor_unitario * self.quantidade
 
         if self.tipo_juros == 'prefixado' and self.taxa_fixa is not None:
-            taxa_anual = self.taxa_fixa / Decimal('100')
-            valor_atual *= (1 + taxa_anual) ** periodo_anos
+            taxa = self.taxa_fixa / Decimal('100')
 
         elif self.tipo_juros == 'posfixado' and self.indexador and self.percentual_sobre_indexador is not None:
-            taxa_indexador = INDEXADORES_VALORES.get(self.indexador, Decimal('0.10'))
-            taxa_efetiva = (self.percentual_sobre_indexador / Decimal('100')) * taxa_indexador
-            valor_atual *= (1 + taxa_efetiva) ** periodo_anos
+            taxa_indexador = cache_indexadores.taxa(self.indexador)
+            taxa = (self.percentual_sobre_indexador / Decimal('100')) * taxa_indexador
 
         elif self.tipo_juros == 'hibrido' and all([self.taxa_fixa is not None, self.indexador, self.percentual_sobre_indexador is not None]):
-            taxa_indexador = INDEXADORES_VALORES.get(self.indexador, Decimal('0.10'))
+            taxa_indexador = cache_indexadores.taxa(self.indexador)
             taxa_fixa = self.taxa_fixa / Decimal('100')
             taxa_variavel = (self.percentual_sobre_indexador / Decimal('100')) * taxa_indexador
-            taxa_total = taxa_fixa + taxa_variavel
-            valor_atual *= (1 + taxa_total) ** periodo_anos
+            taxa = taxa_fixa + taxa_variavel
 
         else:
             return None  
 
+        valor_atual = self.valor_unitario * self.quantidade * fator_crescimento(taxa, dias_corridos)
         valor_atual = valor_atual.quantize(Decimal('0.01'))
 
         return {
@@ -289,3 +566,87 @@ class Ativo(models.Model):
     def valor_investido(self):
         return self.valor_unitario * self.quantidade
 
+    def atualizar_valores_armazenados(self):
+        if self.valor_unitario is None or self.quantidade is None:
+            self.valor_investido_armazenado = None
+            self.rendimento_esperado_armazenado = None
+            return
+
+        self.valor_investido_armazenado = self.valor_investido
+        try:
+            rendimento = self.rendimento_esperado()
+        except InvalidOperation:
+            rendimento = None
+        self.rendimento_esperado_armazenado = None if rendimento is None else rendimento.quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or CAMPOS_VALORIZACAO.intersection(update_fields):
+            self.atualizar_valores_armazenados()
+            if update_fields is not None:
+                update_fields = set(update_fields) | set(CAMPOS_VALORES_ARMAZENADOS)
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'atualizado_em'}
+
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+            VersaoCarteira.incrementar([self.usuario_id])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            resultado = super().delete(*args, **kwargs)
+            VersaoCarteira.incrementar([self.usuario_id])
+        return resultado
+
+    @classmethod
+    def preencher_valores_armazenados(cls, ativos):
+        """Preenche as colunas armazenadas de vários ativos de uma vez (motor em lote)."""
+        from .avaliacao import rendimentos_esperados_centavos
+
+        rendimentos = rendimentos_esperados_centavos(ativos)
+        for ativo, rendimento in zip(ativos, rendimentos):
+            if ativo.valor_unitario is None or ativo.quantidade is None:
+                ativo.valor_investido_armazenado = None
+            else:
+                ativo.valor_investido_armazenado = ativo.valor_investido
+            ativo.rendimento_esperado_armazenado = rendimento
+
+
+
+class VersaoCarteira(models.Model):
+    """
+    Versão da carteira de um usuário: incrementada a cada criação, alteração ou
+    remoção de ativo. As respostas de GET condicional (ETag) são decididas só
+    por esta linha, sem carregar os ativos.
+    """
+
+    usuario = models.OneToOneField(Usuario, on_delete=models.CASCADE, primary_key=True)
+    versao = models.PositiveBigIntegerField(default=0)
+    atualizado_em = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.usuario_id} | v{self.versao}'
+
+    @classmethod
+    def incrementar(cls, usuario_ids):
+        """Incrementa a versão das carteiras dos usuários informados (uma consulta no caso comum)."""
+        ids = {pk for pk in usuario_ids if pk is not None}
+        if not ids:
+            return
+        agora = timezone.now()
+        atualizadas = cls.objects.filter(usuario_id__in=ids).update(versao=F('versao') + 1, atualizado_em=agora)
+        if atualizadas < len(ids):
+            # Primeira alteração de alguma dessas carteiras: cria as linhas que faltam
+            # com versão 0 e incrementa de novo. O incremento sempre passa pelo UPDATE,
+            # então o insert de outra transação que chegou antes não faz perder uma
+            # alteração; as carteiras que já existiam só avançam duas versões.
+            cls.objects.bulk_create([cls(usuario_id=pk, atualizado_em=agora) for pk in ids], ignore_conflicts=True)
+            cls.objects.filter(usuario_id__in=ids).update(versao=F('versao') + 1, atualizado_em=agora)
+
+    @classmethod
+    def atual(cls, usuario_id):
+        """
+        Returns:
+            tuple: (versao, atualizado_em) — (0, None) se a carteira nunca mudou.
+        """
+        return cls.objects.filter(usuario_id=usuario_id).values_list('versao', 'atualizado_em').first() or (0, None)
@@ -0,0 +1,193 @@
+"""
+Paginação por cursor (keyset) para listagens de ativos.
+
+Em vez de OFFSET/COUNT, cada página continua a partir da posição
+``(chave de ordenação, id)`` do último item entregue, então a consulta de uma
+página profunda custa o mesmo que a da primeira: o banco desce pelo índice
+``(usuario, chave, id)`` direto até o cursor.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PaginacaoKeyset(BasePagination):
+    """
+    Pagina um queryset ordenado por um campo do modelo seguido de ``id``.
+
+    O cursor é opaco para o cliente: um JSON em base64 com o valor da chave, o
+    id, a direção e a ordenação em que foi gerado.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def __init__(self):
+        self.page_size = api_settings.PAGE_SIZE or 10
+
+    def deve_paginar(self, request):
+        """A paginação é opcional: só é aplicada quando o cliente pede uma página."""
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor is None:
+            return self.page_size
+        try:
+            tamanho = int(valor)
+        except ValueError:
+            return self.page_size
+        if tamanho <= 0:
+            return self.page_size
+        return min(tamanho, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, campo='id', decrescente=False, view=None):
+        """
+        Args:
+            queryset: ativos já filtrados (sem ordenação própria).
+            campo (str): coluna da chave de ordenação; ``id`` desempata.
+            decrescente (bool): ordem decrescente da chave.
+
+        Returns:
+            list: itens da página pedida.
+        """
+        self.request = request
+        self.modelo = queryset.model
+        self.campo = campo
+        self.decrescente = decrescente
+        self.nulo = campo != 'id' and self.modelo._meta.get_field(campo).null
+        self.tamanho = self.get_page_size(request)
+        self.ordem = f'{"-" if decrescente else ""}{campo}'
+
+        cursor = self.decode_cursor(request)
+        reverso = bool(cursor and cursor['r'])
+
+        if cursor is not None:
+            valor = cursor['v']
+            condicao = self._antes(valor, cursor['id']) if reverso else self._depois(valor, cursor['id'])
+            queryset = queryset.filter(condicao)
+
+        itens = list(queryset.order_by(*self._ordenacao(reverso))[:self.tamanho + 1])
+        mais = len(itens) > self.tamanho
+        itens = itens[:self.tamanho]
+
+        if reverso:
+            itens.reverse()
+            self.tem_anterior = mais
+            self.tem_proxima = True
+        else:
+            self.tem_anterior = cursor is not None
+            self.tem_proxima = mais
+
+        self.pagina = itens
+        return itens
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.tem_proxima or not self.pagina:
+            return None
+        return self._link(self.pagina[-1], reverso=False)
+
+    def get_previous_link(self):
+        if not self.tem_anterior:
+            return None
+        if not self.pagina:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self._link(self.pagina[0], reverso=True)
+
+    # --- cursor ---
+
+    def _link(self, item, reverso):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(item, reverso))
+
+    def _valor(self, item):
+        return item[self.campo] if isinstance(item, dict) else getattr(item, self.campo)
+
+    def _id(self, item):
+        return item['id'] if isinstance(item, dict) else item.pk
+
+    def encode_cursor(self, item, reverso):
+        valor = self._valor(item)
+        if valor is not None and not isinstance(valor, (int, str)):
+            valor = str(valor) if not hasattr(valor, 'isoformat') else valor.isoformat()
+        dados = {'o': self.ordem, 'v': valor, 'id': self._id(item), 'r': int(reverso)}
+        bruto = json.dumps(dados, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(bruto).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        codificado = request.query_params.get(self.cursor_query_param)
+        if not codificado:
+            return None
+        try:
+            bruto = base64.urlsafe_b64decode(codificado + '=' * (-len(codificado) % 4))
+            dados = json.loads(bruto)
+            if dados['o'] != self.ordem:
+                raise ValueError('cursor gerado para outra ordenação')
+            dados['id'] = int(dados['id'])
+            if dados['v'] is not None and self.campo != 'id':
+                dados['v'] = self.modelo._meta.get_field(self.campo).to_python(dados['v'])
+            dados['r'] = bool(dados['r'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return dados
+
+    # --- consultas ---
+
+    def _ordenacao(self, reverso):
+        # a direção efetiva inverte quando a página é buscada de trás para frente
+        decrescente = self.decrescente != reverso
+        if self.campo == 'id':
+            return ['-id' if decrescente else 'id']
+        if not self.nulo:
+            prefixo = '-' if decrescente else ''
+            return [prefixo + self.campo, prefixo + 'id']
+        # nulos sempre ao final na ordem de ida (e, portanto, no início na volta)
+        expressao = F(self.campo).desc if decrescente else F(self.campo).asc
+        nulos = {'nulls_first': True} if reverso else {'nulls_last': True}
+        return [expressao(**nulos), '-id' if decrescente else 'id']
+
+    def _depois(self, valor, pk):
+        """Itens que vêm depois da posição (valor, pk) na ordem de ida."""
+        maior = 'lt' if self.decrescente else 'gt'
+        if self.campo == 'id':
+            return Q(**{f'id__{maior}': pk})
+        if valor is None:
+            return Q(**{f'{self.campo}__isnull': True, f'id__{maior}': pk})
+        condicao = Q(**{f'{self.campo}__{maior}e': valor}) & (
+            Q(**{f'{self.campo}__{maior}': valor}) | Q(**{f'id__{maior}': pk})
+        )
+        if self.nulo:
+            condicao |= Q(**{f'{self.campo}__isnull': True})
+        return condicao
+
+    def _antes(self, valor, pk):
+        """Itens que vêm antes da posição (valor, pk) na ordem de ida."""
+        menor = 'gt' if self.decrescente else 'lt'
+        if self.campo == 'id':
+            return Q(**{f'id__{menor}': pk})
+        if valor is None:
+            return Q(**{f'{self.campo}__isnull': False}) | Q(**{f'id__{menor}': pk})
+        return Q(**{f'{self.campo}__{menor}e': valor}) & (
+            Q(**{f'{self.campo}__{menor}': valor}) | Q(**{f'id__{menor}': pk})
+        )
@@ -0,0 +1,178 @@
+"""
+Provisionamento de usuários em massa.
+
+``UsuarioManager.create_user`` faz, por usuário, um hash PBKDF2 (centenas de
+milissegundos, de propósito) e um INSERT. Aqui os registros são validados em
+blocos, as senhas do bloco são hasheadas em paralelo num ``ProcessPoolExecutor``
+(um processo por núcleo; o hash é CPU puro e não libera o GIL) e cada bloco é
+gravado na sua própria transação com um ``bulk_create`` de usuários e outro dos
+ativos iniciais, se houver.
+
+Cada registro é um dict com ``email``, ``nome``, ``password`` (opcional; sem
+ela o usuário fica com senha inutilizável e precisa redefini-la) e ``ativos``
+(opcional; lista no formato de ``criar_ativo``). Um registro inválido, inclusive
+por causa de um dos seus ativos, é rejeitado inteiro e não interrompe os demais.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+
+from .filtro_emails import filtro_emails
+from .models import Ativo, Usuario
+from .senhas import hashear_senhas, iniciar_processo
+from .serializers import UsuarioSerializer, validar_novos_ativos
+
+
+TAMANHO_BLOCO_PROVISIONAMENTO = 500
+
+# Abaixo disso subir processos custa mais do que hashear no processo atual
+MINIMO_SENHAS_PARALELO = 16
+
+
+def ler_ndjson(linhas):
+    """
+    Gera ``(numero_da_linha, registro)`` para cada linha JSON não vazia.
+    Linhas que não são um objeto JSON viram ``(numero, None)``.
+    """
+    for numero, linha in enumerate(linhas, start=1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except ValueError:
+            registro = None
+        yield numero, registro if isinstance(registro, dict) else None
+
+
+def _validador_usuario():
+    validador = UsuarioSerializer()
+    # a unicidade é conferida por bloco, com uma consulta só
+    email = validador.fields['email']
+    email.validators = [v for v in email.validators if not isinstance(v, UniqueValidator)]
+    validador.fields['password'].required = False
+    return validador
+
+
+def _validar_bloco(bloco, validador):
+    """
+    Returns:
+        tuple: (validos, erros) — ``(numero, usuario, senha, ativos)`` para cada
+        registro válido e ``(numero, erros)`` para cada rejeitado.
+    """
+    candidatos, erros = [], []
+    for numero, registro in bloco:
+        if registro is None:
+            erros.append((numero, {'non_field_errors': ['Registro não é um objeto JSON.']}))
+            continue
+        try:
+            dados = validador.run_validation({k: v for k, v in registro.items() if k != 'ativos'})
+        except serializers.ValidationError as exc:
+            erros.append((numero, exc.detail))
+            continue
+
+        usuario = Usuario(email=Usuario.objects.normalize_email(dados['email']), nome=dados['nome'])
+        itens = registro.get('ativos') or []
+        if not isinstance(itens, list):
+            erros.append((numero, {'ativos': ['Esperada uma lista de ativos.']}))
+            continue
+        ativos, erros_ativos = validar_novos_ativos(itens, usuario)
+        if erros_ativos:
+            erros.append((numero, {
+                f"ativos[{erro['indice']}].{campo}": mensagens
+                for erro in erros_ativos for campo, mensagens in erro['erros'].items()
+            }))
+            continue
+        candidatos.append((numero, usuario, dados.get('password'), ativos))
+
+    existentes = set(
+        Usuario.objects.filter(email__in=[u.email for _, u, _, _ in candidatos]).values_list('email', flat=True)
+    )
+    validos, vistos = [], set()
+    for candidato in candidatos:
+        numero, usuario = candidato[:2]
+        if usuario.email in existentes or usuario.email in vistos:
+            erros.append((numero, {'email': ['Já existe usuário com este email.']}))
+            continue
+        vistos.add(usuario.email)
+        validos.append(candidato)
+    return validos, sorted(erros, key=lambda erro: erro[0])
+
+
+def _hashear(senhas, executor, processos):
+    if executor is None or len(senhas) < MINIMO_SENHAS_PARALELO:
+        return hashear_senhas(senhas)
+    tamanho = -(-len(senhas) // processos)
+    partes = [senhas[i:i + tamanho] for i in range(0, len(senhas), tamanho)]
+    return [hash_ for parte in executor.map(hashear_senhas, partes) for hash_ in parte]
+
+
+def provisionar_usuarios(registros, processos=None, tamanho_bloco=TAMANHO_BLOCO_PROVISIONAMENTO,
+                         ao_rejeitar=None, ao_gravar_bloco=None):
+    """
+    Valida e cria os usuários (e seus ativos iniciais) em blocos de ``tamanho_bloco``.
+
+    Args:
+        registros: iterável de ``(numero, dict)`` (ex.: ``ler_ndjson`` ou ``importacao.ler_csv``).
+        processos (int): processos para o hash das senhas (padrão: núcleos da máquina).
+        ao_rejeitar: chamado com ``(numero, erros)`` para cada registro rejeitado.
+        ao_gravar_bloco: chamado com ``(usuarios, ativos, rejeitados)`` acumulados após cada bloco.
+
+    Returns:
+        tuple: (usuarios, ativos, rejeitados)
+    """
+    processos = processos or os.cpu_count() or 1
+    validador = _validador_usuario()
+    registros = iter(registros)
+    usuarios_criados = ativos_criados = rejeitados = 0
+
+    pool = (
+        ProcessPoolExecutor(processos, initializer=iniciar_processo)
+        if processos > 1 else nullcontext()
+    )
+    with pool as executor:
+        while True:
+            bloco = list(islice(registros, tamanho_bloco))
+            if not bloco:
+                return usuarios_criados, ativos_criados, rejeitados
+
+            validos, erros = _validar_bloco(bloco, validador)
+            for numero, erro in erros:
+                if ao_rejeitar is not None:
+                    ao_rejeitar(numero, erro)
+
+            com_senha = [(usuario, senha) for _, usuario, senha, _ in validos if senha]
+            hashes = _hashear([senha for _, senha in com_senha], executor, processos)
+            for (usuario, _), hash_ in zip(com_senha, hashes):
+                usuario.password = hash_
+            for _, usuario, senha, _ in validos:
+                if not senha:
+                    usuario.password = make_password(None)
+
+            usuarios = [usuario for _, usuario, _, _ in validos]
+            ativos = []
+            with transaction.atomic():
+                Usuario.objects.bulk_create(usuarios, batch_size=tamanho_bloco)
+                for _, usuario, _, ativos_usuario in validos:
+                    for ativo in ativos_usuario:
+                        ativo.usuario = usuario
+                    ativos.extend(ativos_usuario)
+                if ativos:
+                    Ativo.objects.bulk_create(ativos, batch_size=tamanho_bloco)
+
+            # bulk_create não dispara post_save
+            for usuario in usuarios:
+                filtro_emails.adicionar(usuario.email)
+
+            usuarios_criados += len(usuarios)
+            ativos_criados += len(ativos)
+            rejeitados += len(erros)
+            if ao_gravar_bloco is not None:
+                ao_gravar_bloco(usuarios_criados, ativos_criados, rejeitados)
@@ -0,0 +1,79 @@
+"""
+Resumo da carteira calculado no banco.
+
+Uma única consulta agrupa os ativos por (tipo, tipo_juros, indexador, liquidez)
+e soma o valor investido e o rendimento esperado armazenado (gravado pelo motor
+de avaliação). Os totais por dimensão são obtidos somando esses grupos, cujo
+número é limitado pelas combinações de choices, então nem o tamanho da resposta
+nem o trabalho feito aqui crescem com a quantidade de ativos.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, Q, Sum
+
+
+DIMENSOES_RESUMO = ['tipo', 'tipo_juros', 'indexador', 'liquidez']
+
+_CENTAVOS = Decimal('0.01')
+_ZERO = Decimal('0.00')
+
+
+def _somar(destino, grupo):
+    destino['quantidade_ativos'] += grupo['quantidade_ativos']
+    destino['valor_investido'] += grupo['valor_investido'] or _ZERO
+    destino['rendimento_esperado'] += grupo['rendimento_esperado'] or _ZERO
+    destino['ativos_sem_rendimento'] += grupo['ativos_sem_rendimento']
+
+
+def _totais_vazios():
+    return {
+        'quantidade_ativos': 0,
+        'valor_investido': _ZERO,
+        'rendimento_esperado': _ZERO,
+        'ativos_sem_rendimento': 0,
+    }
+
+
+def resumir_carteira(ativos):
+    """
+    Soma valor investido e rendimento esperado de ``ativos``, no total e por
+    tipo, tipo de juros, indexador e liquidez.
+
+    Ativos sem rendimento calculável (dados incompletos) entram no valor
+    investido e são contados em ``ativos_sem_rendimento``.
+
+    Returns:
+        dict: totais gerais mais uma lista ``por_<dimensão>`` para cada dimensão.
+    """
+    valores = DecimalField(max_digits=24, decimal_places=2)
+    grupos = (
+        ativos.order_by()
+        .values(*DIMENSOES_RESUMO)
+        .annotate(
+            quantidade_ativos=Count('id'),
+            valor_investido=Sum(F('valor_unitario') * F('quantidade'), output_field=valores),
+            rendimento_esperado=Sum('rendimento_esperado_armazenado', output_field=valores),
+            ativos_sem_rendimento=Count('id', filter=Q(rendimento_esperado_armazenado__isnull=True)),
+        )
+    )
+
+    resumo = _totais_vazios()
+    por_dimensao = {dimensao: {} for dimensao in DIMENSOES_RESUMO}
+    for grupo in grupos:
+        _somar(resumo, grupo)
+        for dimensao in DIMENSOES_RESUMO:
+            chave = grupo[dimensao]
+            if chave not in por_dimensao[dimensao]:
+                por_dimensao[dimensao][chave] = {dimensao: chave, **_totais_vazios()}
+            _somar(por_dimensao[dimensao][chave], grupo)
+
+    for dimensao, totais in por_dimensao.items():
+        # nulos (ex.: prefixados sem indexador) por último
+        chaves = sorted(totais, key=lambda chave: (chave is None, chave or ''))
+        resumo[f'por_{dimensao}'] = [totais[chave] for chave in chaves]
+
+    for linha in [resumo, *(t for d in por_dimensao.values() for t in d.values())]:
+        linha['valor_investido'] = linha['valor_investido'].quantize(_CENTAVOS)
+        linha['rendimento_esperado'] = linha['rendimento_esperado'].quantize(_CENTAVOS)
+    return resumo
@@ -0,0 +1,19 @@
+"""
+Hash de senhas em processos auxiliares (usado por ``provisionamento``).
+
+Fica num módulo à parte, sem importar models, porque com o método ``spawn``
+cada processo auxiliar importa este módulo antes de ``django.setup()``.
+"""
+
+import django
+from django.contrib.auth.hashers import make_password
+
+
+def iniciar_processo():
+    """``initializer`` do pool: prepara o Django (sem efeito com ``fork``)."""
+    django.setup()
+
+
+def hashear_senhas(senhas):
+    """Aplica ``make_password`` a cada senha, na ordem."""
+    return [make_password(senha) for senha in senhas]
@@ -1,5 +1,13 @@
-from rest_framework import serializers
-from .models import Ativo, Usuario
+import decimal
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import Ativo, Indexador, Usuario, CAMPOS_VALORES_ARMAZENADOS
+from .avaliacao import CAMPOS_AVALIACAO, rendimentos_esperados
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 
@@ -11,16 +19,39 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['nome'] = user.nome  
         return token
 
+class AtivoListSerializer(serializers.ListSerializer):
+    """
+    Serializa listas de ativos calculando o rendimento esperado de todos de uma
+    vez pelo motor de avaliação em lote, em vez de um cálculo por ativo.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        ativos = list(iterable)
+
+        rendimentos = rendimentos_esperados(ativos)
+        self.child._rendimentos_lote = {id(ativo): r for ativo, r in zip(ativos, rendimentos)}
+        try:
+            return [self.child.to_representation(item) for item in ativos]
+        finally:
+            self.child._rendimentos_lote = None
+
+
 class AtivoSerializer(serializers.ModelSerializer):
     rendimento_esperado = serializers.SerializerMethodField()
     valor_investido = serializers.ReadOnlyField()
 
+    _rendimentos_lote = None
+
     class Meta:
         model = Ativo
-        fields = '__all__'
+        exclude = CAMPOS_VALORES_ARMAZENADOS
         read_only_fields = ['usuario']
+        list_serializer_class = AtivoListSerializer
 
     def get_rendimento_esperado(self, obj):
+        if self._rendimentos_lote is not None and id(obj) in self._rendimentos_lote:
+            return self._rendimentos_lote[id(obj)]
         resultado = obj.rendimento_esperado()
         if resultado is None:
             return None
@@ -29,11 +60,206 @@ class AtivoSerializer(serializers.ModelSerializer):
     def get_valor_investido(self, obj):
         return float(obj.valor_investido)
 
+class AtivoLeitura:
+    """
+    Caminho rápido, somente leitura, para listas de ativos.
+
+    Produz exatamente os mesmos itens que ``AtivoSerializer(many=True).data``
+    (o JSON renderizado é idêntico byte a byte), mas a partir de linhas de
+    ``values()``: sem instanciar ``Ativo`` e sem passar campo a campo pelos
+    fields do DRF. Os conversores são montados uma única vez a partir dos
+    próprios fields do ``AtivoSerializer``, então campos novos no serializer
+    aparecem aqui automaticamente.
+    """
+
+    def __init__(self):
+        self.campos = []
+        colunas = set(CAMPOS_AVALIACAO)
+        for nome, field in AtivoSerializer().fields.items():
+            if field.write_only:
+                continue
+            if nome in ('rendimento_esperado', 'valor_investido'):
+                self.campos.append((nome, None, None))
+                continue
+            coluna = field.source + '_id' if isinstance(field, serializers.RelatedField) else field.source
+            self.campos.append((nome, coluna, self._conversor(field)))
+            colunas.add(coluna)
+        self.colunas = sorted(colunas)
+
+    @staticmethod
+    def _conversor(field):
+        """Função aplicada aos valores não nulos do field (None = valor já pronto)."""
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return None
+        if isinstance(field, (serializers.IntegerField, serializers.CharField, serializers.ChoiceField)):
+            return None
+        if isinstance(field, serializers.BooleanField):
+            return bool
+        if isinstance(field, serializers.DateField):
+            formato = getattr(field, 'format', api_settings.DATE_FORMAT)
+            if formato is not None and formato.lower() == ISO_8601:
+                return date.isoformat
+        if isinstance(field, serializers.DecimalField) and field.decimal_places is not None:
+            coagir = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+            if coagir and not field.localize and not field.normalize_output:
+                contexto = decimal.getcontext().copy()
+                if field.max_digits is not None:
+                    contexto.prec = field.max_digits
+                expoente = Decimal('.1') ** field.decimal_places
+                arredondamento = field.rounding
+
+                def decimal_como_texto(valor):
+                    return '{:f}'.format(valor.quantize(expoente, rounding=arredondamento, context=contexto))
+                return decimal_como_texto
+        return field.to_representation
+
+    def serializar(self, linhas):
+        """
+        Args:
+            linhas: dicts de ``values(*self.colunas)``.
+
+        Returns:
+            list: um dict por linha, no formato de ``AtivoSerializer``.
+        """
+        linhas = list(linhas)
+        rendimentos = rendimentos_esperados(linhas)
+        resultado = []
+        for linha, rendimento in zip(linhas, rendimentos):
+            item = {}
+            for nome, coluna, conversor in self.campos:
+                if coluna is None:
+                    if nome == 'rendimento_esperado':
+                        item[nome] = rendimento
+                    else:
+                        item[nome] = linha['valor_unitario'] * linha['quantidade']
+                    continue
+                valor = linha[coluna]
+                item[nome] = valor if valor is None or conversor is None else conversor(valor)
+            resultado.append(item)
+        return resultado
+
+
+_ativo_leitura = None
+
+
+def ativo_leitura():
+    """Instância compartilhada de ``AtivoLeitura`` (montada no primeiro uso)."""
+    global _ativo_leitura
+    if _ativo_leitura is None:
+        _ativo_leitura = AtivoLeitura()
+    return _ativo_leitura
+
+
+def serializar_ativos(ativos):
+    """Serializa um queryset de ativos pelo caminho rápido de ``AtivoLeitura``."""
+    leitura = ativo_leitura()
+    return leitura.serializar(ativos.values(*leitura.colunas))
+
+
+def _erros_clean(exc):
+    if hasattr(exc, 'error_dict'):
+        return exc.message_dict
+    return {'non_field_errors': exc.messages}
+
+
+def validar_novos_ativos(itens, usuario, inicio=0):
+    """
+    Valida vários ativos de entrada numa única passada, com as regras de campo
+    do AtivoSerializer e as regras de negócio de Ativo.clean.
+
+    Args:
+        itens: lista de dicts no formato aceito por criar_ativo.
+        usuario: dono dos ativos.
+        inicio (int): índice do primeiro item, usado nas mensagens de erro.
+
+    Returns:
+        tuple: (ativos, erros) — instâncias não salvas dos itens válidos e um
+        {'indice': int, 'erros': dict} para cada item rejeitado.
+    """
+    validador = AtivoSerializer()
+    ativos, erros = [], []
+
+    for indice, item in enumerate(itens, start=inicio):
+        try:
+            dados = validador.run_validation(item)
+        except serializers.ValidationError as exc:
+            erros.append({'indice': indice, 'erros': exc.detail})
+            continue
+
+        ativo = Ativo(usuario=usuario, **dados)
+        try:
+            ativo.clean()
+        except DjangoValidationError as exc:
+            erros.append({'indice': indice, 'erros': _erros_clean(exc)})
+            continue
+        ativos.append(ativo)
+
+    return ativos, erros
+
+
+def validar_atualizacoes_ativos(itens, existentes):
+    """
+    Valida atualizações parciais de vários ativos numa única passada.
+
+    Args:
+        itens: lista de dicts, cada um com 'id' e os campos a alterar.
+        existentes (dict): ativos do usuário por id (ex.: ``in_bulk``).
+
+    Returns:
+        tuple: (ativos, campos, erros) — instâncias já alteradas, o conjunto
+        de campos alterados e um {'indice', 'erros'} por item rejeitado.
+    """
+    validador = AtivoSerializer(partial=True)
+    ativos, campos, erros = [], set(), []
+    vistos = set()
+
+    for indice, item in enumerate(itens):
+        pk = item.get('id') if isinstance(item, dict) else None
+        ativo = existentes.get(pk) if isinstance(pk, int) else None
+        if ativo is None:
+            erros.append({'indice': indice, 'erros': {'id': ['Ativo não encontrado.']}})
+            continue
+        if pk in vistos:
+            erros.append({'indice': indice, 'erros': {'id': ['Ativo repetido no lote.']}})
+            continue
+        vistos.add(pk)
+
+        dados_item = {k: v for k, v in item.items() if k != 'id'}
+        try:
+            dados = validador.run_validation(dados_item)
+        except serializers.ValidationError as exc:
+            erros.append({'indice': indice, 'erros': exc.detail})
+            continue
+
+        for campo, valor in dados.items():
+            setattr(ativo, campo, valor)
+        try:
+            ativo.clean()
+        except DjangoValidationError as exc:
+            erros.append({'indice': indice, 'erros': _erros_clean(exc)})
+            continue
+        ativos.append(ativo)
+        campos.update(dados)
+
+    return ativos, campos, erros
+
+
 class AtivoNomeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ativo
         fields = ['nome']
 
+class IndexadorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Indexador
+        fields = ['nome', 'taxa', 'atualizado_em']
+        read_only_fields = ['nome', 'atualizado_em']
+
+    def validate_taxa(self, value):
+        if value <= -1:
+            raise serializers.ValidationError("A taxa do indexador deve ser maior que -100%.")
+        return value
+
 class UsuarioSerializer(serializers.ModelSerializer):
     class Meta:
         model = Usuario
@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import Usuario, Ativo, cache_indexadores
+from .serializers import AtivoSerializer
+
+
+class ViewsAssincronasTest(TestCase):
+    def setUp(self):
+        cache_indexadores.invalidar()
+        self.usuario = Usuario.objects.create_user(
+            email='async@exemplo.com', nome='Async', password='senha123'
+        )
+        outro = Usuario.objects.create_user(email='outro@exemplo.com', nome='Outro', password='senha123')
+        self.cabecalhos = {'Authorization': f'Bearer {AccessToken.for_user(self.usuario)}'}
+
+        emissao = date(2024, 1, 1)
+        self.ativos = Ativo.objects.bulk_create([
+            Ativo(
+                usuario=usuario, nome=f'CDB {i}', tipo='renda_fixa_bancaria',
+                valor_unitario=Decimal('1000.00') + i, quantidade=1 + i,
+                tipo_juros='posfixado' if i % 2 else 'prefixado',
+                taxa_fixa=None if i % 2 else Decimal('11.25'),
+                indexador='CDI' if i % 2 else None,
+                percentual_sobre_indexador=Decimal('104.00') if i % 2 else None,
+                data_emissao=emissao, data_vencimento=emissao + timedelta(days=720), liquidez='diaria',
+            )
+            for i, usuario in enumerate([self.usuario] * 4 + [outro])
+        ])
+
+    def renderizar(self, ativos, many=True):
+        return JSONRenderer().render(AtivoSerializer(ativos, many=many).data)
+
+    async def test_listagem_igual_a_sincrona(self):
+        resposta = await self.async_client.get(
+            reverse('listar_ativos_async'), {'ordering': 'id'}, headers=self.cabecalhos
+        )
+        self.assertEqual(resposta.status_code, 200)
+        esperado = await sync_to_async(self.renderizar)(Ativo.objects.filter(usuario=self.usuario).order_by('id'))
+        self.assertEqual(resposta.content, esperado)
+
+        resposta = await self.async_client.get(
+            reverse('listar_ativos_async'), {'ordering': 'tamanho'}, headers=self.cabecalhos
+        )
+        self.assertEqual(resposta.status_code, 400)
+
+    async def test_consulta_so_do_proprio_usuario(self):
+        url = reverse('consultar_ativo_por_id_async', args=[self.ativos[1].pk])
+        resposta = await self.async_client.get(url, headers=self.cabecalhos)
+        self.assertEqual(resposta.content, await sync_to_async(self.renderizar)(self.ativos[1], many=False))
+
+        url = reverse('consultar_ativo_por_id_async', args=[self.ativos[4].pk])
+        self.assertEqual((await self.async_client.get(url, headers=self.cabecalhos)).status_code, 404)
+
+    async def test_exige_token(self):
+        resposta = await self.async_client.get(reverse('listar_ativos_async'))
+        self.assertEqual(resposta.status_code, 401)
+        self.assertIn('WWW-Authenticate', resposta)
+
+        resposta = await self.async_client.get(
+            reverse('listar_ativos_async'), headers={'Authorization': 'Bearer invalido'}
+        )
+        self.assertEqual(resposta.status_code, 401)
+
+    async def test_escritas(self):
+        dados = {
+            'nome': 'LCI Async', 'tipo': 'renda_fixa_bancaria', 'valor_unitario': '500.00', 'quantidade': 3,
+            'tipo_juros': 'prefixado', 'taxa_fixa': '9.50', 'data_emissao': '2024-03-01',
+            'data_vencimento': '2025-03-01', 'liquidez': 'diaria',
+        }
+        resposta = await self.async_client.post(
+            reverse('criar_ativo_async'), dados, content_type='application/json', headers=self.cabecalhos
+        )
+        self.assertEqual(resposta.status_code, 201, resposta.content)
+        criado = await Ativo.objects.aget(pk=resposta.json()['id'])
+        self.assertEqual((criado.usuario_id, criado.valor_investido_armazenado), (self.usuario.pk, Decimal('1500.00')))
+
+        url = reverse('atualizar_ativo_async', args=[criado.pk])
+        resposta = await self.async_client.patch(
+            url, {'quantidade': 4}, content_type='application/json', headers=self.cabecalhos
+        )
+        self.assertEqual(resposta.json()['valor_investido'], 2000)
+        resposta = await self.async_client.put(
+            url, {'quantidade': 4}, content_type='application/json', headers=self.cabecalhos
+        )
+        self.assertEqual(resposta.status_code, 400)  # PUT exige todos os campos
+        resposta = await self.async_client.patch(
+            url, b'{', content_type='application/json', headers=self.cabecalhos
+        )
+        self.assertEqual(resposta.status_code, 400)
+
+        url = reverse('deletar_ativo_async', args=[criado.pk])
+        self.assertEqual((await self.async_client.get(url, headers=self.cabecalhos)).status_code, 405)
+        self.assertEqual((await self.async_client.delete(url, headers=self.cabecalhos)).status_code, 204)
+        self.assertFalse(await Ativo.objects.filter(pk=criado.pk).aexists())
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo
+
+
+class JWTSemConsultaTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.usuario = Usuario.objects.create_user(
+            email='jwt@exemplo.com', nome='Token', password='senha123'
+        )
+        emissao = date(2024, 1, 1)
+        self.ativo = Ativo.objects.create(
+            usuario=self.usuario, nome='CDB', tipo='renda_fixa_bancaria', valor_unitario=Decimal('100.00'),
+            quantidade=1, tipo_juros='prefixado', taxa_fixa=Decimal('10.00'),
+            data_emissao=emissao, data_vencimento=emissao + timedelta(days=365), liquidez='diaria',
+        )
+        resposta = APIClient().post(
+            reverse('token_obtain_pair'), {'email': 'jwt@exemplo.com', 'password': 'senha123'}, format='json'
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {resposta.data['access']}")
+
+    def consultas_usuario(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200, resposta.content)
+        return [q['sql'] for q in consultas.captured_queries if 'api_rest_usuario' in q['sql']]
+
+    def test_leitura_sem_consultar_o_usuario(self):
+        url = reverse('listar_ativos')
+        self.assertEqual(len(self.consultas_usuario(url)), 1)  # is_active, depois fica em cache
+        self.assertEqual(self.consultas_usuario(url), [])
+        self.assertEqual(self.consultas_usuario(reverse('consultar_ativo_por_id', args=[self.ativo.pk])), [])
+        self.assertEqual(self.consultas_usuario(reverse('resumo_ativos')), [])
+
+    def test_escrita_continua_carregando_o_usuario(self):
+        resposta = self.client.patch(
+            reverse('atualizar_ativo', args=[self.ativo.pk]), {'quantidade': 3}, format='json'
+        )
+        self.assertEqual(resposta.status_code, 200)
+
+    def test_usuario_desativado_perde_o_acesso(self):
+        self.consultas_usuario(reverse('listar_ativos'))
+        self.usuario.is_active = False
+        self.usuario.save()
+        self.assertEqual(self.client.get(reverse('listar_ativos')).status_code, 401)
+
+    def test_revogacao_por_update_respeita_o_ttl(self):
+        self.consultas_usuario(reverse('listar_ativos'))
+        Usuario.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        self.assertEqual(self.client.get(reverse('listar_ativos')).status_code, 200)
+
+        cache.delete(Usuario._chave_ativo(self.usuario.pk))  # TTL expirado
+        self.assertEqual(self.client.get(reverse('listar_ativos')).status_code, 401)
+
+    def test_usuario_apagado_perde_o_acesso(self):
+        self.consultas_usuario(reverse('listar_ativos'))
+        self.usuario.delete()
+        self.assertEqual(self.client.get(reverse('listar_ativos')).status_code, 401)
@@ -0,0 +1,100 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from .avaliacao import calcular_resgates, rendimentos_esperados, rendimentos_esperados_centavos
+from .models import Usuario, Ativo
+from .serializers import AtivoSerializer
+
+
+def ativo_aleatorio(rng, usuario=None):
+    """Monta um ativo válido (não salvo) com dados sorteados."""
+    tipo_juros = rng.choice(['prefixado', 'posfixado', 'hibrido'])
+    data_emissao = date(2020, 1, 1) + timedelta(days=rng.randint(0, 1500))
+    possui_imposto = rng.random() < 0.5
+    dados = {
+        'usuario': usuario,
+        'nome': 'Ativo',
+        'tipo': 'renda_fixa_bancaria',
+        'valor_unitario': Decimal(rng.randint(1, 10_000_000)) / 100,
+        'quantidade': rng.randint(1, 500),
+        'tipo_juros': tipo_juros,
+        'taxa_fixa': None,
+        'indexador': None,
+        'percentual_sobre_indexador': None,
+        'data_emissao': data_emissao,
+        'data_vencimento': data_emissao + timedelta(days=rng.randint(1, 365 * 30)),
+        'liquidez': rng.choice(['diaria', 'apos_vencimento']),
+        'possuiImposto': possui_imposto,
+        'aliquotaImposto': Decimal(rng.choice(['15.00', '17.50', '20.00', '22.50'])) if possui_imposto else None,
+    }
+    if tipo_juros in ('prefixado', 'hibrido'):
+        dados['taxa_fixa'] = Decimal(rng.randint(0, 2500)) / 100
+    if tipo_juros in ('posfixado', 'hibrido'):
+        dados['indexador'] = rng.choice(['CDI', 'SELIC', 'IPCA', 'IGPM'])
+        dados['percentual_sobre_indexador'] = Decimal(rng.randint(5000, 15000)) / 100
+    return Ativo(**dados)
+
+
+class AvaliacaoLoteTest(TestCase):
+    def setUp(self):
+        self.rng = random.Random(1234)
+        self.ativos = [ativo_aleatorio(self.rng) for _ in range(2000)]
+
+    def test_rendimento_igual_ao_metodo_ate_o_centavo(self):
+        esperados = [a.rendimento_esperado().quantize(Decimal('0.01')) for a in self.ativos]
+        self.assertEqual(rendimentos_esperados_centavos(self.ativos), esperados)
+
+    def test_rendimento_float_proximo_do_metodo(self):
+        for ativo, valor in zip(self.ativos, rendimentos_esperados(self.ativos)):
+            self.assertAlmostEqual(valor, float(ativo.rendimento_esperado()), delta=0.005)
+
+    def test_resgate_igual_ao_metodo(self):
+        for data_resgate in (date(2021, 6, 15), date(2030, 1, 1), date(2060, 1, 1)):
+            esperados = [a.calcular_resgate(data_resgate) for a in self.ativos]
+            self.assertEqual(calcular_resgates(self.ativos, data_resgate), esperados)
+
+    def test_aceita_linhas_de_values(self):
+        usuario = Usuario.objects.create_user(email='lote@exemplo.com', nome='Lote', password='senha')
+        for ativo in self.ativos[:50]:
+            ativo.usuario = usuario
+        Ativo.objects.bulk_create(self.ativos[:50])
+
+        queryset = Ativo.objects.filter(usuario=usuario).order_by('id')
+        esperados = [a.rendimento_esperado().quantize(Decimal('0.01')) for a in queryset]
+        self.assertEqual(rendimentos_esperados_centavos(queryset), esperados)
+
+    def test_dados_insuficientes_retorna_none(self):
+        ativo = ativo_aleatorio(self.rng)
+        ativo.tipo_juros = 'prefixado'
+        ativo.taxa_fixa = None
+        self.assertEqual(rendimentos_esperados([ativo]), [None])
+        self.assertEqual(calcular_resgates([ativo]), [None])
+
+    def test_lista_vazia(self):
+        self.assertEqual(rendimentos_esperados([]), [])
+        self.assertEqual(calcular_resgates([]), [])
+
+    def test_serializer_many_usa_lote(self):
+        usuario = Usuario.objects.create_user(email='ser@exemplo.com', nome='Ser', password='senha')
+        for ativo in self.ativos[:20]:
+            ativo.usuario = usuario
+        Ativo.objects.bulk_create(self.ativos[:20])
+
+        queryset = Ativo.objects.filter(usuario=usuario).order_by('id')
+        lista = AtivoSerializer(queryset, many=True).data
+        for item, ativo in zip(lista, queryset):
+            individual = AtivoSerializer(ativo).data
+            self.assertAlmostEqual(item['rendimento_esperado'], individual['rendimento_esperado'], delta=0.005)
+
+    def test_meio_centavo_usa_calculo_exato(self):
+        ativo = ativo_aleatorio(self.rng)
+        ativo.tipo_juros = 'prefixado'
+        ativo.taxa_fixa = Decimal('0.00')
+        ativo.valor_unitario = Decimal('0.10')
+        ativo.quantidade = 1
+        ativo.possuiImposto = True
+        ativo.aliquotaImposto = Decimal('15.00')
+        self.assertEqual(rendimentos_esperados_centavos([ativo]), [Decimal('0.08')])
@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .busca import TABELA_BUSCA, buscar_por_nome, criar_indice_busca
+from .models import Usuario, Ativo
+
+
+class BuscaPorNomeTest(TestCase):
+    NOMES = [
+        'CDB Banco Inter 2027', 'CDB Inter', 'LCI Itaú', 'Tesouro IPCA+ 2035',
+        'Tesouro Selic 2029', 'Debênture Petrobras', 'cdb xp investimentos',
+    ]
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='busca@exemplo.com', nome='Busca', password='senha123'
+        )
+        outro = Usuario.objects.create_user(
+            email='outro@exemplo.com', nome='Outro', password='senha123'
+        )
+        emissao = date(2024, 1, 1)
+        for usuario in (self.usuario, outro):
+            for nome in self.NOMES:
+                Ativo.objects.create(
+                    usuario=usuario, nome=nome, tipo='renda_fixa_bancaria',
+                    valor_unitario=Decimal('100.00'), quantidade=1,
+                    tipo_juros='prefixado', taxa_fixa=Decimal('10.00'),
+                    data_emissao=emissao, data_vencimento=emissao + timedelta(days=365),
+                    liquidez='diaria',
+                )
+        self.ativos = Ativo.objects.filter(usuario=self.usuario)
+
+    def nomes(self, termo):
+        return [a.nome for a in buscar_por_nome(self.ativos, termo)]
+
+    def test_mesmo_resultado_que_icontains(self):
+        for termo in ['cdb', 'INTER', 'Tesouro', '2035', 'ipca+', 'xp', 'nada disso', 'a"b']:
+            esperado = set(self.ativos.filter(nome__icontains=termo).values_list('id', flat=True))
+            obtido = set(buscar_por_nome(self.ativos, termo).values_list('id', flat=True))
+            self.assertEqual(obtido, esperado, termo)
+
+    def test_ordenado_por_similaridade(self):
+        self.assertEqual(self.nomes('inter'), ['CDB Inter', 'CDB Banco Inter 2027'])
+
+    def test_indice_acompanha_alteracoes(self):
+        ativo = self.ativos.get(nome='LCI Itaú')
+        ativo.nome = 'LCA Bradesco'
+        ativo.save()
+        self.assertEqual(self.nomes('Itaú'), [])
+        self.assertEqual(self.nomes('bradesco'), ['LCA Bradesco'])
+
+        ativo.delete()
+        self.assertEqual(self.nomes('bradesco'), [])
+
+    def test_recria_triggers_perdidos(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Triggers FTS5 existem apenas no SQLite.')
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {TABELA_BUSCA}_ai')
+        self.ativos.filter(nome='CDB Inter').update(nome='CDB Inter antigo')
+        Ativo.objects.create(
+            usuario=self.usuario, nome='CDB Novo', tipo='renda_fixa_bancaria',
+            valor_unitario=Decimal('100.00'), quantidade=1, tipo_juros='prefixado',
+            taxa_fixa=Decimal('10.00'), data_emissao=date(2024, 1, 1),
+            data_vencimento=date(2025, 1, 1), liquidez='diaria',
+        )
+        self.assertEqual(self.nomes('Novo'), [])
+
+        criar_indice_busca(connection)
+        self.assertEqual(self.nomes('Novo'), ['CDB Novo'])
+
+    def test_busca_via_api(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+
+        resposta = client.get(reverse('consultar_ativo_por_nome', args=['tesouro']))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual([a['nome'] for a in resposta.data], ['Tesouro IPCA+ 2035', 'Tesouro Selic 2029'])
+
+        resposta = client.get(reverse('consultar_ativo_por_nome', args=['inexistente']))
+        self.assertEqual(resposta.status_code, 404)
+
+        resposta = client.get(reverse('listar_ativos'), {'nome': 'cdb'})
+        self.assertEqual(
+            [a['nome'] for a in resposta.data],
+            ['CDB Inter', 'CDB Banco Inter 2027', 'cdb xp investimentos'],
+        )
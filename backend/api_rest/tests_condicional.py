@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo, Indexador, VersaoCarteira, cache_indexadores
+
+
+class GetCondicionalTest(TestCase):
+    def setUp(self):
+        cache_indexadores.invalidar()
+        self.addCleanup(cache_indexadores.invalidar)
+
+        self.usuario = Usuario.objects.create_user(
+            email='etag@exemplo.com', nome='ETag', password='senha123'
+        )
+        self.outro = Usuario.objects.create_user(
+            email='outro@exemplo.com', nome='Outro', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        self.ativo = self.criar(self.usuario)
+
+    def criar(self, usuario, **kwargs):
+        emissao = date(2024, 1, 1)
+        dados = dict(
+            usuario=usuario, nome='CDB', tipo='renda_fixa_bancaria', valor_unitario=Decimal('100.00'),
+            quantidade=1, tipo_juros='posfixado', indexador='CDI', percentual_sobre_indexador=Decimal('100.00'),
+            data_emissao=emissao, data_vencimento=emissao + timedelta(days=365), liquidez='diaria',
+        )
+        dados.update(kwargs)
+        return Ativo.objects.create(**dados)
+
+    def versao(self, usuario=None):
+        return VersaoCarteira.atual((usuario or self.usuario).pk)[0]
+
+    def etag(self, url=None):
+        resposta = self.client.get(url or reverse('listar_ativos'))
+        self.assertEqual(resposta.status_code, 200)
+        return resposta['ETag']
+
+    def test_304_sem_carregar_ativos(self):
+        url = reverse('listar_ativos')
+        resposta = self.client.get(url)
+
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(url, HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(resposta.status_code, 304)
+        self.assertFalse(any('api_rest_ativo' in q['sql'] for q in consultas.captured_queries))
+
+    def test_sem_last_modified(self):
+        # If-Modified-Since sozinho nunca dá 304: a data não acompanha uma taxa alterada no mesmo segundo
+        url = reverse('listar_ativos')
+        resposta = self.client.get(url)
+        self.assertNotIn('Last-Modified', resposta)
+
+        indexador = Indexador.objects.get(nome='CDI')
+        indexador.taxa = Decimal('0.2')
+        indexador.save()
+        resposta = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(resposta.status_code, 200)
+
+    def test_consultar_por_id(self):
+        url = reverse('consultar_ativo_por_id', args=[self.ativo.pk])
+        etag = self.etag(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.patch(reverse('atualizar_ativo', args=[self.ativo.pk]), {'quantidade': 2}, format='json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_escritas_pela_api_mudam_a_etag(self):
+        etags = {self.etag()}
+        outro = self.criar(self.usuario, nome='Outro')
+        etags.add(self.etag())
+        self.client.patch(reverse('atualizar_ativo', args=[outro.pk]), {'nome': 'Novo'}, format='json')
+        etags.add(self.etag())
+        self.client.delete(reverse('deletar_ativo', args=[outro.pk]))
+        etags.add(self.etag())
+        self.assertEqual(len(etags), 4)
+
+    def test_operacoes_em_massa_incrementam_a_versao(self):
+        ativos = Ativo.objects.filter(usuario=self.usuario)
+        versao = self.versao()
+
+        Ativo.objects.bulk_create([Ativo(**{**ativos.values().first(), 'id': None, 'nome': 'Lote'})])
+        self.assertEqual(self.versao(), versao + 1)
+
+        antes = Ativo.objects.get(pk=self.ativo.pk).atualizado_em
+        ativos.update(nome='Renomeado')
+        self.assertGreater(self.versao(), versao + 1)
+        self.assertGreater(Ativo.objects.get(pk=self.ativo.pk).atualizado_em, antes)
+
+        versao = self.versao()
+        ativo = Ativo.objects.get(pk=self.ativo.pk)
+        ativo.quantidade = 9
+        Ativo.objects.bulk_update([ativo], ['quantidade'])
+        self.assertGreater(self.versao(), versao)
+
+        versao = self.versao()
+        ativos.filter(nome='Renomeado').delete()
+        self.assertGreater(self.versao(), versao)
+        self.assertEqual(self.versao(self.outro), 0)
+
+    def test_primeira_alteracao_concorrente_nao_se_perde(self):
+        novo = Usuario.objects.create_user(email='novo@exemplo.com', nome='Novo', password='senha123')
+        # outra transação criou a carteira (versão 1) depois do nosso UPDATE não achar a linha
+        update = QuerySet.update
+
+        def update_antes_da_outra(queryset, **kwargs):
+            VersaoCarteira.objects.bulk_create([VersaoCarteira(usuario=novo, versao=1, atualizado_em=timezone.now())])
+            mock_update.side_effect = lambda *a, **k: update(*a, **k)
+            return 0
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=update_antes_da_outra) as mock_update:
+            VersaoCarteira.incrementar([novo.pk])
+        self.assertEqual(self.versao(novo), 2)
+
+    def test_carteira_de_outro_usuario_nao_afeta(self):
+        etag = self.etag()
+        self.criar(self.outro)
+        self.assertEqual(self.client.get(reverse('listar_ativos'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_mudanca_de_indexador_muda_a_etag(self):
+        etag = self.etag()
+        indexador = Indexador.objects.get(nome='IPCA')  # nenhum ativo usa IPCA
+        indexador.taxa = Decimal('0.051')
+        indexador.save()
+        self.assertNotEqual(self.etag(), etag)
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import exportacao
+from .avaliacao import rendimentos_esperados
+from .models import Usuario, Ativo
+
+
+class ExportacaoAtivosTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='export@exemplo.com', nome='Export', password='senha123'
+        )
+        outro = Usuario.objects.create_user(
+            email='outro@exemplo.com', nome='Outro', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+        emissao = date(2024, 1, 1)
+        Ativo.objects.bulk_create([
+            Ativo(
+                usuario=self.usuario if i % 4 else outro, nome=f'CDB, "série" {i}',
+                tipo='renda_fixa_bancaria', valor_unitario=Decimal('100.00'), quantidade=1 + i,
+                tipo_juros='posfixado' if i % 2 else 'prefixado',
+                taxa_fixa=None if i % 2 else Decimal('10.00'),
+                indexador='CDI' if i % 2 else None,
+                percentual_sobre_indexador=Decimal('110.00') if i % 2 else None,
+                data_emissao=emissao, data_vencimento=emissao + timedelta(days=365 + i),
+                liquidez='diaria',
+            )
+            for i in range(23)
+        ])
+
+    def exportar(self, **params):
+        resposta = self.client.get(reverse('exportar_ativos'), params)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.streaming)
+        return resposta, b''.join(resposta.streaming_content).decode()
+
+    def test_ndjson_igual_a_listagem(self):
+        resposta, corpo = self.exportar(formato='ndjson')
+        self.assertTrue(resposta['Content-Type'].startswith('application/x-ndjson'))
+        exportados = [json.loads(linha) for linha in corpo.splitlines()]
+        listados = json.loads(self.client.get(reverse('listar_ativos')).content)
+        self.assertEqual(exportados, listados)
+
+    def test_csv(self):
+        resposta, corpo = self.exportar(ordering='-data_vencimento', indexador='CDI')
+        self.assertIn('attachment; filename="ativos.csv"', resposta['Content-Disposition'])
+        linhas = list(csv.DictReader(io.StringIO(corpo)))
+
+        esperado = Ativo.objects.filter(usuario=self.usuario, indexador='CDI').order_by('-data_vencimento', '-id')
+        self.assertEqual([int(l['id']) for l in linhas], [a.pk for a in esperado])
+        self.assertEqual(linhas[0]['nome'], esperado[0].nome)
+        self.assertEqual(linhas[0]['taxa_fixa'], '')
+        self.assertAlmostEqual(float(linhas[0]['rendimento_esperado']), float(esperado[0].rendimento_esperado()), places=6)
+
+    def test_le_em_blocos(self):
+        ativos = Ativo.objects.filter(usuario=self.usuario)
+        avaliar = mock.patch('api_rest.serializers.rendimentos_esperados', wraps=rendimentos_esperados)
+        with avaliar as avaliacoes, CaptureQueriesContext(connection) as consultas:
+            gerador = exportacao.linhas_ndjson(ativos.order_by('id'), tamanho_bloco=5)
+            primeira = next(gerador)
+            self.assertEqual(len(consultas.captured_queries), 1)
+            self.assertEqual(avaliacoes.call_count, 1)
+            restantes = list(gerador)
+
+        # 17 ativos em blocos de 5: uma avaliação vetorizada por bloco
+        self.assertEqual(1 + len(restantes), 17)
+        self.assertEqual(avaliacoes.call_count, 4)
+        self.assertEqual([len(c.args[0]) for c in avaliacoes.call_args_list], [5, 5, 5, 2])
+        self.assertEqual(json.loads(primeira)['id'], ativos.order_by('id')[0].pk)
+
+    def test_parametros_invalidos(self):
+        resposta = self.client.get(reverse('exportar_ativos'), {'formato': 'xml'})
+        self.assertEqual(resposta.status_code, 400)
+        resposta = self.client.get(reverse('exportar_ativos'), {'ordering': 'emissor'})
+        self.assertEqual(resposta.status_code, 400)
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .filtro_emails import FiltroBloom, filtro_emails
+from .models import Usuario
+
+
+@override_settings(FILTRO_EMAILS_SEGUNDOS=3600)
+class ChecarEmailTest(TestCase):
+    def setUp(self):
+        filtro_emails.invalidar()
+        self.addCleanup(filtro_emails.invalidar)
+        Usuario.objects.create_user(email='existe@exemplo.com', nome='Existe', password='senha123')
+        self.client = APIClient()
+
+    def checar(self, email):
+        return self.client.get(reverse('checar_email'), {'email': email}).data['existe']
+
+    def test_negativo_sem_consulta(self):
+        self.assertFalse(self.checar('a@exemplo.com'))  # monta o filtro
+        with self.assertNumQueries(0):
+            self.assertFalse(self.checar('ab@exemplo.com'))
+        with self.assertNumQueries(1):
+            self.assertTrue(self.checar('EXISTE@exemplo.com'))
+
+    def test_sinais_atualizam_o_filtro(self):
+        self.checar('a@exemplo.com')
+        usuario = Usuario.objects.create_user(email='novo@exemplo.com', nome='Novo', password='senha123')
+        self.assertTrue(self.checar('novo@exemplo.com'))
+
+        usuario.delete()
+        self.assertFalse(self.checar('novo@exemplo.com'))  # o banco confirma
+
+    def test_usuarios_sem_sinal_entram_pela_consulta_incremental(self):
+        self.checar('a@exemplo.com')
+        Usuario.objects.bulk_create([Usuario(email='lote@exemplo.com', nome='Lote')])
+        with override_settings(FILTRO_EMAILS_SEGUNDOS=0):
+            self.assertTrue(self.checar('lote@exemplo.com'))
+
+    def test_remontagem_por_capacidade_nao_expoe_filtro_vazio(self):
+        self.checar('a@exemplo.com')
+        filtro_emails._filtro.itens = filtro_emails._filtro.capacidade  # cheio
+        vistos = []
+        montar = filtro_emails._montar
+
+        def montar_observado():
+            vistos.append(filtro_emails._filtro)  # o que uma leitura concorrente veria
+            montar()
+
+        with mock.patch.object(filtro_emails, '_montar', montar_observado):
+            Usuario.objects.create_user(email='cheio@exemplo.com', nome='Cheio', password='senha123')
+        self.assertEqual(len(vistos), 1)
+        self.assertIsNotNone(vistos[0])
+        self.assertTrue(self.checar('cheio@exemplo.com'))
+
+    def test_remonta_depois_de_muitas_exclusoes(self):
+        self.checar('a@exemplo.com')
+        Usuario.objects.create_user(email='sai@exemplo.com', nome='Sai', password='senha123').delete()
+        with override_settings(FILTRO_EMAILS_SEGUNDOS=0):
+            self.checar('a@exemplo.com')
+        self.assertNotIn('sai@exemplo.com', filtro_emails._filtro)
+
+
+class FiltroBloomTest(TestCase):
+    def test_sem_falsos_negativos_e_poucos_falsos_positivos(self):
+        filtro = FiltroBloom(10_000)
+        for i in range(10_000):
+            filtro.add(f'usuario{i}@exemplo.com')
+
+        self.assertTrue(all(f'usuario{i}@exemplo.com' in filtro for i in range(10_000)))
+        falsos = sum(f'outro{i}@exemplo.com' in filtro for i in range(10_000))
+        self.assertLess(falsos, 200)  # taxa alvo de 1%
@@ -0,0 +1,156 @@
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import fragmentos
+from .cache import CacheArquivoLRU
+from .models import Usuario, Ativo, Indexador, cache_indexadores
+from .serializers import AtivoLeitura, AtivoSerializer
+
+
+class FragmentosTest(TestCase):
+    def setUp(self):
+        caches['fragmentos'].clear()
+        cache_indexadores.invalidar()
+        self.addCleanup(cache_indexadores.invalidar)
+
+        self.usuario = Usuario.objects.create_user(
+            email='fragmentos@exemplo.com', nome='Fragmentos', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+        emissao = date(2024, 1, 1)
+        Ativo.objects.bulk_create([
+            Ativo(
+                usuario=self.usuario, nome=f'Ativo {i}', tipo='renda_fixa_bancaria',
+                valor_unitario=Decimal('100.00') + i, quantidade=1 + i,
+                tipo_juros='posfixado' if i % 2 else 'prefixado',
+                taxa_fixa=None if i % 2 else Decimal('10.50'),
+                indexador='CDI' if i % 2 else None,
+                percentual_sobre_indexador=Decimal('102.00') if i % 2 else None,
+                data_emissao=emissao, data_vencimento=emissao + timedelta(days=365 + i),
+                liquidez='diaria',
+            )
+            for i in range(6)
+        ])
+        self.ativos = Ativo.objects.filter(usuario=self.usuario).order_by('id')
+
+    def listar(self, **params):
+        """Lista pela API e devolve (resposta, ids serializados fora do cache)."""
+        serializados = []
+        original = AtivoLeitura.serializar
+
+        def serializar(leitura, linhas):
+            linhas = list(linhas)
+            serializados.extend(linha['id'] for linha in linhas)
+            return original(leitura, linhas)
+
+        with mock.patch.object(AtivoLeitura, 'serializar', serializar):
+            resposta = self.client.get(reverse('listar_ativos'), {'ordering': 'id', **params})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta, serializados
+
+    def esperado(self):
+        return JSONRenderer().render(AtivoSerializer(self.ativos, many=True).data)
+
+    def test_so_recalcula_os_ausentes(self):
+        resposta, serializados = self.listar()
+        self.assertEqual(resposta.content, self.esperado())
+        self.assertEqual(len(serializados), 6)
+
+        resposta, serializados = self.listar()
+        self.assertEqual(resposta.content, self.esperado())
+        self.assertEqual(serializados, [])
+
+        alterado = self.ativos[2]
+        alterado.quantidade = 50
+        alterado.save()
+        resposta, serializados = self.listar()
+        self.assertEqual(serializados, [alterado.pk])
+        self.assertEqual(resposta.content, self.esperado())
+
+    def test_nova_taxa_invalida_os_fragmentos(self):
+        self.listar()
+        indexador = Indexador.objects.get(nome='CDI')
+        indexador.taxa = Decimal('0.1425')
+        indexador.save()
+
+        resposta, serializados = self.listar()
+        self.assertEqual(len(serializados), 6)
+        self.assertEqual(resposta.content, self.esperado())
+
+    def test_mudanca_de_formato_invalida_os_fragmentos(self):
+        self.listar()
+        with mock.patch('api_rest.fragmentos.VERSAO_FRAGMENTOS', 2):
+            _, serializados = self.listar()
+        self.assertEqual(len(serializados), 6)
+
+        # um campo a mais ou a menos muda o formato sem precisar da versão
+        leitura = AtivoLeitura()
+        leitura.colunas = leitura.colunas[:-1]
+        with mock.patch('api_rest.fragmentos.ativo_leitura', return_value=leitura):
+            outro = fragmentos.formato_fragmentos()
+        self.assertNotEqual(outro, fragmentos.formato_fragmentos())
+
+    def test_pagina_montada_dos_fragmentos(self):
+        self.listar()
+        resposta, serializados = self.listar(page_size=4)
+        self.assertEqual(serializados, [])
+        self.assertEqual(list(resposta.data), ['next', 'previous', 'results'])
+        self.assertIsNone(resposta.data['previous'])
+
+        dados = AtivoSerializer(self.ativos, many=True).data
+        self.assertEqual(resposta.data['results'], [dict(item) for item in dados[:4]])
+        seguinte = self.client.get(resposta.data['next'])
+        self.assertEqual(seguinte.data['results'], [dict(item) for item in dados[4:]])
+
+    def test_cache_em_arquivos(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            config = {'BACKEND': 'api_rest.cache.CacheArquivoLRU', 'LOCATION': pasta, 'TIMEOUT': None}
+            with override_settings(CACHES={'default': config, 'fragmentos': config}):
+                self.listar()
+                self.assertEqual(len(os.listdir(pasta)), 6)
+                resposta, serializados = self.listar()
+                self.assertEqual(serializados, [])
+                self.assertEqual(resposta.content, self.esperado())
+
+
+class CacheArquivoLRUTest(TestCase):
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.cache = CacheArquivoLRU(pasta.name, {'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 3}})
+
+    def envelhecer(self, *chaves):
+        """Marca as chaves como acessadas há mais tempo, na ordem dada."""
+        inicio = time.time() - 100
+        for i, chave in enumerate(chaves):
+            os.utime(self.cache._key_to_file(chave), (inicio + i, inicio + i))
+
+    def test_descarta_o_menos_usado(self):
+        for chave in 'abc':
+            self.cache.set(chave, chave)
+        self.envelhecer('a', 'b', 'c')
+
+        self.assertEqual(self.cache.get('a'), 'a')
+        self.cache.set('d', 'd')
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual([self.cache.get(c) for c in 'acd'], ['a', 'c', 'd'])
+
+    def test_lote_abre_espaco_de_uma_vez(self):
+        for chave in 'abc':
+            self.cache.set(chave, chave)
+        self.envelhecer('c', 'a', 'b')
+
+        self.cache.set_many({'d': 'd', 'e': 'e'})
+        self.assertEqual(self.cache.get_many('abcde'), {'b': 'b', 'd': 'd', 'e': 'e'})
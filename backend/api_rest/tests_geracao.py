@@ -0,0 +1,73 @@
+import random
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.forms.models import model_to_dict
+from django.test import TestCase
+
+from .geracao import aliquota_regressiva, gerar_ativo, gerar_carteiras
+from .models import Ativo, Usuario, VersaoCarteira, TIPOS_ATIVO, TIPOS_JUROS, INDEXADORES
+
+
+class GeracaoTest(TestCase):
+    def test_ativos_validos_e_variados(self):
+        rng = random.Random(7)
+        ativos = [gerar_ativo(rng, None) for _ in range(2000)]
+        for ativo in ativos:
+            ativo.full_clean(exclude=['usuario'])
+            if ativo.possuiImposto:
+                self.assertEqual(ativo.aliquotaImposto, aliquota_regressiva((ativo.data_vencimento - ativo.data_emissao).days))
+
+        self.assertEqual({ativo.tipo for ativo in ativos}, {valor for valor, _ in TIPOS_ATIVO})
+        self.assertEqual({ativo.tipo_juros for ativo in ativos}, {valor for valor, _ in TIPOS_JUROS})
+        self.assertEqual({ativo.indexador for ativo in ativos} - {None}, {valor for valor, _ in INDEXADORES})
+        self.assertEqual({ativo.possuiImposto for ativo in ativos}, {True, False})
+        self.assertEqual({ativo.liquidez for ativo in ativos}, {'diaria', 'apos_vencimento'})
+
+    def test_deterministico(self):
+        rng_a, rng_b = random.Random(3), random.Random(3)
+        self.assertEqual(
+            [model_to_dict(gerar_ativo(rng_a, 1)) for _ in range(50)],
+            [model_to_dict(gerar_ativo(rng_b, 1)) for _ in range(50)],
+        )
+
+    def test_gera_carteiras_em_lotes(self):
+        lotes = []
+        resultado = gerar_carteiras(5, 7, seed=1, tamanho_lote=15, ao_gravar_lote=lambda *args: lotes.append(args))
+        self.assertEqual(resultado, (5, 35))
+        self.assertEqual(lotes, [(2, 15), (4, 30), (5, 35)])
+
+        usuarios = Usuario.objects.filter(email__startswith='sintetico-')
+        self.assertEqual(usuarios.count(), 5)
+        self.assertFalse(usuarios.first().has_usable_password())
+        ativos = Ativo.objects.filter(usuario__in=usuarios)
+        self.assertEqual(ativos.count(), 35)
+        self.assertFalse(ativos.filter(valor_investido_armazenado__isnull=True).exists())
+        self.assertEqual(VersaoCarteira.objects.filter(usuario__in=usuarios).count(), 5)
+        for ativo in ativos:
+            ativo.full_clean()
+
+    def test_carteira_maior_que_o_lote(self):
+        lotes = []
+        with mock.patch.object(Ativo.objects, 'bulk_create', wraps=Ativo.objects.bulk_create) as bulk_create:
+            resultado = gerar_carteiras(1, 40, seed=1, tamanho_lote=15, ao_gravar_lote=lambda *args: lotes.append(args))
+        self.assertEqual(resultado, (1, 40))
+        self.assertEqual(lotes, [(0, 15), (0, 30), (1, 40)])
+        self.assertEqual([len(chamada.args[0]) for chamada in bulk_create.call_args_list], [15, 15, 10])
+        self.assertEqual(Ativo.objects.filter(usuario__email='sintetico-0@exemplo.com').count(), 40)
+
+    def test_comando(self):
+        out = StringIO()
+        call_command('gerar_carteiras', usuarios=2, ativos=3, prefixo='escala', senha='senha123', stdout=out)
+        self.assertIn('2 usuário(s) e 6 ativo(s) gerado(s)', out.getvalue())
+        self.assertTrue(Usuario.objects.get(email='escala-1@exemplo.com').check_password('senha123'))
+
+        with self.assertRaises(CommandError):
+            call_command('gerar_carteiras', usuarios=2, ativos=3, prefixo='escala', stdout=StringIO())
+
+        antes = list(Ativo.objects.filter(usuario__email__startswith='escala-').values_list('nome', 'valor_unitario'))
+        call_command('gerar_carteiras', usuarios=2, ativos=3, prefixo='escala', apagar=True, stdout=StringIO())
+        depois = list(Ativo.objects.filter(usuario__email__startswith='escala-').values_list('nome', 'valor_unitario'))
+        self.assertEqual(antes, depois)
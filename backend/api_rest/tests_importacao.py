@@ -0,0 +1,124 @@
+import csv
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .importacao import importar_ativos, ler_csv
+from .models import Usuario, Ativo
+
+
+CABECALHO = 'nome,tipo,valor_unitario,quantidade,tipo_juros,taxa_fixa,indexador,percentual_sobre_indexador,data_emissao,data_vencimento,liquidez\n'
+
+
+def linha_valida(i):
+    return f'"CDB {i}, série A",renda_fixa_bancaria,1000.00,{1 + i % 3},prefixado,10.00,,,2024-01-01,2026-01-01,diaria\n'
+
+
+class ImportacaoAtivosTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='import@exemplo.com', nome='Import', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def csv_com_erros(self):
+        return (
+            CABECALHO
+            + linha_valida(0)
+            + 'Sem valor,renda_fixa_bancaria,abc,1,prefixado,10.00,,,2024-01-01,2026-01-01,diaria\n'
+            + linha_valida(1)
+            + 'Pos sem indexador,renda_fixa_bancaria,100.00,1,posfixado,,,,2024-01-01,2026-01-01,diaria\n'
+            + linha_valida(2)
+        )
+
+    def test_importa_em_blocos_e_relata_rejeitadas(self):
+        conteudo = CABECALHO + ''.join(linha_valida(i) for i in range(23))
+        conteudo += 'Vencido,renda_fixa_bancaria,100.00,1,prefixado,10.00,,,2024-01-01,2023-01-01,diaria\n'
+        rejeitadas, progresso = [], []
+
+        importados, rejeitados = importar_ativos(
+            ler_csv(io.StringIO(conteudo)), self.usuario, tamanho_bloco=10,
+            ao_rejeitar=lambda linha, erros: rejeitadas.append((linha, sorted(erros))),
+            ao_gravar_bloco=lambda *totais: progresso.append(totais),
+        )
+
+        self.assertEqual((importados, rejeitados), (23, 1))
+        self.assertEqual(progresso, [(10, 0), (20, 0), (23, 1)])
+        self.assertEqual(rejeitadas, [(25, ['data_vencimento'])])
+
+        ativo = Ativo.objects.get(usuario=self.usuario, nome='CDB 4, série A')
+        self.assertEqual(ativo.quantidade, 2)
+        self.assertIsNone(ativo.indexador)
+        self.assertEqual(ativo.valor_investido_armazenado, Decimal('2000.00'))
+        self.assertEqual(ativo.rendimento_esperado_armazenado, ativo.rendimento_esperado().quantize(Decimal('0.01')))
+
+    def test_upload(self):
+        arquivo = SimpleUploadedFile('ativos.csv', ('\ufeff' + self.csv_com_erros()).encode(), content_type='text/csv')
+        resposta = self.client.post(reverse('importar_ativos_csv'), {'arquivo': arquivo}, format='multipart')
+
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(resposta.data['importados'], 3)
+        self.assertEqual(resposta.data['rejeitados'], 2)
+        self.assertEqual([e['linha'] for e in resposta.data['erros']], [3, 5])
+        self.assertIn('valor_unitario', resposta.data['erros'][0]['erros'])
+        self.assertEqual(Ativo.objects.filter(usuario=self.usuario).count(), 3)
+
+    def test_upload_invalido_nao_importa_nada(self):
+        # blocos inteiros já gravados antes do byte inválido também são desfeitos
+        conteudo = (CABECALHO + ''.join(linha_valida(i) for i in range(1500))).encode() + b'\xff\xfe,\n'
+        arquivo = SimpleUploadedFile('ativos.csv', conteudo, content_type='text/csv')
+        resposta = self.client.post(reverse('importar_ativos_csv'), {'arquivo': arquivo}, format='multipart')
+
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(Ativo.objects.filter(usuario=self.usuario).exists())
+
+    def test_upload_sem_arquivo(self):
+        resposta = self.client.post(reverse('importar_ativos_csv'), {}, format='multipart')
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_reimporta_exportacao(self):
+        self.client.post(
+            reverse('importar_ativos_csv'),
+            {'arquivo': SimpleUploadedFile('a.csv', self.csv_com_erros().encode())},
+            format='multipart',
+        )
+        exportado = b''.join(self.client.get(reverse('exportar_ativos')).streaming_content)
+
+        resposta = self.client.post(
+            reverse('importar_ativos_csv'),
+            {'arquivo': SimpleUploadedFile('b.csv', exportado)},
+            format='multipart',
+        )
+        self.assertEqual(resposta.data['importados'], 3)
+        self.assertEqual(resposta.data['rejeitados'], 0)
+
+    def test_comando(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            entrada = os.path.join(pasta, 'ativos.csv')
+            relatorio = os.path.join(pasta, 'erros.csv')
+            with open(entrada, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(self.csv_com_erros())
+
+            saida = io.StringIO()
+            call_command(
+                'importar_ativos', entrada, usuario='IMPORT@exemplo.com',
+                lote=2, relatorio=relatorio, stdout=saida,
+            )
+            with open(relatorio, encoding='utf-8') as arquivo:
+                linhas = list(csv.DictReader(arquivo))
+
+        self.assertEqual(
+            [(l['linha'], l['campo']) for l in linhas],
+            [('3', 'valor_unitario'), ('5', 'indexador'), ('5', 'percentual_sobre_indexador')],
+        )
+        self.assertIn('5 linha(s) processada(s)', saida.getvalue())
+        self.assertIn('3 ativo(s) importado(s), 2 linha(s) rejeitada(s).', saida.getvalue())
+        self.assertEqual(Ativo.objects.filter(usuario=self.usuario).count(), 3)
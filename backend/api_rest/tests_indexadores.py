@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo, Indexador, cache_indexadores
+
+
+class IndexadorTest(TestCase):
+    def setUp(self):
+        cache_indexadores.invalidar()
+        self.addCleanup(cache_indexadores.invalidar)
+
+        self.usuario = Usuario.objects.create_user(
+            email='idx@exemplo.com', nome='Idx', password='senha123'
+        )
+        self.admin = Usuario.objects.create_superuser(
+            email='admin@exemplo.com', nome='Admin', password='senha123'
+        )
+        self.client = APIClient()
+
+    def criar_ativo(self, indexador):
+        emissao = date(2024, 1, 1)
+        return Ativo.objects.create(
+            usuario=self.usuario, nome=f'Pós {indexador}', tipo='renda_fixa_bancaria',
+            valor_unitario=Decimal('1000.00'), quantidade=1,
+            tipo_juros='posfixado', indexador=indexador,
+            percentual_sobre_indexador=Decimal('100.00'),
+            data_emissao=emissao, data_vencimento=emissao + timedelta(days=730),
+            liquidez='diaria',
+        )
+
+    def test_taxas_iniciais_da_migracao(self):
+        self.assertEqual(cache_indexadores.taxa('CDI'), Decimal('0.13'))
+        self.assertEqual(Indexador.objects.count(), 4)
+
+    def test_avaliacao_nao_consulta_por_linha(self):
+        ativos = [self.criar_ativo('CDI') for _ in range(20)]
+        cache_indexadores.taxas()
+        with self.assertNumQueries(0):
+            for ativo in ativos:
+                ativo.rendimento_esperado()
+
+    def test_atualizacao_revaloriza_apenas_o_indexador(self):
+        cdi = self.criar_ativo('CDI')
+        ipca = self.criar_ativo('IPCA')
+        rendimento_ipca = Ativo.objects.get(pk=ipca.pk).rendimento_esperado_armazenado
+        versao = cache_indexadores.versao()
+
+        self.client.force_authenticate(self.admin)
+        resposta = self.client.patch(
+            reverse('atualizar_indexador', args=['cdi']), {'taxa': '0.15'}, format='json'
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(Decimal(resposta.data['taxa']), Decimal('0.15'))
+        self.assertGreater(cache_indexadores.versao(), versao)
+
+        cdi.refresh_from_db()
+        self.assertEqual(cache_indexadores.taxa('CDI'), Decimal('0.15'))
+        self.assertEqual(
+            cdi.rendimento_esperado_armazenado,
+            cdi.rendimento_esperado().quantize(Decimal('0.01')),
+        )
+        self.assertEqual(Ativo.objects.get(pk=ipca.pk).rendimento_esperado_armazenado, rendimento_ipca)
+
+    def test_revalorizacao_nao_toca_outros_indexadores(self):
+        self.criar_ativo('CDI')
+        ipca = self.criar_ativo('IPCA')
+        Ativo.objects.filter(pk=ipca.pk).update(rendimento_esperado_armazenado=Decimal('1.00'))
+
+        indexador = Indexador.objects.get(nome='CDI')
+        indexador.taxa = Decimal('0.14')
+        indexador.save()
+
+        self.assertEqual(Ativo.objects.get(pk=ipca.pk).rendimento_esperado_armazenado, Decimal('1.00'))
+
+    def test_somente_admin_atualiza(self):
+        self.client.force_authenticate(self.usuario)
+        resposta = self.client.patch(
+            reverse('atualizar_indexador', args=['CDI']), {'taxa': '0.15'}, format='json'
+        )
+        self.assertEqual(resposta.status_code, 403)
+
+        resposta = self.client.get(reverse('listar_indexadores'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual([i['nome'] for i in resposta.data], ['CDI', 'IGPM', 'IPCA', 'SELIC'])
@@ -0,0 +1,76 @@
+import random
+from datetime import date
+from decimal import Decimal, InvalidOperation, localcontext
+
+from django.test import TestCase
+
+from .geracao import gerar_ativo
+from .juros import estatisticas_fatores, fator_crescimento, limpar_fatores
+from .models import cache_indexadores
+
+
+def taxa_anual(ativo):
+    taxa = Decimal(0)
+    if ativo.taxa_fixa is not None:
+        taxa += ativo.taxa_fixa / Decimal('100')
+    if ativo.indexador:
+        taxa += (ativo.percentual_sobre_indexador / Decimal('100')) * cache_indexadores.taxa(ativo.indexador)
+    return taxa
+
+
+def rendimento_direto(ativo):
+    """A conta como era feita antes do fator memorizado."""
+    periodo = Decimal(str(ativo.periodo_em_anos()))
+    bruto = ativo.valor_unitario * ativo.quantidade * (1 + taxa_anual(ativo)) ** periodo
+    if ativo.possuiImposto:
+        return bruto - bruto * (ativo.aliquotaImposto / Decimal('100'))
+    return bruto
+
+
+def resgate_direto(ativo, data_resgate):
+    periodo = Decimal(str((min(data_resgate, ativo.data_vencimento) - ativo.data_emissao).days / 365.25))
+    return (ativo.valor_unitario * ativo.quantidade * (1 + taxa_anual(ativo)) ** periodo).quantize(Decimal('0.01'))
+
+
+class FatorCrescimentoTest(TestCase):
+    def setUp(self):
+        cache_indexadores.invalidar()
+        limpar_fatores()
+        self.addCleanup(limpar_fatores)
+
+    def test_mesmos_valores_da_conta_direta(self):
+        rng = random.Random(11)
+        data_resgate = date(2025, 6, 30)
+        for _ in range(300):
+            ativo = gerar_ativo(rng, None)
+            self.assertEqual(ativo.rendimento_esperado(), rendimento_direto(ativo))
+            ativo.liquidez = 'diaria'
+            if ativo.data_emissao <= data_resgate:
+                self.assertEqual(ativo.calcular_resgate(data_resgate)['valor_acumulado'], resgate_direto(ativo, data_resgate))
+
+    def test_memoria_e_contadores(self):
+        taxa = Decimal('0.143')
+        fator = fator_crescimento(taxa, 730)
+        self.assertIs(fator_crescimento(taxa, 730), fator)
+        # o período arredondado é outra chave (e, aqui, outro valor)
+        self.assertNotEqual(fator_crescimento(taxa, 730, periodo_arredondado=True), fator)
+        self.assertEqual(
+            estatisticas_fatores(),
+            {'acertos': 1, 'faltas': 2, 'entradas': 2, 'limite': fator_crescimento.cache_info().maxsize},
+        )
+
+        limpar_fatores()
+        self.assertEqual(estatisticas_fatores()['entradas'], 0)
+
+    def test_precisao_independe_do_contexto(self):
+        esperado = fator_crescimento.__wrapped__(Decimal('0.1'), 1000)
+        with localcontext() as contexto:
+            contexto.prec = 6
+            self.assertEqual(fator_crescimento(Decimal('0.1'), 1000), esperado)
+        self.assertEqual(fator_crescimento(Decimal('0.1'), 1000), esperado)
+
+    def test_taxa_invalida_nao_e_memorizada(self):
+        for _ in range(2):
+            with self.assertRaises(InvalidOperation):
+                fator_crescimento(Decimal('-2'), 500)
+        self.assertEqual(estatisticas_fatores()['entradas'], 0)
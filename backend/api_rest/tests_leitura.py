@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo
+from .serializers import AtivoLeitura, AtivoSerializer, serializar_ativos
+
+
+class AtivoLeituraTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='leitura@exemplo.com', nome='Leitura', password='senha123'
+        )
+        emissao = date(2024, 2, 29)
+        Ativo.objects.bulk_create([
+            Ativo(
+                usuario=self.usuario, nome=f'Ativo "{i}" çã', tipo='renda_fixa_bancaria',
+                emissor=None if i % 2 else 'Banco X', tipo_negociacao='balcao' if i % 3 else 'bolsa',
+                valor_unitario=Decimal('0.01') * (i * 7919 + 1), quantidade=1 + i,
+                tipo_juros=['prefixado', 'posfixado', 'hibrido'][i % 3],
+                taxa_fixa=None if i % 3 == 1 else Decimal('9.99') - i,
+                indexador=None if i % 3 == 0 else ['CDI', 'SELIC', 'IPCA', 'IGPM'][i % 4],
+                percentual_sobre_indexador=None if i % 3 == 0 else Decimal('85.50') + i,
+                data_emissao=emissao + timedelta(days=i),
+                data_vencimento=emissao + timedelta(days=400 + 37 * i),
+                liquidez='diaria' if i % 2 else 'apos_vencimento',
+                possuiImposto=bool(i % 4 == 1),
+                aliquotaImposto=Decimal('22.50') if i % 4 == 1 else None,
+            )
+            for i in range(30)
+        ])
+        self.ativos = Ativo.objects.filter(usuario=self.usuario).order_by('id')
+
+    def renderizar(self, dados):
+        return JSONRenderer().render(dados)
+
+    def test_json_identico_ao_serializer(self):
+        esperado = self.renderizar(AtivoSerializer(self.ativos, many=True).data)
+        self.assertEqual(self.renderizar(serializar_ativos(self.ativos)), esperado)
+
+    @override_settings(REST_FRAMEWORK={'COERCE_DECIMAL_TO_STRING': False, 'DATE_FORMAT': '%d/%m/%Y'})
+    def test_respeita_configuracao_do_drf(self):
+        leitura = AtivoLeitura()
+        esperado = self.renderizar(AtivoSerializer(self.ativos, many=True).data)
+        self.assertEqual(self.renderizar(leitura.serializar(self.ativos.values(*leitura.colunas))), esperado)
+
+    def test_listagem_usa_o_caminho_rapido(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+        esperado = self.renderizar(AtivoSerializer(self.ativos, many=True).data)
+
+        with self.assertNumQueries(2):  # versão da carteira (ETag) e ativos
+            resposta = client.get(reverse('listar_ativos'), {'ordering': 'id'})
+        self.assertEqual(resposta.content, esperado)
+
+        resposta = client.get(reverse('listar_ativos'), {'page_size': 30})
+        self.assertEqual(self.renderizar(resposta.data['results']), esperado)
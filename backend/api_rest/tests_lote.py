@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo
+
+
+def ativo_entrada(**kwargs):
+    dados = {
+        'nome': 'CDB Banco X',
+        'tipo': 'renda_fixa_bancaria',
+        'valor_unitario': '1000.00',
+        'quantidade': 2,
+        'tipo_juros': 'prefixado',
+        'taxa_fixa': '10.00',
+        'data_emissao': '2024-01-01',
+        'data_vencimento': '2026-01-01',
+        'liquidez': 'diaria',
+    }
+    dados.update(kwargs)
+    return dados
+
+
+class AtivosLoteTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='lote@exemplo.com', nome='Lote', password='senha123'
+        )
+        self.outro = Usuario.objects.create_user(
+            email='outro@exemplo.com', nome='Outro', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def criar(self, usuario, quantidade):
+        emissao = date(2024, 1, 1)
+        return Ativo.objects.bulk_create([
+            Ativo(
+                usuario=usuario, nome=f'Ativo {i}', tipo='renda_fixa_bancaria',
+                valor_unitario=Decimal('100.00'), quantidade=1, tipo_juros='prefixado',
+                taxa_fixa=Decimal('10.00'), data_emissao=emissao,
+                data_vencimento=emissao + timedelta(days=365), liquidez='diaria',
+            )
+            for i in range(quantidade)
+        ])
+
+    def test_criar_lote(self):
+        itens = [ativo_entrada(nome=f'CDB {i}') for i in range(30)]
+        # savepoint, INSERT, versão da carteira (UPDATE, INSERT e UPDATE na primeira gravação), release
+        with self.assertNumQueries(6):
+            resposta = self.client.post(reverse('criar_ativos_lote'), itens, format='json')
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(len(resposta.data), 30)
+        self.assertEqual(Ativo.objects.filter(usuario=self.usuario).count(), 30)
+
+        ativo = Ativo.objects.get(usuario=self.usuario, nome='CDB 0')
+        self.assertEqual(ativo.rendimento_esperado_armazenado, ativo.rendimento_esperado().quantize(Decimal('0.01')))
+
+    def test_criar_lote_com_erros_nao_grava_nada(self):
+        itens = [
+            ativo_entrada(),
+            ativo_entrada(valor_unitario='abc'),
+            ativo_entrada(data_vencimento='2023-01-01'),  # regra de Ativo.clean
+            ativo_entrada(tipo_juros='posfixado'),
+        ]
+        resposta = self.client.post(reverse('criar_ativos_lote'), itens, format='json')
+        self.assertEqual(resposta.status_code, 400)
+        erros = {e['indice']: e['erros'] for e in resposta.data['erros']}
+        self.assertEqual(sorted(erros), [1, 2, 3])
+        self.assertIn('valor_unitario', erros[1])
+        self.assertIn('data_vencimento', erros[2])
+        self.assertIn('indexador', erros[3])
+        self.assertFalse(Ativo.objects.exists())
+
+    def test_lote_vazio_ou_grande_demais(self):
+        resposta = self.client.post(reverse('criar_ativos_lote'), [], format='json')
+        self.assertEqual(resposta.status_code, 400)
+        resposta = self.client.post(reverse('criar_ativos_lote'), {'nome': 'x'}, format='json')
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_atualizar_lote(self):
+        ativos = self.criar(self.usuario, 3)
+        itens = [
+            {'id': ativos[0].pk, 'quantidade': 10},
+            {'id': ativos[1].pk, 'nome': 'Renomeado', 'taxa_fixa': '12.00'},
+        ]
+        resposta = self.client.patch(reverse('atualizar_ativos_lote'), itens, format='json')
+        self.assertEqual(resposta.status_code, 200)
+
+        primeiro = Ativo.objects.get(pk=ativos[0].pk)
+        segundo = Ativo.objects.get(pk=ativos[1].pk)
+        self.assertEqual(primeiro.quantidade, 10)
+        self.assertEqual(primeiro.valor_investido_armazenado, Decimal('1000.00'))
+        self.assertEqual(segundo.nome, 'Renomeado')
+        self.assertEqual(segundo.taxa_fixa, Decimal('12.00'))
+        self.assertEqual(segundo.rendimento_esperado_armazenado, segundo.rendimento_esperado().quantize(Decimal('0.01')))
+
+    def test_atualizar_lote_valida_dono_e_regras(self):
+        meus = self.criar(self.usuario, 1)
+        alheios = self.criar(self.outro, 1)
+        itens = [
+            {'id': meus[0].pk, 'valor_unitario': '0'},
+            {'id': alheios[0].pk, 'quantidade': 5},
+            {'quantidade': 5},
+        ]
+        resposta = self.client.patch(reverse('atualizar_ativos_lote'), itens, format='json')
+        self.assertEqual(resposta.status_code, 400)
+        erros = {e['indice']: e['erros'] for e in resposta.data['erros']}
+        self.assertIn('valor_unitario', erros[0])
+        self.assertIn('id', erros[1])
+        self.assertIn('id', erros[2])
+        self.assertEqual(Ativo.objects.get(pk=alheios[0].pk).quantidade, 1)
+        self.assertEqual(Ativo.objects.get(pk=meus[0].pk).valor_unitario, Decimal('100.00'))
+
+    def test_deletar_lote_so_do_usuario(self):
+        meus = self.criar(self.usuario, 3)
+        alheios = self.criar(self.outro, 1)
+        ids = [meus[0].pk, meus[1].pk, alheios[0].pk]
+
+        resposta = self.client.post(reverse('deletar_ativos_lote'), {'ids': ids}, format='json')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data['deletados'], 2)
+        self.assertEqual(resposta.data['nao_encontrados'], [alheios[0].pk])
+        self.assertTrue(Ativo.objects.filter(pk=alheios[0].pk).exists())
+        self.assertEqual(Ativo.objects.filter(usuario=self.usuario).count(), 1)
@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .metricas import registro
+from .models import Usuario, Ativo, cache_indexadores
+
+
+def amostras(texto):
+    """{'nome{rotulos}': valor} das linhas de amostra do texto do Prometheus."""
+    resultado = {}
+    for linha in texto.splitlines():
+        if linha and not linha.startswith('#'):
+            serie, valor = linha.rsplit(' ', 1)
+            resultado[serie] = float(valor)
+    return resultado
+
+
+@override_settings(DEBUG=True)
+class MetricasTest(TestCase):
+    def setUp(self):
+        registro.limpar()
+        self.addCleanup(registro.limpar)
+        cache_indexadores.invalidar()
+        self.usuario = Usuario.objects.create_user(email='metricas@exemplo.com', nome='Métricas', password='senha123')
+        emissao = date(2024, 1, 1)
+        Ativo.objects.bulk_create([
+            Ativo(
+                usuario=self.usuario, nome=f'CDB {i}', tipo='renda_fixa_bancaria', valor_unitario=Decimal('1000.00'),
+                quantidade=1, tipo_juros='prefixado', taxa_fixa=Decimal('11.00'), data_emissao=emissao,
+                data_vencimento=emissao + timedelta(days=365), liquidez='diaria',
+            )
+            for i in range(3)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def metricas(self):
+        resposta = self.client.get('/metrics')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return amostras(resposta.content.decode())
+
+    def test_registra_duracao_consultas_e_tamanho(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(reverse('listar_ativos'))
+        self.assertEqual(resposta.status_code, 200)
+        esperadas = len(consultas)  # antes da próxima requisição, que limpa o log de consultas
+
+        metricas = self.metricas()
+        rotulos = 'rota="listar_ativos",metodo="GET"'
+        self.assertEqual(metricas[f'api_requisicao_duracao_segundos_count{{{rotulos},status="200"}}'], 1)
+        self.assertEqual(metricas[f'api_requisicao_consultas_sum{{{rotulos}}}'], esperadas)
+        self.assertEqual(metricas[f'api_resposta_tamanho_bytes_sum{{{rotulos}}}'], len(resposta.content))
+        self.assertGreater(metricas[f'api_requisicao_consultas_duracao_segundos_sum{{{rotulos}}}'], 0)
+
+        # faixas acumuladas, terminando no total
+        faixas = [valor for serie, valor in metricas.items() if serie.startswith(f'api_requisicao_consultas_bucket{{{rotulos}')]
+        self.assertEqual(faixas, sorted(faixas))
+        self.assertEqual(metricas[f'api_requisicao_consultas_bucket{{{rotulos},le="+Inf"}}'], 1)
+
+    def test_rota_nao_resolvida_e_status(self):
+        self.client.get('/nao-existe/')
+        self.client.get(reverse('consultar_ativo_por_id', args=[999999]))
+        metricas = self.metricas()
+        self.assertIn('api_requisicao_duracao_segundos_count{rota="nao_resolvida",metodo="GET",status="404"}', metricas)
+        self.assertIn(
+            'api_requisicao_duracao_segundos_count{rota="consultar_ativo_por_id",metodo="GET",status="404"}', metricas
+        )
+
+    def test_exportacao_em_streaming(self):
+        resposta = self.client.get(reverse('exportar_ativos'), {'formato': 'csv'})
+        conteudo = b''.join(resposta.streaming_content)
+        metricas = self.metricas()
+        rotulos = 'rota="exportar_ativos",metodo="GET"'
+        self.assertEqual(metricas[f'api_resposta_tamanho_bytes_sum{{{rotulos}}}'], len(conteudo))
+        self.assertGreater(metricas[f'api_requisicao_consultas_sum{{{rotulos}}}'], 0)
+
+    async def test_view_assincrona(self):
+        cabecalhos = {'Authorization': f'Bearer {AccessToken.for_user(self.usuario)}'}
+        resposta = await self.async_client.get(reverse('listar_ativos_async'), headers=cabecalhos)
+        self.assertEqual(resposta.status_code, 200)
+
+        metricas = amostras((await self.async_client.get('/metrics')).content.decode())
+        rotulos = 'rota="listar_ativos_async",metodo="GET"'
+        self.assertEqual(metricas[f'api_requisicao_duracao_segundos_count{{{rotulos},status="200"}}'], 1)
+        # consultas feitas pelo ORM assíncrono, em outra thread e outra conexão
+        self.assertGreater(metricas[f'api_requisicao_consultas_sum{{{rotulos}}}'], 0)
+
+    def test_metodo_desconhecido_nao_cria_series(self):
+        for metodo in ('FOO', 'BAR', 'BAZ'):
+            self.client.generic(metodo, '/nao-existe/')
+        metricas = self.metricas()
+        self.assertEqual(
+            metricas['api_requisicao_duracao_segundos_count{rota="nao_resolvida",metodo="outro",status="404"}'], 3
+        )
+        self.assertFalse(any('FOO' in serie for serie in metricas))
+
+    @override_settings(DEBUG=False, METRICAS_TOKEN=None)
+    def test_sem_token_fora_do_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    @override_settings(METRICAS_TOKEN='segredo')
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer errado').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo').status_code, 200)
@@ -0,0 +1,216 @@
+"""
+Orçamento de consultas: cada rota de ``api_rest/urls.py`` declara quantas
+consultas SQL pode fazer e o teste chama a rota de verdade com carteiras de 1,
+10 e 1000 ativos. Falha se a contagem passar do orçamento ou mudar com a
+quantidade de ativos (um campo do serializer que consulta por linha, um
+prefetch esquecido, etc.).
+
+Para cada tamanho os dados são criados numa transação desfeita ao final e os
+caches são esvaziados antes da requisição, então a contagem inclui o
+preenchimento dos caches (taxas dos indexadores, filtro de emails, usuário
+ativo).
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import urls
+from .filtro_emails import filtro_emails
+from .geracao import gerar_ativo
+from .models import Ativo, Usuario, cache_indexadores
+
+
+TAMANHOS = (1, 10, 1000)
+
+# Constante, mas sem valor fixo: a rota só não pode consultar mais com mais ativos.
+O1 = 'O(1)'
+
+# rota: consultas permitidas (no máximo, e sempre as mesmas em todos os tamanhos) ou O1
+ORCAMENTOS = {
+    'usuario-create': 3,
+    'usuario-list': 3,
+    'provisionar_usuarios_lote': 11,
+    'token_obtain_pair': 1,
+    'listar_ativos': 5,
+    'resumo_ativos': 2,
+    'exportar_ativos': 4,
+    'consultar_ativo_por_id': 5,
+    'consultar_ativo_por_nome': 4,
+    'criar_ativo': 3,
+    'atualizar_ativo': 6,
+    'deletar_ativo': 4,
+    'criar_ativos_lote': 7,
+    'atualizar_ativos_lote': 8,
+    'deletar_ativos_lote': 7,
+    # uma transação para o arquivo inteiro (SAVEPOINT/RELEASE nos blocos)
+    'importar_ativos_csv': 9,
+    'solicitar_resgate': 4,
+    'projetar_resgate': 4,
+    'solicitar_resgate_carteira': 4,
+    'projetar_resgate_carteira': 4,
+    'listar_ativos_async': 4,
+    'consultar_ativo_por_id_async': 4,
+    'criar_ativo_async': 5,
+    'atualizar_ativo_async': 6,
+    'deletar_ativo_async': 4,
+    'checar_email': 4,
+    'listar_indexadores': 2,
+    # revaloriza os ativos do indexador em lotes de TAMANHO_LOTE_VALORES, um só até 1000 ativos
+    'atualizar_indexador': 7,
+}
+
+ATIVO_NOVO = {
+    'nome': 'CDB Novo', 'tipo': 'renda_fixa_bancaria', 'valor_unitario': '1000.00', 'quantidade': 2,
+    'tipo_juros': 'prefixado', 'taxa_fixa': '11.00', 'data_emissao': '2024-01-01',
+    'data_vencimento': '2026-01-01', 'liquidez': 'diaria',
+}
+
+CSV_IMPORTACAO = (
+    'nome,tipo,tipo_negociacao,valor_unitario,quantidade,tipo_juros,taxa_fixa,data_emissao,data_vencimento,liquidez\n'
+    'CDB Importado,renda_fixa_bancaria,balcao,1000.00,1,prefixado,10.50,2024-01-01,2026-01-01,diaria\n'
+)
+
+
+# rota: função (contexto) -> (método, url, corpo, formato)
+REQUISICOES = {
+    'usuario-create': lambda c: (
+        'post', reverse('usuario-create'), {'email': 'novo@exemplo.com', 'nome': 'Novo', 'password': 'senha123'}, 'json'
+    ),
+    'usuario-list': lambda c: ('get', reverse('usuario-list'), None, None),
+    'provisionar_usuarios_lote': lambda c: (
+        'post', reverse('provisionar_usuarios_lote'),
+        [{'email': 'lote@exemplo.com', 'nome': 'Lote', 'password': 'senha123', 'ativos': [ATIVO_NOVO]}], 'json',
+    ),
+    'token_obtain_pair': lambda c: (
+        'post', reverse('token_obtain_pair'), {'email': c['usuario'].email, 'password': 'senha123'}, 'json'
+    ),
+    'listar_ativos': lambda c: ('get', reverse('listar_ativos'), None, None),
+    'resumo_ativos': lambda c: ('get', reverse('resumo_ativos'), None, None),
+    'exportar_ativos': lambda c: ('get', reverse('exportar_ativos'), None, None),
+    'consultar_ativo_por_id': lambda c: ('get', reverse('consultar_ativo_por_id', args=[c['alvo'].pk]), None, None),
+    'consultar_ativo_por_nome': lambda c: ('get', reverse('consultar_ativo_por_nome', args=['Alvo']), None, None),
+    'criar_ativo': lambda c: ('post', reverse('criar_ativo'), ATIVO_NOVO, 'json'),
+    'atualizar_ativo': lambda c: (
+        'patch', reverse('atualizar_ativo', args=[c['alvo'].pk]), {'quantidade': 3}, 'json'
+    ),
+    'deletar_ativo': lambda c: ('delete', reverse('deletar_ativo', args=[c['alvo'].pk]), None, None),
+    'criar_ativos_lote': lambda c: ('post', reverse('criar_ativos_lote'), [ATIVO_NOVO] * 3, 'json'),
+    'atualizar_ativos_lote': lambda c: (
+        'patch', reverse('atualizar_ativos_lote'), [{'id': c['alvo'].pk, 'quantidade': 5}], 'json'
+    ),
+    'deletar_ativos_lote': lambda c: ('post', reverse('deletar_ativos_lote'), {'ids': [c['alvo'].pk]}, 'json'),
+    'importar_ativos_csv': lambda c: (
+        'post', reverse('importar_ativos_csv'),
+        {'arquivo': SimpleUploadedFile('ativos.csv', CSV_IMPORTACAO.encode(), content_type='text/csv')}, 'multipart',
+    ),
+    'solicitar_resgate': lambda c: ('get', reverse('solicitar_resgate', args=[c['alvo'].pk]), None, None),
+    'projetar_resgate': lambda c: (
+        'get', reverse('projetar_resgate', args=[c['alvo'].pk]), {'passo': 'mes'}, None
+    ),
+    'solicitar_resgate_carteira': lambda c: ('get', reverse('solicitar_resgate_carteira'), None, None),
+    'projetar_resgate_carteira': lambda c: (
+        'get', reverse('projetar_resgate_carteira'), {'passo': 'mes', 'fim': '2030-12-31'}, None
+    ),
+    'listar_ativos_async': lambda c: ('get', reverse('listar_ativos_async'), None, None),
+    'consultar_ativo_por_id_async': lambda c: (
+        'get', reverse('consultar_ativo_por_id_async', args=[c['alvo'].pk]), None, None
+    ),
+    'criar_ativo_async': lambda c: ('post', reverse('criar_ativo_async'), ATIVO_NOVO, 'json'),
+    'atualizar_ativo_async': lambda c: (
+        'patch', reverse('atualizar_ativo_async', args=[c['alvo'].pk]), {'quantidade': 3}, 'json'
+    ),
+    'deletar_ativo_async': lambda c: ('delete', reverse('deletar_ativo_async', args=[c['alvo'].pk]), None, None),
+    'checar_email': lambda c: ('get', reverse('checar_email'), {'email': c['usuario'].email}, None),
+    'listar_indexadores': lambda c: ('get', reverse('listar_indexadores'), None, None),
+    'atualizar_indexador': lambda c: ('patch', reverse('atualizar_indexador', args=['CDI']), {'valor': '0.11'}, 'json'),
+}
+
+# rotas chamadas pelo administrador
+ROTAS_ADMIN = {'provisionar_usuarios_lote', 'atualizar_indexador'}
+
+
+def esvaziar_caches():
+    cache_indexadores.invalidar()
+    filtro_emails.invalidar()
+    for cache in caches.all():
+        cache.clear()
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    PROVISIONAMENTO_PROCESSOS=1,
+)
+class OrcamentoConsultasTest(TestCase):
+    def criar_carteira(self, tamanho):
+        usuario = Usuario.objects.create_user(email='orcamento@exemplo.com', nome='Orçamento', password='senha123')
+        admin = Usuario.objects.create_superuser(email='admin@exemplo.com', nome='Admin', password='senha123')
+        emissao = date(2024, 1, 1)
+        alvo = Ativo(
+            usuario=usuario, nome='CDB Alvo', tipo='renda_fixa_bancaria', valor_unitario=Decimal('1000.00'),
+            quantidade=2, tipo_juros='posfixado', indexador='CDI', percentual_sobre_indexador=Decimal('110.00'),
+            data_emissao=emissao, data_vencimento=emissao + timedelta(days=720), liquidez='diaria',
+        )
+        rng = random.Random(tamanho)
+        ativos = Ativo.objects.bulk_create([alvo] + [gerar_ativo(rng, usuario.pk) for _ in range(tamanho - 1)])
+        return {'usuario': usuario, 'admin': admin, 'alvo': ativos[0]}
+
+    def contar_consultas(self, rota, tamanho):
+        """Consultas de uma chamada à rota com uma carteira de ``tamanho`` ativos (dados desfeitos ao final)."""
+        with transaction.atomic():
+            contexto = self.criar_carteira(tamanho)
+            metodo, url, dados, formato = REQUISICOES[rota](contexto)
+            client = APIClient()
+            usuario = contexto['admin'] if rota in ROTAS_ADMIN else contexto['usuario']
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+
+            esvaziar_caches()
+            with CaptureQueriesContext(connection) as consultas:
+                resposta = getattr(client, metodo)(url, dados, format=formato)
+                if resposta.streaming:
+                    b''.join(resposta.streaming_content)
+            self.assertLess(resposta.status_code, 300, f'{rota}: {resposta.status_code}')
+            transaction.set_rollback(True)
+        esvaziar_caches()
+        return len(consultas), [consulta['sql'] for consulta in consultas.captured_queries]
+
+    def test_toda_rota_tem_orcamento(self):
+        rotas = {padrao.name for padrao in urls.urlpatterns if isinstance(padrao, URLPattern)}
+        self.assertEqual(rotas - set(ORCAMENTOS), set(), 'rotas sem orçamento de consultas')
+        self.assertEqual(set(ORCAMENTOS) - rotas, set(), 'orçamentos de rotas que não existem')
+        self.assertEqual(set(REQUISICOES), set(ORCAMENTOS))
+
+    def assertDentroDoOrcamento(self, rota, orcamento):
+        contagens = {}
+        for tamanho in TAMANHOS:
+            contagens[tamanho], sqls = self.contar_consultas(rota, tamanho)
+            if orcamento is not O1:
+                self.assertLessEqual(
+                    contagens[tamanho], orcamento,
+                    f'{rota} com {tamanho} ativo(s) fez {contagens[tamanho]} consultas '
+                    f'(orçamento: {orcamento}):\n' + '\n'.join(sqls),
+                )
+        self.assertEqual(len(set(contagens.values())), 1, f'{rota}: consultas crescem com os ativos {contagens}')
+
+    def test_consultas_nao_crescem_com_os_ativos(self):
+        for rota, orcamento in ORCAMENTOS.items():
+            with self.subTest(rota=rota):
+                self.assertDentroDoOrcamento(rota, orcamento)
+
+    def test_detecta_crescimento(self):
+        # sanidade do próprio verificador: uma consulta por ativo tem de falhar mesmo sem teto fixo
+        with mock.patch.object(self, 'contar_consultas', side_effect=lambda rota, tamanho: (2 + tamanho, [])):
+            with self.assertRaises(AssertionError):
+                self.assertDentroDoOrcamento('listar_ativos', O1)
+            with self.assertRaises(AssertionError):
+                self.assertDentroDoOrcamento('listar_ativos', 5)
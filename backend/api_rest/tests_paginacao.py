@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo
+
+
+class PaginacaoKeysetTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='pag@exemplo.com', nome='Pag', password='senha123'
+        )
+        outro = Usuario.objects.create_user(
+            email='outro@exemplo.com', nome='Outro', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+        emissao = date(2024, 1, 1)
+        ativos = []
+        for i in range(37):
+            ativos.append(Ativo(
+                usuario=self.usuario if i % 5 else outro, nome=f'Ativo {i:02d}',
+                tipo='renda_fixa_bancaria', valor_unitario=Decimal('100.00'),
+                quantidade=1 + i % 4, tipo_juros='prefixado', taxa_fixa=Decimal('10.00'),
+                data_emissao=emissao,
+                # vencimentos repetidos para exercitar o desempate por id
+                data_vencimento=emissao + timedelta(days=365 + 30 * (i % 3)),
+                liquidez='diaria',
+            ))
+        Ativo.objects.bulk_create(ativos)
+        # alguns rendimentos nulos para exercitar a ordenação com nulos
+        Ativo.objects.filter(usuario=self.usuario, quantidade=2).update(rendimento_esperado_armazenado=None)
+
+    def percorrer(self, **params):
+        """Segue os links 'next' e devolve as páginas e a lista de ids vista."""
+        resposta = self.client.get(reverse('listar_ativos'), {'page_size': 4, **params})
+        paginas = [resposta.data]
+        while resposta.data['next']:
+            resposta = self.client.get(resposta.data['next'])
+            self.assertEqual(resposta.status_code, 200)
+            paginas.append(resposta.data)
+        ids = [item['id'] for pagina in paginas for item in pagina['results']]
+        return paginas, ids
+
+    def esperado(self, *ordem):
+        return list(Ativo.objects.filter(usuario=self.usuario).order_by(*ordem).values_list('id', flat=True))
+
+    def test_percorre_por_id(self):
+        paginas, ids = self.percorrer()
+        self.assertEqual(ids, self.esperado('id'))
+        self.assertIsNone(paginas[0]['previous'])
+        self.assertEqual(len(paginas[0]['results']), 4)
+
+    def test_percorre_por_data_vencimento(self):
+        _, ids = self.percorrer(ordering='data_vencimento')
+        self.assertEqual(ids, self.esperado('data_vencimento', 'id'))
+
+        _, ids = self.percorrer(ordering='-data_vencimento')
+        self.assertEqual(ids, self.esperado('-data_vencimento', '-id'))
+
+    def test_percorre_coluna_com_nulos(self):
+        _, ids = self.percorrer(ordering='-rendimento_esperado')
+        ordem = [F('rendimento_esperado_armazenado').desc(nulls_last=True), '-id']
+        self.assertEqual(ids, self.esperado(*ordem))
+
+    def test_link_anterior_volta_para_a_pagina_anterior(self):
+        paginas, _ = self.percorrer(ordering='data_vencimento')
+        resposta = self.client.get(paginas[2]['previous'])
+        self.assertEqual(
+            [a['id'] for a in resposta.data['results']],
+            [a['id'] for a in paginas[1]['results']],
+        )
+
+    def test_sem_count(self):
+        primeira = self.client.get(reverse('listar_ativos'), {'page_size': 4})
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(primeira.data['next'])
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in consultas.captured_queries))
+
+    def test_cursor_invalido(self):
+        resposta = self.client.get(reverse('listar_ativos'), {'cursor': 'nao-e-um-cursor'})
+        self.assertEqual(resposta.status_code, 404)
+
+        # cursor gerado para outra ordenação também é rejeitado
+        primeira = self.client.get(reverse('listar_ativos'), {'page_size': 4})
+        cursor = primeira.data['next'].split('cursor=')[1]
+        resposta = self.client.get(reverse('listar_ativos'), {'cursor': cursor, 'ordering': 'nome'})
+        self.assertEqual(resposta.status_code, 404)
+
+    def test_sem_parametros_continua_sem_paginacao(self):
+        resposta = self.client.get(reverse('listar_ativos'))
+        self.assertIsInstance(resposta.data, list)
+        self.assertEqual(len(resposta.data), len(self.esperado('id')))
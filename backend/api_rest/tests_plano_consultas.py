@@ -0,0 +1,156 @@
+"""
+Regressão de plano de consulta: cada endpoint de ativos é chamado de verdade,
+as consultas executadas são capturadas e cada uma passa por EXPLAIN. O teste
+falha se alguma delas varrer uma tabela inteira em vez de usar um índice.
+"""
+
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .filtro_emails import filtro_emails
+from .models import Usuario, Ativo, cache_indexadores
+
+
+# Tabelas que crescem com o uso. Indexador é um catálogo fixo de quatro linhas.
+TABELAS_MONITORADAS = {'api_rest_ativo', 'api_rest_usuario'}
+
+_VARREDURA_SQLITE = re.compile(r'^SCAN (\w+)(?: AS \w+)?(?! VIRTUAL TABLE)')
+_VARREDURA_POSTGRES = re.compile(r'Seq Scan on (\w+)')
+
+
+def varreduras_completas(sql):
+    """Tabelas monitoradas que o plano de ``sql`` percorre por inteiro."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # sem seq scan disponível, o planner só volta a ele se não houver índice utilizável
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+            linhas = [linha[0] for linha in cursor.fetchall()]
+            tabelas = [m.group(1) for linha in linhas for m in [_VARREDURA_POSTGRES.search(linha)] if m]
+        else:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            linhas = [linha[-1] for linha in cursor.fetchall()]
+            tabelas = [m.group(1) for linha in linhas for m in [_VARREDURA_SQLITE.match(linha)] if m]
+    return [t for t in tabelas if t in TABELAS_MONITORADAS], linhas
+
+
+class PlanoConsultasTest(TestCase):
+    def setUp(self):
+        cache_indexadores.invalidar()
+        self.addCleanup(cache_indexadores.invalidar)
+
+        self.usuario = Usuario.objects.create_user(
+            email='plano@exemplo.com', nome='Plano', password='senha123'
+        )
+        self.admin = Usuario.objects.create_superuser(
+            email='admin@exemplo.com', nome='Admin', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+        emissao = date(2024, 1, 1)
+        self.ativos = Ativo.objects.bulk_create([
+            Ativo(
+                usuario=self.usuario, nome=f'CDB Banco {i}', tipo='renda_fixa_bancaria',
+                valor_unitario=Decimal('100.00'), quantidade=1 + i,
+                tipo_juros='posfixado', indexador='CDI', percentual_sobre_indexador=Decimal('110.00'),
+                data_emissao=emissao, data_vencimento=emissao + timedelta(days=365 + i),
+                liquidez='diaria',
+            )
+            for i in range(20)
+        ])
+        self.ativo = self.ativos[0]
+
+    def assertSemVarredura(self, metodo, url, dados=None, usuario=None):
+        if usuario is not None:
+            self.client.force_authenticate(usuario)
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = getattr(self.client, metodo)(url, dados, format='json')
+        self.assertLess(resposta.status_code, 500)
+
+        explicadas = 0
+        for consulta in consultas.captured_queries:
+            sql = consulta['sql']
+            if not re.match(r'\s*(SELECT|UPDATE|DELETE)\b', sql, re.IGNORECASE):
+                continue
+            tabelas, plano = varreduras_completas(sql)
+            self.assertEqual(tabelas, [], f'{url}: varredura completa em\n{sql}\nplano: {plano}')
+            explicadas += 1
+        return explicadas
+
+    def test_listar_ativos(self):
+        url = reverse('listar_ativos')
+        self.assertSemVarredura('get', url)
+        self.assertSemVarredura('get', url + '?nome=banco')
+        self.assertSemVarredura('get', url + '?tipo=renda_fixa_bancaria&indexador=CDI')
+        self.assertSemVarredura('get', url + '?ordering=data_vencimento')
+        self.assertSemVarredura('get', url + '?ordering=-rendimento_esperado&rendimento_esperado_min=100')
+        self.assertSemVarredura('get', url + '?valor_investido_min=500&valor_investido_max=900')
+
+    def test_listar_ativos_paginado(self):
+        url = reverse('listar_ativos')
+        for ordering in ['id', 'data_vencimento', '-rendimento_esperado', 'nome']:
+            primeira = self.client.get(url, {'page_size': 5, 'ordering': ordering})
+            self.assertSemVarredura('get', url + f'?page_size=5&ordering={ordering}')
+            self.assertSemVarredura('get', primeira.data['next'])
+
+    def test_resumo_ativos(self):
+        self.assertEqual(self.assertSemVarredura('get', reverse('resumo_ativos')), 1)
+
+    def test_exportar_ativos(self):
+        url = reverse('exportar_ativos')
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(url + '?formato=ndjson&ordering=data_vencimento')
+            b''.join(resposta.streaming_content)
+        for consulta in consultas.captured_queries:
+            tabelas, plano = varreduras_completas(consulta['sql'])
+            self.assertEqual(tabelas, [], f'{url}: varredura completa em\n{consulta["sql"]}\nplano: {plano}')
+
+    def test_ativo_por_id_e_resgate(self):
+        self.assertSemVarredura('get', reverse('consultar_ativo_por_id', args=[self.ativo.pk]))
+        self.assertSemVarredura('get', reverse('solicitar_resgate', args=[self.ativo.pk]))
+        self.assertSemVarredura('get', reverse('projetar_resgate', args=[self.ativo.pk]) + '?passo=mes')
+        self.assertSemVarredura('get', reverse('projetar_resgate_carteira') + '?passo=mes')
+        self.assertSemVarredura('get', reverse('solicitar_resgate_carteira'))
+
+    def test_ativo_por_nome(self):
+        self.assertSemVarredura('get', reverse('consultar_ativo_por_nome', args=['Banco 1']))
+        self.assertSemVarredura('get', reverse('consultar_ativo_por_nome', args=['B']))
+
+    def test_escrita(self):
+        self.assertSemVarredura('patch', reverse('atualizar_ativo', args=[self.ativo.pk]), {'quantidade': 3})
+        self.assertSemVarredura('delete', reverse('deletar_ativo', args=[self.ativos[1].pk]))
+
+    def test_escrita_em_lote(self):
+        ids = [a.pk for a in self.ativos[2:6]]
+        self.assertSemVarredura(
+            'patch', reverse('atualizar_ativos_lote'), [{'id': pk, 'quantidade': 7} for pk in ids]
+        )
+        self.assertSemVarredura('post', reverse('deletar_ativos_lote'), {'ids': ids})
+
+    def test_checar_email(self):
+        # a montagem do filtro de emails lê a tabela toda uma vez por processo
+        filtro_emails.invalidar()
+        filtro_emails.pode_existir('plano@exemplo.com')
+        self.assertSemVarredura('get', reverse('checar_email') + '?email=plano@exemplo.com')
+
+    def test_revalorizacao_por_indexador(self):
+        explicadas = self.assertSemVarredura(
+            'patch', reverse('atualizar_indexador', args=['CDI']), {'taxa': '0.14'}, usuario=self.admin
+        )
+        self.assertGreater(explicadas, 0)
+
+    def test_detecta_varredura(self):
+        # sanidade do próprio verificador: emissor não tem índice
+        sql, params = Ativo.objects.filter(emissor='Banco X').query.sql_with_params()
+        with connection.cursor() as cursor:
+            sql = connection.ops.last_executed_query(cursor, sql, params)
+        tabelas, _ = varreduras_completas(sql)
+        self.assertEqual(tabelas, ['api_rest_ativo'])
@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .avaliacao import datas_da_serie, serie_resgates, serie_resgates_carteira
+from .models import Usuario, Ativo
+
+
+class DatasDaSerieTest(SimpleTestCase):
+    def test_passos(self):
+        self.assertEqual(
+            datas_da_serie(date(2024, 1, 1), date(2024, 1, 4), 'dia'),
+            [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4)],
+        )
+        self.assertEqual(
+            datas_da_serie(date(2024, 1, 1), date(2024, 1, 20), 'semana'),
+            [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15), date(2024, 1, 20)],
+        )
+        self.assertEqual(
+            datas_da_serie(date(2024, 1, 31), date(2024, 4, 30), 'mes'),
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)],
+        )
+        self.assertEqual(datas_da_serie(date(2024, 1, 1), date(2024, 1, 1), 'mes'), [date(2024, 1, 1)])
+
+    def test_limite(self):
+        with self.assertRaises(ValueError):
+            datas_da_serie(date(2024, 1, 1), date(2025, 1, 1), 'dia', limite=100)
+
+
+class ProjecaoResgateTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='projecao@exemplo.com', nome='Projecao', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+        emissao = date(2024, 1, 1)
+        self.ativos = Ativo.objects.bulk_create([
+            Ativo(
+                usuario=self.usuario, nome=f'Ativo {i}', tipo='renda_fixa_bancaria',
+                valor_unitario=Decimal('1000.00') + i, quantidade=1 + i % 3,
+                tipo_juros=['prefixado', 'posfixado', 'hibrido'][i % 3],
+                taxa_fixa=None if i % 3 == 1 else Decimal('7.50') + i,
+                indexador=None if i % 3 == 0 else ['CDI', 'IPCA'][i % 2],
+                percentual_sobre_indexador=None if i % 3 == 0 else Decimal('100.00') + i,
+                data_emissao=emissao + timedelta(days=20 * i),
+                data_vencimento=emissao + timedelta(days=300 + 15 * i),
+                liquidez='apos_vencimento' if i == 4 else 'diaria',
+            )
+            for i in range(12)
+        ])
+
+    def test_serie_igual_ao_metodo_do_modelo(self):
+        datas = datas_da_serie(date(2023, 12, 1), date(2025, 3, 1), 'dia')
+        series = serie_resgates(self.ativos, datas)
+        for ativo, serie in zip(self.ativos, series):
+            self.assertEqual(serie, [ativo.calcular_resgate(d) for d in datas], ativo.nome)
+
+    def test_carteira_soma_os_resgates_individuais(self):
+        datas = datas_da_serie(date(2023, 12, 15), date(2025, 2, 1), 'semana')
+        serie = serie_resgates_carteira(self.ativos, datas, tamanho_bloco=5)
+
+        for ponto in serie:
+            resgates = [(a, a.calcular_resgate(ponto['data'])) for a in self.ativos]
+            resgates = [(a, r) for a, r in resgates if r is not None]
+            self.assertEqual(ponto['ativos'], len(resgates))
+            self.assertEqual(ponto['valor_acumulado'], sum((r['valor_acumulado'] for _, r in resgates), Decimal('0.00')))
+            self.assertEqual(ponto['valor_investido'], sum((a.valor_investido for a, _ in resgates), Decimal('0.00')))
+            self.assertEqual(ponto['rendimento'], ponto['valor_acumulado'] - ponto['valor_investido'])
+
+    def test_endpoint_ativo(self):
+        ativo = self.ativos[0]
+        resposta = self.client.get(
+            reverse('projetar_resgate', args=[ativo.pk]),
+            {'inicio': '2023-12-31', 'fim': '2024-03-31', 'passo': 'mes'},
+        )
+        self.assertEqual(resposta.status_code, 200)
+        serie = resposta.data['serie']
+        self.assertEqual([p['data'] for p in serie], datas_da_serie(date(2023, 12, 31), date(2024, 3, 31), 'mes'))
+        self.assertIsNone(serie[0]['valor_acumulado'])  # antes da emissão
+        self.assertEqual(serie[2]['valor_acumulado'], ativo.calcular_resgate(date(2024, 2, 29))['valor_acumulado'])
+
+        # padrão: de hoje até o vencimento
+        resposta = self.client.get(reverse('projetar_resgate', args=[ativo.pk]), {'inicio': '2024-06-01'})
+        self.assertEqual(resposta.data['serie'][-1]['data'], ativo.data_vencimento)
+
+        # liquidez no vencimento não tem resgate antecipado
+        resposta = self.client.get(reverse('projetar_resgate', args=[self.ativos[4].pk]))
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_passo_padrao_em_ativo_longo(self):
+        hoje = date.today()
+        longo = Ativo.objects.create(
+            usuario=self.usuario, nome='Tesouro IPCA+ 2055', tipo='titulos_publicos', valor_unitario=Decimal('1000.00'),
+            quantidade=1, tipo_juros='hibrido', taxa_fixa=Decimal('6.00'), indexador='IPCA',
+            percentual_sobre_indexador=Decimal('100.00'), data_emissao=hoje - timedelta(days=365),
+            data_vencimento=hoje + timedelta(days=30 * 365), liquidez='diaria',
+        )
+        url = reverse('projetar_resgate', args=[longo.pk])
+
+        # sem passo: o menor que cabe no limite (30 anos não cabem em dias, cabem em semanas)
+        serie = self.client.get(url).data['serie']
+        self.assertEqual(serie[1]['data'] - serie[0]['data'], timedelta(weeks=1))
+        self.assertEqual(serie[-1]['data'], longo.data_vencimento)
+
+        # passo informado que passa do limite continua sendo erro
+        self.assertEqual(self.client.get(url, {'passo': 'dia'}).status_code, 400)
+
+    def test_endpoint_carteira(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(reverse('projetar_resgate_carteira'), {'inicio': '2024-01-01', 'passo': 'mes'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len([q for q in consultas.captured_queries if 'api_rest_ativo' in q['sql']]), 1)
+
+        serie = resposta.data['serie']
+        self.assertEqual(serie[-1]['data'], max(a.data_vencimento for a in self.ativos if a.liquidez == 'diaria'))
+        self.assertEqual(serie[-1]['ativos'], 11)
+
+    def test_parametros_invalidos(self):
+        url = reverse('projetar_resgate_carteira')
+        for params in [
+            {'inicio': '2024-13-01'},
+            {'inicio': '2024-02-01', 'fim': '2024-01-01'},
+            {'passo': 'ano'},
+            {'inicio': '2000-01-01', 'fim': '2030-01-01', 'passo': 'dia'},
+        ]:
+            self.assertEqual(self.client.get(url, params).status_code, 400, params)
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .filtro_emails import filtro_emails
+from .models import Usuario, Ativo
+from .provisionamento import provisionar_usuarios
+from .views import LIMITE_USUARIOS_PROVISIONAMENTO
+
+
+def ativo(**kwargs):
+    dados = {
+        'nome': 'CDB Inicial', 'tipo': 'renda_fixa_bancaria', 'valor_unitario': '1000.00', 'quantidade': 2,
+        'tipo_juros': 'prefixado', 'taxa_fixa': '11.00', 'data_emissao': '2024-01-01',
+        'data_vencimento': '2026-01-01', 'liquidez': 'diaria',
+    }
+    dados.update(kwargs)
+    return dados
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisionamentoTest(TestCase):
+    def setUp(self):
+        filtro_emails.invalidar()
+        self.addCleanup(filtro_emails.invalidar)
+        Usuario.objects.create_user(email='existe@exemplo.com', nome='Existe', password='senha123')
+
+    def registros(self):
+        return list(enumerate([
+            {'email': 'ana@Empresa.com', 'nome': 'Ana', 'password': 'senha-ana', 'ativos': [ativo(), ativo(nome='Outro')]},
+            {'email': 'bia@empresa.com', 'nome': 'Bia', 'password': 'senha-bia'},
+            {'email': 'sem-senha@empresa.com', 'nome': 'Sem Senha'},
+            {'email': 'existe@exemplo.com', 'nome': 'Repetido', 'password': 'x'},
+            {'email': 'bia@empresa.com', 'nome': 'Bia de novo', 'password': 'x'},
+            {'email': 'ruim@empresa.com', 'nome': 'Ruim', 'ativos': [ativo(), ativo(taxa_fixa=None)]},
+            {'email': 'nao-e-email', 'nome': 'Inválido'},
+            None,
+        ], start=1))
+
+    def provisionar(self, **kwargs):
+        rejeitados = {}
+        resultado = provisionar_usuarios(
+            self.registros(), tamanho_bloco=3, ao_rejeitar=rejeitados.__setitem__, **kwargs
+        )
+        return resultado, rejeitados
+
+    def conferir(self, resultado, rejeitados):
+        self.assertEqual(resultado, (3, 2, 5))
+        self.assertEqual(sorted(rejeitados), [4, 5, 6, 7, 8])
+        self.assertIn('email', rejeitados[4])
+        self.assertIn('email', rejeitados[5])
+        self.assertIn('ativos[1].taxa_fixa', rejeitados[6])
+
+        ana = Usuario.objects.get(email='ana@empresa.com')
+        self.assertTrue(ana.check_password('senha-ana'))
+        self.assertTrue(Usuario.objects.get(email='bia@empresa.com').check_password('senha-bia'))
+        self.assertFalse(Usuario.objects.get(email='sem-senha@empresa.com').has_usable_password())
+        self.assertFalse(Usuario.objects.filter(email='ruim@empresa.com').exists())
+
+        ativos = Ativo.objects.filter(usuario=ana)
+        self.assertEqual(ativos.count(), 2)
+        self.assertEqual(ativos.first().valor_investido_armazenado, ativos.first().valor_investido)
+
+    def test_provisiona_no_processo_atual(self):
+        self.conferir(*self.provisionar(processos=1))
+
+    def test_provisiona_com_pool_de_processos(self):
+        with mock.patch('api_rest.provisionamento.MINIMO_SENHAS_PARALELO', 1):
+            self.conferir(*self.provisionar(processos=2))
+
+    def test_filtro_de_emails_atualizado(self):
+        client = APIClient()
+        self.assertFalse(client.get(reverse('checar_email'), {'email': 'bia@empresa.com'}).data['existe'])
+        self.provisionar(processos=1)
+        self.assertTrue(client.get(reverse('checar_email'), {'email': 'bia@empresa.com'}).data['existe'])
+
+    def test_endpoint_somente_admin(self):
+        client = APIClient()
+        corpo = [dados for _, dados in self.registros()]
+        client.force_authenticate(Usuario.objects.get(email='existe@exemplo.com'))
+        self.assertEqual(client.post(reverse('provisionar_usuarios_lote'), corpo, format='json').status_code, 403)
+
+        admin = Usuario.objects.create_superuser(email='admin@exemplo.com', nome='Admin', password='senha123')
+        client.force_authenticate(admin)
+        resposta = client.post(reverse('provisionar_usuarios_lote'), corpo, format='json')
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual((resposta.data['usuarios'], resposta.data['ativos']), (3, 2))
+        self.assertEqual([r['indice'] for r in resposta.data['rejeitados']], [3, 4, 5, 6, 7])
+
+    def test_endpoint_limite_de_usuarios(self):
+        client = APIClient()
+        admin = Usuario.objects.create_superuser(email='admin@exemplo.com', nome='Admin', password='senha123')
+        client.force_authenticate(admin)
+        corpo = [
+            {'email': f'u{i}@empresa.com', 'nome': f'U{i}'} for i in range(LIMITE_USUARIOS_PROVISIONAMENTO + 1)
+        ]
+        resposta = client.post(reverse('provisionar_usuarios_lote'), corpo, format='json')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(Usuario.objects.filter(email__endswith='@empresa.com').exists())
+
+    def test_comando(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo = os.path.join(pasta, 'usuarios.ndjson')
+            relatorio = os.path.join(pasta, 'erros.csv')
+            with open(arquivo, 'w', encoding='utf-8') as saida:
+                for _, registro in self.registros():
+                    saida.write((json.dumps(registro) if registro else '[1]') + '\n')
+
+            out = StringIO()
+            call_command('provisionar_usuarios', arquivo, processos=1, lote=3, relatorio=relatorio, stdout=out)
+            self.assertIn('3 usuário(s) e 2 ativo(s) criado(s), 5 registro(s) rejeitado(s).', out.getvalue())
+            with open(relatorio, encoding='utf-8') as entrada:
+                self.assertIn('6,ativos[1].taxa_fixa,', entrada.read())
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo
+
+
+class ResgateCarteiraTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='resgate@exemplo.com', nome='Resgate', password='senha123'
+        )
+        outro = Usuario.objects.create_user(
+            email='outro@exemplo.com', nome='Outro', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+        emissao = date(2024, 1, 1)
+        self.ativos = Ativo.objects.bulk_create([
+            Ativo(
+                usuario=self.usuario, nome=f'CDB {i}', tipo='renda_fixa_bancaria',
+                valor_unitario=Decimal('1000.00') + i, quantidade=1 + i,
+                tipo_juros='posfixado' if i % 2 else 'prefixado',
+                taxa_fixa=None if i % 2 else Decimal('11.25'),
+                indexador='CDI' if i % 2 else None,
+                percentual_sobre_indexador=Decimal('104.00') if i % 2 else None,
+                data_emissao=emissao + timedelta(days=40 * i),
+                data_vencimento=emissao + timedelta(days=720),
+                liquidez='apos_vencimento' if i == 3 else 'diaria',
+            )
+            for i in range(8)
+        ])
+        Ativo.objects.create(
+            usuario=outro, nome='Alheio', tipo='renda_fixa_bancaria', valor_unitario=Decimal('50.00'),
+            quantidade=1, tipo_juros='prefixado', taxa_fixa=Decimal('10.00'),
+            data_emissao=emissao, data_vencimento=emissao + timedelta(days=365), liquidez='diaria',
+        )
+
+    def test_resgate_da_carteira(self):
+        data = date(2024, 8, 1)
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(reverse('solicitar_resgate_carteira'), {'data_resgate': data.isoformat()})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len([q for q in consultas.captured_queries if 'api_rest_ativo' in q['sql']]), 1)
+
+        dados = resposta.data
+        resgataveis = [a for a in self.ativos if a.calcular_resgate(data) is not None]
+        self.assertEqual([item['id'] for item in dados['ativos']], [a.pk for a in resgataveis])
+        for item, ativo in zip(dados['ativos'], resgataveis):
+            esperado = ativo.calcular_resgate(data)
+            self.assertEqual(
+                {k: item[k] for k in esperado}, esperado, ativo.nome
+            )
+
+        self.assertEqual(dados['valor_acumulado'], sum(i['valor_acumulado'] for i in dados['ativos']))
+        self.assertEqual(dados['valor_investido'], sum(a.valor_investido for a in resgataveis))
+        self.assertEqual(dados['rendimento'], dados['valor_acumulado'] - dados['valor_investido'])
+
+        motivos = {item['id']: item['motivo'] for item in dados['nao_resgataveis']}
+        self.assertIn('vencimento', motivos[self.ativos[3].pk])
+        self.assertIn('emissão', motivos[self.ativos[7].pk])  # emitido em 2024-10-07
+        self.assertEqual(len(dados['ativos']) + len(motivos), len(self.ativos))
+
+    def test_data_invalida(self):
+        resposta = self.client.get(reverse('solicitar_resgate_carteira'), {'data_resgate': '01/08/2024'})
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_carteira_vazia(self):
+        Ativo.objects.filter(usuario=self.usuario).delete()
+        resposta = self.client.get(reverse('solicitar_resgate_carteira'))
+        self.assertEqual(resposta.data['valor_acumulado'], Decimal('0.00'))
+        self.assertEqual(resposta.data['ativos'], [])
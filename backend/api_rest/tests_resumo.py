@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo
+
+
+class ResumoCarteiraTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='resumo@exemplo.com', nome='Resumo', password='senha123'
+        )
+        outro = Usuario.objects.create_user(
+            email='outro@exemplo.com', nome='Outro', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+        emissao = date(2024, 1, 1)
+        comum = dict(data_emissao=emissao, data_vencimento=emissao + timedelta(days=730))
+        Ativo.objects.bulk_create([
+            Ativo(usuario=self.usuario, nome='CDB', tipo='renda_fixa_bancaria', valor_unitario=Decimal('1000.00'),
+                  quantidade=3, tipo_juros='prefixado', taxa_fixa=Decimal('12.00'), liquidez='diaria', **comum),
+            Ativo(usuario=self.usuario, nome='LCI', tipo='renda_fixa_bancaria', valor_unitario=Decimal('500.50'),
+                  quantidade=2, tipo_juros='posfixado', indexador='CDI',
+                  percentual_sobre_indexador=Decimal('95.00'), liquidez='apos_vencimento', **comum),
+            Ativo(usuario=self.usuario, nome='Tesouro', tipo='titulos_publicos', valor_unitario=Decimal('3000.00'),
+                  quantidade=1, tipo_juros='hibrido', taxa_fixa=Decimal('6.00'), indexador='IPCA',
+                  percentual_sobre_indexador=Decimal('100.00'), liquidez='diaria',
+                  possuiImposto=True, aliquotaImposto=Decimal('15.00'), **comum),
+            Ativo(usuario=outro, nome='Alheio', tipo='renda_fixa_bancaria', valor_unitario=Decimal('99999.00'),
+                  quantidade=1, tipo_juros='prefixado', taxa_fixa=Decimal('10.00'), liquidez='diaria', **comum),
+        ])
+        self.meus = list(Ativo.objects.filter(usuario=self.usuario))
+
+    def test_totais(self):
+        with self.assertNumQueries(1):
+            resposta = self.client.get(reverse('resumo_ativos'))
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.data
+
+        self.assertEqual(dados['quantidade_ativos'], 3)
+        self.assertEqual(dados['valor_investido'], Decimal('7001.00'))
+        esperado = sum(a.rendimento_esperado().quantize(Decimal('0.01')) for a in self.meus)
+        self.assertEqual(dados['rendimento_esperado'], esperado)
+        self.assertEqual(dados['ativos_sem_rendimento'], 0)
+
+    def test_por_dimensao(self):
+        dados = self.client.get(reverse('resumo_ativos')).data
+
+        por_tipo = {linha['tipo']: linha for linha in dados['por_tipo']}
+        self.assertEqual(por_tipo['renda_fixa_bancaria']['valor_investido'], Decimal('4001.00'))
+        self.assertEqual(por_tipo['titulos_publicos']['quantidade_ativos'], 1)
+
+        self.assertEqual([l['indexador'] for l in dados['por_indexador']], ['CDI', 'IPCA', None])
+        self.assertEqual(
+            {l['liquidez']: l['valor_investido'] for l in dados['por_liquidez']},
+            {'diaria': Decimal('6000.00'), 'apos_vencimento': Decimal('1001.00')},
+        )
+        for dimensao in ['por_tipo', 'por_tipo_juros', 'por_indexador', 'por_liquidez']:
+            self.assertEqual(sum(l['rendimento_esperado'] for l in dados[dimensao]), dados['rendimento_esperado'])
+
+    def test_rendimento_nao_calculavel(self):
+        Ativo.objects.filter(nome='CDB').update(rendimento_esperado_armazenado=None)
+
+        dados = self.client.get(reverse('resumo_ativos')).data
+        self.assertEqual(dados['ativos_sem_rendimento'], 1)
+        self.assertEqual(dados['valor_investido'], Decimal('7001.00'))
+
+    def test_carteira_vazia(self):
+        Ativo.objects.filter(usuario=self.usuario).delete()
+        dados = self.client.get(reverse('resumo_ativos')).data
+        self.assertEqual(dados['quantidade_ativos'], 0)
+        self.assertEqual(dados['valor_investido'], Decimal('0.00'))
+        self.assertEqual(dados['por_tipo'], [])
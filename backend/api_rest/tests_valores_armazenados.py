@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Usuario, Ativo, VersaoCarteira
+
+
+class ValoresArmazenadosTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='valores@exemplo.com', nome='Valores', password='senha123'
+        )
+        self.data_emissao = date(2024, 1, 1)
+
+    def dados_ativo(self, **kwargs):
+        dados = {
+            'usuario': self.usuario,
+            'nome': 'CDB Banco X',
+            'tipo': 'renda_fixa_bancaria',
+            'valor_unitario': Decimal('1000.00'),
+            'quantidade': 2,
+            'tipo_juros': 'prefixado',
+            'taxa_fixa': Decimal('10.00'),
+            'data_emissao': self.data_emissao,
+            'data_vencimento': self.data_emissao + timedelta(days=730),
+            'liquidez': 'diaria',
+        }
+        dados.update(kwargs)
+        return dados
+
+    def assertValoresAtuais(self, ativo):
+        ativo.refresh_from_db()
+        self.assertEqual(ativo.valor_investido_armazenado, ativo.valor_investido)
+        self.assertEqual(
+            ativo.rendimento_esperado_armazenado,
+            ativo.rendimento_esperado().quantize(Decimal('0.01')),
+        )
+
+    def test_save_preenche_valores(self):
+        ativo = Ativo.objects.create(**self.dados_ativo())
+        self.assertValoresAtuais(ativo)
+
+        ativo.quantidade = 5
+        ativo.save(update_fields=['quantidade'])
+        self.assertValoresAtuais(ativo)
+
+    def test_queryset_update_recalcula(self):
+        ativo = Ativo.objects.create(**self.dados_ativo())
+        Ativo.objects.filter(pk=ativo.pk).update(taxa_fixa=Decimal('12.50'))
+        self.assertValoresAtuais(ativo)
+
+    def test_bulk_create_e_bulk_update_preenchem_valores(self):
+        ativos = Ativo.objects.bulk_create([
+            Ativo(**self.dados_ativo(quantidade=q)) for q in range(1, 6)
+        ])
+        for ativo in Ativo.objects.filter(usuario=self.usuario):
+            self.assertValoresAtuais(ativo)
+
+        for ativo in ativos:
+            ativo.valor_unitario = Decimal('50.00')
+        Ativo.objects.bulk_update(ativos, ['valor_unitario'])
+        for ativo in Ativo.objects.filter(usuario=self.usuario):
+            self.assertValoresAtuais(ativo)
+
+    def test_bulk_update_grava_e_versiona_uma_vez(self):
+        ativo = Ativo.objects.create(**self.dados_ativo())
+        versao = VersaoCarteira.atual(self.usuario.pk)[0]
+
+        ativo.quantidade = 7
+        # o UPDATE dos ativos e o da versão; sem revalorizar de novo pelo AtivoQuerySet.update
+        with self.assertNumQueries(2):
+            Ativo.objects.bulk_update([ativo], ['quantidade'])
+        self.assertValoresAtuais(ativo)
+        self.assertEqual(VersaoCarteira.atual(self.usuario.pk)[0], versao + 1)
+
+    def test_comando_recalcular_valores(self):
+        ativo = Ativo.objects.create(**self.dados_ativo())
+        Ativo.objects.filter(pk=ativo.pk).update(
+            valor_investido_armazenado=None, rendimento_esperado_armazenado=None
+        )
+
+        saida = StringIO()
+        call_command('recalcular_valores', stdout=saida)
+        self.assertIn('1 ativo(s)', saida.getvalue())
+        self.assertValoresAtuais(ativo)
+
+
+class ListarAtivosOrdenacaoTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            email='ordem@exemplo.com', nome='Ordem', password='senha123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+        emissao = date(2024, 1, 1)
+        for nome, quantidade in (('A', 1), ('B', 3), ('C', 2)):
+            Ativo.objects.create(
+                usuario=self.usuario, nome=nome, tipo='renda_fixa_bancaria',
+                valor_unitario=Decimal('100.00'), quantidade=quantidade,
+                tipo_juros='prefixado', taxa_fixa=Decimal('10.00'),
+                data_emissao=emissao, data_vencimento=emissao + timedelta(days=365),
+                liquidez='diaria',
+            )
+
+    def test_ordenacao_por_rendimento(self):
+        resposta = self.client.get(reverse('listar_ativos'), {'ordering': '-rendimento_esperado'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual([a['nome'] for a in resposta.data], ['B', 'C', 'A'])
+
+    def test_filtro_de_faixa(self):
+        resposta = self.client.get(reverse('listar_ativos'), {
+            'valor_investido_min': '150', 'valor_investido_max': '250',
+        })
+        self.assertEqual([a['nome'] for a in resposta.data], ['C'])
+
+    def test_parametros_invalidos(self):
+        resposta = self.client.get(reverse('listar_ativos'), {'ordering': 'emissor'})
+        self.assertEqual(resposta.status_code, 400)
+        resposta = self.client.get(reverse('listar_ativos'), {'rendimento_esperado_min': 'abc'})
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_resposta_nao_expoe_colunas_armazenadas(self):
+        resposta = self.client.get(reverse('listar_ativos'))
+        self.assertNotIn('rendimento_esperado_armazenado', resposta.data[0])
+        self.assertIn('rendimento_esperado', resposta.data[0])
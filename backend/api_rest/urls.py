@@ -1,17 +1,34 @@
 from django.urls import path
-from . import views
+from . import views, views_async
 from .views import UsuarioCreateView, UsuarioListView, CustomTokenObtainPairView, checar_email
 
 urlpatterns = [
     path('usuarios/', UsuarioCreateView.as_view(), name='usuario-create'),
     path('usuarios/lista/', UsuarioListView.as_view(), name='usuario-list'),
+    path('usuarios/lote/', views.provisionar_usuarios_lote, name='provisionar_usuarios_lote'),
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),  
     path('ativos/', views.listar_ativos, name='listar_ativos'),
+    path('ativos/resumo/', views.resumo_ativos, name='resumo_ativos'),
+    path('ativos/exportar/', views.exportar_ativos, name='exportar_ativos'),
     path('ativos/<int:pk>/', views.consultar_ativo_por_id, name='consultar_ativo_por_id'),
     path('ativos/nome/<str:nome>/', views.consultar_ativo_por_nome, name='consultar_ativo_por_nome'),
     path('ativos/criar/', views.criar_ativo, name='criar_ativo'),
     path('ativos/atualizar/<int:pk>/', views.atualizar_ativo, name='atualizar_ativo'),
     path('ativos/deletar/<int:pk>/', views.deletar_ativo, name='deletar_ativo'),
+    path('ativos/lote/criar/', views.criar_ativos_lote, name='criar_ativos_lote'),
+    path('ativos/lote/atualizar/', views.atualizar_ativos_lote, name='atualizar_ativos_lote'),
+    path('ativos/lote/deletar/', views.deletar_ativos_lote, name='deletar_ativos_lote'),
+    path('ativos/importar/', views.importar_ativos_csv, name='importar_ativos_csv'),
     path('ativos/<int:pk>/solicitar_resgate/', views.solicitar_resgate, name='solicitar_resgate'),
+    path('ativos/<int:pk>/projecao/', views.projetar_resgate, name='projetar_resgate'),
+    path('ativos/resgate/', views.solicitar_resgate_carteira, name='solicitar_resgate_carteira'),
+    path('ativos/projecao/', views.projetar_resgate_carteira, name='projetar_resgate_carteira'),
+    path('async/ativos/', views_async.listar_ativos, name='listar_ativos_async'),
+    path('async/ativos/<int:pk>/', views_async.consultar_ativo_por_id, name='consultar_ativo_por_id_async'),
+    path('async/ativos/criar/', views_async.criar_ativo, name='criar_ativo_async'),
+    path('async/ativos/atualizar/<int:pk>/', views_async.atualizar_ativo, name='atualizar_ativo_async'),
+    path('async/ativos/deletar/<int:pk>/', views_async.deletar_ativo, name='deletar_ativo_async'),
     path('checar-email/', checar_email, name='checar_email'),
+    path('indexadores/', views.listar_indexadores, name='listar_indexadores'),
+    path('indexadores/<str:nome>/', views.atualizar_indexador, name='atualizar_indexador'),
 ]
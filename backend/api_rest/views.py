@@ -1,15 +1,31 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from .models import Ativo, Usuario
-from .serializers import AtivoSerializer, UsuarioSerializer
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from .autenticacao import AUTENTICACAO_LEITURA
+from .models import Ativo, Indexador, Usuario, VersaoCarteira, cache_indexadores
+from .serializers import AtivoSerializer, IndexadorSerializer, UsuarioSerializer
+from .serializers import ativo_leitura, serializar_ativos, validar_atualizacoes_ativos, validar_novos_ativos
+from .paginacao import PaginacaoKeyset
+from .busca import buscar_por_nome
+from .exportacao import FORMATOS_EXPORTACAO, resposta_exportacao
+from .filtro_emails import filtro_emails
+from .fragmentos import colunas_fragmentos, fragmentos_ativos, resposta_fragmentos
+from .importacao import importar_ativos, ler_csv, linhas_csv_upload
+from .provisionamento import provisionar_usuarios
+from .resumo import resumir_carteira
+from .avaliacao import CAMPOS_AVALIACAO, PASSOS_SERIE, calcular_resgates, datas_da_serie, serie_resgates, serie_resgates_carteira
 from rest_framework import generics
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import CustomTokenObtainPairSerializer
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from decimal import Decimal, InvalidOperation
+import csv
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
@@ -38,46 +54,211 @@ User = get_user_model()
 @permission_classes([AllowAny])  # Permitido para não autenticados também
 def checar_email(request):
     email = request.GET.get('email', '').lower()
-    existe = User.objects.filter(email=email).exists()
+    # o filtro de Bloom descarta sem consulta os emails que com certeza não existem
+    existe = filtro_emails.pode_existir(email) and User.objects.filter(email=email).exists()
     return Response({'existe': existe})  
 
 
+# Chaves aceitas em ?ordering= e a coluna usada no banco
+ORDENACOES_ATIVO = {
+    'id': 'id',
+    'nome': 'nome',
+    'data_emissao': 'data_emissao',
+    'data_vencimento': 'data_vencimento',
+    'valor_investido': 'valor_investido_armazenado',
+    'rendimento_esperado': 'rendimento_esperado_armazenado',
+}
+
+# Filtros por valor exato, cobertos pelo índice (usuario, tipo, indexador)
+FILTROS_IGUALDADE_ATIVO = ['tipo', 'indexador']
+
+# Filtros de faixa (?<chave>_min= / ?<chave>_max=) resolvidos pelas colunas armazenadas
+FILTROS_FAIXA_ATIVO = {
+    'valor_investido': 'valor_investido_armazenado',
+    'rendimento_esperado': 'rendimento_esperado_armazenado',
+}
+
+
+def filtrar_faixas(ativos, params):
+    """
+    Aplica os filtros de faixa informados na query string.
+
+    Returns:
+        tuple: (queryset, mensagem de erro ou None)
+    """
+    for chave, campo in FILTROS_FAIXA_ATIVO.items():
+        for sufixo, lookup in (('_min', 'gte'), ('_max', 'lte')):
+            valor = params.get(chave + sufixo)
+            if valor is None:
+                continue
+            try:
+                valor = Decimal(valor)
+            except InvalidOperation:
+                valor = None
+            if valor is None or not valor.is_finite():
+                return ativos, f'Valor inválido para {chave + sufixo}.'
+            ativos = ativos.filter(**{f'{campo}__{lookup}': valor})
+    return ativos, None
+
+
+def ordenar_ativos(ativos, ordering):
+    """
+    Ordena pelo campo pedido em ?ordering= (prefixo '-' para decrescente), com id como desempate.
+
+    Returns:
+        tuple: (queryset, mensagem de erro ou None)
+    """
+    campo = ORDENACOES_ATIVO.get(ordering.lstrip('-'))
+    if campo is None:
+        opcoes = ', '.join(ORDENACOES_ATIVO)
+        return ativos, f'Ordenação inválida. Use uma de: {opcoes}.'
+    prefixo = '-' if ordering.startswith('-') else ''
+    return ativos.order_by(prefixo + campo, prefixo + 'id'), None
+
+
+def etag_carteira(request, *args, **kwargs):
+    """
+    ETag das respostas de ativos do usuário: muda quando a carteira muda e
+    quando alguma taxa de indexador muda (o rendimento depende delas).
+
+    Sem Last-Modified: a data tem precisão de segundos e não acompanha as
+    taxas, então If-Modified-Since poderia responder 304 a dados que mudaram.
+    """
+    versao, _ = VersaoCarteira.atual(request.user.pk)
+    return f'{request.user.pk}-{versao}-{cache_indexadores.versao()}'
+
+
+def filtrar_ativos(usuario, params):
+    """
+    Monta o queryset de ativos do usuário com os filtros e a ordenação da
+    query string, compartilhado pela listagem e pela exportação.
+
+    Returns:
+        tuple: (queryset, mensagem de erro ou None)
+    """
+    ativos = Ativo.objects.filter(usuario_id=usuario.pk)
+
+    nome = params.get('nome')
+    if nome:
+        ativos = buscar_por_nome(ativos, nome)
+
+    for campo in FILTROS_IGUALDADE_ATIVO:
+        valor = params.get(campo)
+        if valor:
+            ativos = ativos.filter(**{campo: valor})
+
+    ativos, erro = filtrar_faixas(ativos, params)
+    if erro:
+        return ativos, erro
+
+    ordering = params.get('ordering')
+    if ordering:
+        return ordenar_ativos(ativos, ordering)
+    return ativos, None
+
+
 @api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
 @permission_classes([IsAuthenticated])
+@condition(etag_func=etag_carteira)
 def listar_ativos(request):
-    nome = request.GET.get('nome')
-    ativos = Ativo.objects.filter(usuario=request.user)
+    """
+    Lista os ativos do usuário logado.
+    Query params opcionais: nome (resultados por similaridade), tipo, indexador,
+    ordering (ex.: -rendimento_esperado), valor_investido_min/max e rendimento_esperado_min/max.
 
-    if nome:
-        ativos = ativos.filter(nome__icontains=nome)
+    Com ?page_size= ou ?cursor= a resposta é paginada por cursor
+    ({'next', 'previous', 'results'}), na ordem de ?ordering= (padrão: id).
 
-    serializer = AtivoSerializer(ativos, many=True)
-    return Response(serializer.data)
+    Responde 304 a If-None-Match enquanto a carteira não
+    mudar, sem consultar os ativos. Em JSON, os itens saem do cache de
+    fragmentos por ativo e só os ausentes são serializados.
+    """
+    ativos, erro = filtrar_ativos(request.user, request.GET)
+    if erro:
+        return Response({'erro': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+    em_json = request.accepted_renderer.format == 'json'
+    colunas = colunas_fragmentos() if em_json else ativo_leitura().colunas
+
+    paginacao = PaginacaoKeyset()
+    if paginacao.deve_paginar(request):
+        chave = request.GET.get('ordering') or 'id'
+        campo = ORDENACOES_ATIVO[chave.lstrip('-')]
+        # a coluna da ordenação vem junto para montar o cursor
+        if campo not in colunas:
+            colunas = [*colunas, campo]
+        pagina = paginacao.paginate_queryset(
+            ativos.values(*colunas), request, campo=campo, decrescente=chave.startswith('-'),
+        )
+        if em_json:
+            envelope = {'next': paginacao.get_next_link(), 'previous': paginacao.get_previous_link()}
+            return resposta_fragmentos(fragmentos_ativos(pagina), envelope)
+        return paginacao.get_paginated_response(ativo_leitura().serializar(pagina))
+
+    if em_json:
+        return resposta_fragmentos(fragmentos_ativos(ativos.values(*colunas)))
+    return Response(serializar_ativos(ativos))
+
+
+@api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
+@permission_classes([IsAuthenticated])
+def exportar_ativos(request):
+    """
+    Exporta os ativos do usuário logado em streaming.
+    Query params: formato (csv ou ndjson, padrão csv) e os mesmos filtros e
+    ordenação de listar_ativos.
+    """
+    formato = request.GET.get('formato', 'csv')
+    if formato not in FORMATOS_EXPORTACAO:
+        opcoes = ', '.join(FORMATOS_EXPORTACAO)
+        return Response({'erro': f'Formato inválido. Use um de: {opcoes}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    ativos, erro = filtrar_ativos(request.user, request.GET)
+    if erro:
+        return Response({'erro': erro}, status=status.HTTP_400_BAD_REQUEST)
+    return resposta_exportacao(ativos, formato)
 
 
 @api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
 @permission_classes([IsAuthenticated])
+def resumo_ativos(request):
+    """
+    Retorna os totais da carteira do usuário logado (valor investido e rendimento
+    esperado), no geral e por tipo, tipo_juros, indexador e liquidez, calculados
+    no banco numa única consulta agregada.
+    """
+    resumo = resumir_carteira(Ativo.objects.filter(usuario_id=request.user.pk))
+    return Response(resumo)
+
+
+@api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
+@permission_classes([IsAuthenticated])
+@condition(etag_func=etag_carteira)
 def consultar_ativo_por_id(request, pk):
     """
     Retorna os dados de um ativo específico baseado no ID, somente se pertence ao usuário logado.
     """
-    ativo = get_object_or_404(Ativo, pk=pk, usuario=request.user)
+    ativo = get_object_or_404(Ativo, pk=pk, usuario_id=request.user.pk)
     serializer = AtivoSerializer(ativo)
     return Response(serializer.data)
 
 
 @api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
 @permission_classes([IsAuthenticated])
 def consultar_ativo_por_nome(request, nome):
     """
-    Retorna todos os ativos com o nome informado, do usuário logado.
+    Retorna todos os ativos com o nome informado, do usuário logado,
+    do mais para o menos parecido com o termo buscado.
     """
-    ativos = Ativo.objects.filter(nome__icontains=nome, usuario=request.user)
-    if not ativos.exists():
+    ativos = serializar_ativos(buscar_por_nome(Ativo.objects.filter(usuario_id=request.user.pk), nome))
+    if not ativos:
         return Response({'mensagem': 'Nenhum ativo encontrado com esse nome.'}, status=status.HTTP_404_NOT_FOUND)
-
-    serializer = AtivoSerializer(ativos, many=True)
-    return Response(serializer.data)
+    return Response(ativos)
 
 
 @api_view(['POST'])
@@ -122,7 +303,172 @@ def deletar_ativo(request, pk):
     return Response({'mensagem': 'Ativo deletado com sucesso.'}, status=status.HTTP_204_NO_CONTENT)
 
 
+# Máximo de itens aceitos por requisição nos endpoints em lote
+LIMITE_ITENS_LOTE = 5000
+# Provisionamento pela API: um hash PBKDF2 por usuário dentro da requisição.
+# Lotes maiores vão pelo comando provisionar_usuarios.
+LIMITE_USUARIOS_PROVISIONAMENTO = 100
+# Linhas por INSERT/UPDATE nas gravações em lote
+TAMANHO_LOTE_ESCRITA = 500
+
+
+def _validar_lista(dados, chave=None, limite=LIMITE_ITENS_LOTE):
+    """Extrai a lista do corpo da requisição; retorna (lista, mensagem de erro ou None)."""
+    itens = dados.get(chave) if chave and isinstance(dados, dict) else dados
+    if not isinstance(itens, list) or not itens:
+        return None, 'Envie uma lista não vazia.'
+    if len(itens) > limite:
+        return None, f'O lote pode ter no máximo {limite} itens.'
+    return itens, None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def criar_ativos_lote(request):
+    """
+    Cria vários ativos do usuário logado numa única transação.
+    Corpo: lista de ativos no formato de criar_ativo.
+    Se algum item for inválido nada é gravado e a resposta lista os erros por índice.
+    """
+    itens, erro = _validar_lista(request.data)
+    if erro:
+        return Response({'erro': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+    ativos, erros = validar_novos_ativos(itens, request.user)
+    if erros:
+        return Response({'erros': erros}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        ativos = Ativo.objects.bulk_create(ativos, batch_size=TAMANHO_LOTE_ESCRITA)
+
+    serializer = AtivoSerializer(ativos, many=True)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+# Erros devolvidos na resposta da importação; o comando importar_ativos grava todos
+LIMITE_ERROS_IMPORTACAO = 1000
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def importar_ativos_csv(request):
+    """
+    Importa ativos para o usuário logado a partir de um CSV enviado em 'arquivo'
+    (multipart), no formato da exportação. O arquivo é lido e gravado em blocos;
+    linhas inválidas são ignoradas e listadas na resposta com o número da linha.
+    Tudo numa transação: se o arquivo não puder ser lido até o fim, nada é
+    importado e o cliente pode reenviá-lo.
+    """
+    arquivo = request.FILES.get('arquivo')
+    if arquivo is None:
+        return Response({'erro': "Envie o arquivo CSV no campo 'arquivo'."}, status=status.HTTP_400_BAD_REQUEST)
+
+    erros = []
+
+    def ao_rejeitar(linha, erros_linha):
+        if len(erros) < LIMITE_ERROS_IMPORTACAO:
+            erros.append({'linha': linha, 'erros': erros_linha})
+
+    try:
+        with transaction.atomic():
+            importados, rejeitados = importar_ativos(
+                ler_csv(linhas_csv_upload(arquivo)), request.user, ao_rejeitar=ao_rejeitar
+            )
+    except (UnicodeDecodeError, csv.Error) as exc:
+        return Response({'erro': f'Arquivo CSV inválido: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'importados': importados,
+        'rejeitados': rejeitados,
+        'erros': erros,
+        'erros_omitidos': rejeitados - len(erros),
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def provisionar_usuarios_lote(request):
+    """
+    Cria vários usuários de uma vez (onboarding de uma organização), com
+    ativos iniciais opcionais. No máximo LIMITE_USUARIOS_PROVISIONAMENTO por
+    requisição, gravados numa transação só; as senhas são hasheadas no próprio
+    processo (PROVISIONAMENTO_PROCESSOS). Para organizações maiores use o
+    comando provisionar_usuarios, que hasheia em paralelo.
+    Corpo: lista de {'email', 'nome', 'password'?, 'ativos'?: [...]}.
+    Itens inválidos são rejeitados sem impedir os demais.
+    """
+    itens, erro = _validar_lista(request.data, limite=LIMITE_USUARIOS_PROVISIONAMENTO)
+    if erro:
+        return Response({'erro': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+    rejeitados = []
+    usuarios, ativos, _ = provisionar_usuarios(
+        ((indice, item if isinstance(item, dict) else None) for indice, item in enumerate(itens)),
+        processos=getattr(settings, 'PROVISIONAMENTO_PROCESSOS', 1),
+        ao_rejeitar=lambda indice, erros: rejeitados.append({'indice': indice, 'erros': erros}),
+    )
+    return Response(
+        {'usuarios': usuarios, 'ativos': ativos, 'rejeitados': rejeitados},
+        status=status.HTTP_201_CREATED if usuarios else status.HTTP_400_BAD_REQUEST,
+    )
+
+
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def atualizar_ativos_lote(request):
+    """
+    Atualiza parcialmente vários ativos do usuário logado numa única transação.
+    Corpo: lista de objetos com 'id' e os campos a alterar.
+    Se algum item for inválido nada é gravado e a resposta lista os erros por índice.
+    """
+    itens, erro = _validar_lista(request.data)
+    if erro:
+        return Response({'erro': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+    ids = [item.get('id') for item in itens if isinstance(item, dict)]
+    with transaction.atomic():
+        existentes = (
+            Ativo.objects.select_for_update()
+            .filter(usuario=request.user, pk__in=[i for i in ids if isinstance(i, int)])
+            .in_bulk()
+        )
+        ativos, campos, erros = validar_atualizacoes_ativos(itens, existentes)
+        if erros:
+            return Response({'erros': erros}, status=status.HTTP_400_BAD_REQUEST)
+        if campos:
+            Ativo.objects.bulk_update(ativos, sorted(campos), batch_size=TAMANHO_LOTE_ESCRITA)
+
+    serializer = AtivoSerializer(ativos, many=True)
+    return Response(serializer.data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def deletar_ativos_lote(request):
+    """
+    Remove vários ativos do usuário logado.
+    Corpo: {"ids": [1, 2, ...]}. Ids de outros usuários são ignorados.
+    """
+    ids, erro = _validar_lista(request.data, chave='ids')
+    if erro:
+        return Response({'erro': erro}, status=status.HTTP_400_BAD_REQUEST)
+    if not all(isinstance(i, int) for i in ids):
+        return Response({'erro': 'Os ids devem ser números inteiros.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        encontrados = set(
+            Ativo.objects.filter(usuario=request.user, pk__in=ids).values_list('pk', flat=True)
+        )
+        Ativo.objects.filter(usuario=request.user, pk__in=encontrados).delete()
+
+    return Response({
+        'deletados': len(encontrados),
+        'nao_encontrados': [i for i in dict.fromkeys(ids) if i not in encontrados],
+    })
+
+
 @api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
 @permission_classes([IsAuthenticated])
 def solicitar_resgate(request, pk):
     """
@@ -131,7 +477,7 @@ def solicitar_resgate(request, pk):
     """
     from datetime import date
 
-    ativo = get_object_or_404(Ativo, pk=pk, usuario=request.user)
+    ativo = get_object_or_404(Ativo, pk=pk, usuario_id=request.user.pk)
 
     data_resgate_str = request.GET.get('data_resgate')
     try:
@@ -148,3 +494,166 @@ def solicitar_resgate(request, pk):
 
     return Response(resultado)
 
+
+
+@api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
+@permission_classes([IsAuthenticated])
+def solicitar_resgate_carteira(request):
+    """
+    Calcula o resgate de todos os ativos do usuário logado numa data, de uma vez.
+    Query param opcional: data_resgate=YYYY-MM-DD (padrão: hoje)
+
+    Retorna os totais, o resgate de cada ativo e os ativos que não podem ser
+    resgatados nessa data, com o motivo.
+    """
+    from datetime import date
+
+    data_resgate_str = request.GET.get('data_resgate')
+    try:
+        data_resgate = date.fromisoformat(data_resgate_str) if data_resgate_str else date.today()
+    except ValueError:
+        return Response({'erro': 'Data de resgate inválida. Use o formato YYYY-MM-DD.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    ativos = list(
+        Ativo.objects.filter(usuario_id=request.user.pk).order_by('id').values('id', 'nome', *CAMPOS_AVALIACAO)
+    )
+    resgates = calcular_resgates(ativos, data_resgate)
+
+    itens, nao_resgataveis = [], []
+    valor_investido = valor_acumulado = Decimal('0.00')
+    for ativo, resgate in zip(ativos, resgates):
+        if resgate is None:
+            if ativo['liquidez'] != 'diaria':
+                motivo = 'O ativo só pode ser resgatado no vencimento.'
+            elif data_resgate < ativo['data_emissao']:
+                motivo = 'A data de resgate é anterior à emissão.'
+            else:
+                motivo = 'Dados insuficientes para calcular o resgate.'
+            nao_resgataveis.append({'id': ativo['id'], 'nome': ativo['nome'], 'motivo': motivo})
+            continue
+
+        itens.append({'id': ativo['id'], 'nome': ativo['nome'], **resgate})
+        valor_investido += resgate['valor_acumulado'] - resgate['rendimento']
+        valor_acumulado += resgate['valor_acumulado']
+
+    return Response({
+        'data_resgate': data_resgate,
+        'valor_investido': valor_investido,
+        'valor_acumulado': valor_acumulado,
+        'rendimento': valor_acumulado - valor_investido,
+        'ativos': itens,
+        'nao_resgataveis': nao_resgataveis,
+    })
+
+
+# Pontos aceitos numa série de projeção (10 anos de passo diário)
+LIMITE_PONTOS_PROJECAO = 3660
+
+
+def _datas_projecao(params, fim_padrao):
+    """
+    Lê inicio, fim e passo da query string e gera as datas da série. Sem passo,
+    usa o menor (dia, semana, mes) cuja série cabe em LIMITE_PONTOS_PROJECAO;
+    um passo informado que passe do limite é erro.
+
+    Returns:
+        tuple: (datas, mensagem de erro ou None)
+    """
+    from datetime import date
+
+    try:
+        inicio = date.fromisoformat(params['inicio']) if params.get('inicio') else date.today()
+        fim = date.fromisoformat(params['fim']) if params.get('fim') else max(inicio, fim_padrao or inicio)
+    except ValueError:
+        return None, 'Datas inválidas. Use o formato YYYY-MM-DD.'
+    if fim < inicio:
+        return None, 'A data final deve ser igual ou posterior à inicial.'
+
+    passo = params.get('passo')
+    if passo is not None and passo not in PASSOS_SERIE:
+        return None, f"Passo inválido. Use um de: {', '.join(PASSOS_SERIE)}."
+
+    for candidato in [passo] if passo else PASSOS_SERIE:
+        try:
+            return datas_da_serie(inicio, fim, candidato, limite=LIMITE_PONTOS_PROJECAO), None
+        except ValueError as exc:
+            erro = str(exc)
+    return None, erro
+
+
+@api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
+@permission_classes([IsAuthenticated])
+def projetar_resgate(request, pk):
+    """
+    Série de calcular_resgate de um ativo do usuário logado.
+    Query params: inicio (padrão: hoje), fim (padrão: vencimento) e passo
+    (dia, semana ou mes; padrão: o menor que caiba no limite de pontos).
+    Datas antes da emissão vêm com valores nulos.
+    """
+    ativo = get_object_or_404(Ativo, pk=pk, usuario_id=request.user.pk)
+
+    datas, erro = _datas_projecao(request.GET, ativo.data_vencimento)
+    if erro:
+        return Response({'erro': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+    serie = serie_resgates([ativo], datas)[0]
+    if all(resgate is None for resgate in serie):
+        return Response({'erro': 'Não foi possível calcular o resgate. Verifique os dados do ativo.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    vazio = {'valor_acumulado': None, 'dias_corridos': None, 'rendimento': None}
+    return Response({
+        'ativo': ativo.pk,
+        'serie': [{'data': data, **(resgate or vazio)} for data, resgate in zip(datas, serie)],
+    })
+
+
+@api_view(['GET'])
+@authentication_classes(AUTENTICACAO_LEITURA)
+@permission_classes([IsAuthenticated])
+def projetar_resgate_carteira(request):
+    """
+    Série do valor de resgate da carteira do usuário logado: em cada data, a soma
+    de calcular_resgate dos ativos de liquidez diária já emitidos.
+    Query params: inicio (padrão: hoje), fim (padrão: último vencimento) e passo.
+    """
+    ativos = list(
+        Ativo.objects.filter(usuario_id=request.user.pk, liquidez='diaria').values(*CAMPOS_AVALIACAO)
+    )
+    ultimo_vencimento = max((a['data_vencimento'] for a in ativos), default=None)
+
+    datas, erro = _datas_projecao(request.GET, ultimo_vencimento)
+    if erro:
+        return Response({'erro': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'serie': serie_resgates_carteira(ativos, datas)})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def listar_indexadores(request):
+    """
+    Retorna as taxas vigentes dos indexadores.
+    """
+    indexadores = Indexador.objects.order_by('nome')
+    serializer = IndexadorSerializer(indexadores, many=True)
+    return Response(serializer.data)
+
+
+@api_view(['PUT', 'PATCH'])
+@permission_classes([IsAdminUser])
+def atualizar_indexador(request, nome):
+    """
+    Atualiza a taxa de um indexador (somente administradores).
+    Os ativos que usam o indexador são revalorizados na mesma transação.
+    """
+    indexador = get_object_or_404(Indexador, nome=nome.upper())
+
+    serializer = IndexadorSerializer(indexador, data=request.data, partial=request.method == 'PATCH')
+    if serializer.is_valid():
+        serializer.save()
+        return Response(serializer.data)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,193 @@
+"""
+Versões assíncronas (ASGI) dos endpoints de ativos.
+
+Sob ASGI as views síncronas de ``views.py`` ocupam uma thread do pool do
+Django durante toda a requisição. Estas views usam o ORM assíncrono
+(``aget``, iteração com ``async for``, ``asave``, ``adelete``) e mandam o
+trabalho de CPU (validação, avaliação do rendimento, montagem do JSON) para
+threads auxiliares, deixando o loop livre para outras requisições.
+
+O DRF não tem views assíncronas, então aqui não há ``@api_view``: a
+autenticação é só por JWT (``JWTSemConsulta``, como nas leituras síncronas),
+o corpo é sempre JSON e a resposta é renderizada pelo ``JSONRenderer`` do DRF,
+no mesmo formato das views síncronas. A listagem não pagina; para páginas use
+``listar_ativos``.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+
+from .autenticacao import JWTSemConsulta
+from .fragmentos import colunas_fragmentos, fragmentos_ativos, lista_json
+from .models import Ativo, cache_indexadores
+from .serializers import AtivoSerializer
+from .views import filtrar_ativos
+
+
+async def fora_do_loop(funcao, *args):
+    """
+    Executa o trabalho de CPU ``funcao(*args)`` numa thread auxiliar, fora do
+    loop e sem disputar a thread das consultas. As taxas dos indexadores são
+    carregadas antes, se preciso, na thread do ORM, para que a avaliação não
+    abra conexões nas threads auxiliares.
+    """
+    await sync_to_async(cache_indexadores.taxas)()
+    return await sync_to_async(funcao, thread_sensitive=False)(*args)
+
+
+def _resposta(dados, status_http=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(dados), content_type=JSONRenderer.media_type, status=status_http)
+
+
+def _sem_csrf(view):
+    # autenticação por cabeçalho, sem cookies; o csrf_exempt do Django 4.2 não aceita corrotinas
+    view.csrf_exempt = True
+    return view
+
+
+async def _autenticar(request):
+    """Usuário do token ou uma resposta 401."""
+    autenticador = JWTSemConsulta()
+    try:
+        resultado = await sync_to_async(autenticador.authenticate)(request)
+    except exceptions.AuthenticationFailed as exc:
+        detalhe = exc.detail
+    else:
+        if resultado is not None:
+            return resultado[0], None
+        detalhe = exceptions.NotAuthenticated.default_detail
+
+    resposta = _resposta(
+        detalhe if isinstance(detalhe, dict) else {'detail': detalhe}, status.HTTP_401_UNAUTHORIZED
+    )
+    resposta['WWW-Authenticate'] = autenticador.authenticate_header(request)
+    return None, resposta
+
+
+def _metodo_invalido(request, permitidos):
+    if request.method in permitidos:
+        return None
+    return _resposta(
+        {'detail': exceptions.MethodNotAllowed(request.method).detail},
+        status.HTTP_405_METHOD_NOT_ALLOWED,
+    )
+
+
+def _corpo_json(request):
+    try:
+        return json.loads(request.body or b'{}'), None
+    except ValueError:
+        return None, _resposta({'detail': 'JSON inválido.'}, status.HTTP_400_BAD_REQUEST)
+
+
+async def _ativo_do_usuario(pk, usuario):
+    try:
+        return await Ativo.objects.filter(usuario_id=usuario.pk).aget(pk=pk), None
+    except Ativo.DoesNotExist:
+        return None, _resposta({'detail': 'No Ativo matches the given query.'}, status.HTTP_404_NOT_FOUND)
+
+
+def _serializar(ativo):
+    return AtivoSerializer(ativo).data
+
+
+async def listar_ativos(request):
+    """Assíncrona de ``views.listar_ativos``, com os mesmos filtros e ordenação."""
+    erro = _metodo_invalido(request, ('GET',))
+    if erro:
+        return erro
+    usuario, erro = await _autenticar(request)
+    if erro:
+        return erro
+
+    ativos, mensagem = filtrar_ativos(usuario, request.GET)
+    if mensagem:
+        return _resposta({'erro': mensagem}, status.HTTP_400_BAD_REQUEST)
+
+    linhas = [linha async for linha in ativos.values(*colunas_fragmentos())]
+    corpo = await fora_do_loop(lambda: lista_json(fragmentos_ativos(linhas)))
+    return HttpResponse(corpo, content_type=JSONRenderer.media_type)
+
+
+async def consultar_ativo_por_id(request, pk):
+    """Assíncrona de ``views.consultar_ativo_por_id``."""
+    erro = _metodo_invalido(request, ('GET',))
+    if erro:
+        return erro
+    usuario, erro = await _autenticar(request)
+    if erro:
+        return erro
+
+    ativo, erro = await _ativo_do_usuario(pk, usuario)
+    if erro:
+        return erro
+    return _resposta(await fora_do_loop(_serializar, ativo))
+
+
+@_sem_csrf
+async def criar_ativo(request):
+    """Assíncrona de ``views.criar_ativo``."""
+    erro = _metodo_invalido(request, ('POST',))
+    if erro:
+        return erro
+    usuario, erro = await _autenticar(request)
+    if erro:
+        return erro
+    dados, erro = _corpo_json(request)
+    if erro:
+        return erro
+
+    serializer = AtivoSerializer(data=dados)
+    if not await fora_do_loop(serializer.is_valid):
+        return _resposta(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    ativo = Ativo(usuario_id=usuario.pk, **serializer.validated_data)
+    await ativo.asave()
+    return _resposta(await fora_do_loop(_serializar, ativo), status.HTTP_201_CREATED)
+
+
+@_sem_csrf
+async def atualizar_ativo(request, pk):
+    """Assíncrona de ``views.atualizar_ativo`` (PUT completo, PATCH parcial)."""
+    erro = _metodo_invalido(request, ('PUT', 'PATCH'))
+    if erro:
+        return erro
+    usuario, erro = await _autenticar(request)
+    if erro:
+        return erro
+    dados, erro = _corpo_json(request)
+    if erro:
+        return erro
+    ativo, erro = await _ativo_do_usuario(pk, usuario)
+    if erro:
+        return erro
+
+    serializer = AtivoSerializer(ativo, data=dados, partial=request.method == 'PATCH')
+    if not await fora_do_loop(serializer.is_valid):
+        return _resposta(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    for campo, valor in serializer.validated_data.items():
+        setattr(ativo, campo, valor)
+    await ativo.asave()
+    return _resposta(await fora_do_loop(_serializar, ativo))
+
+
+@_sem_csrf
+async def deletar_ativo(request, pk):
+    """Assíncrona de ``views.deletar_ativo``."""
+    erro = _metodo_invalido(request, ('DELETE',))
+    if erro:
+        return erro
+    usuario, erro = await _autenticar(request)
+    if erro:
+        return erro
+    ativo, erro = await _ativo_do_usuario(pk, usuario)
+    if erro:
+        return erro
+
+    await ativo.adelete()
+    return _resposta({'mensagem': 'Ativo deletado com sucesso.'}, status.HTTP_204_NO_CONTENT)
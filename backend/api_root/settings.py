@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # primeiro, para medir a requisição inteira (api_rest/metricas.py)
+    "api_rest.metricas.metricas_middleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -95,6 +97,41 @@ else:
         )
     }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+#
+# "fragmentos" guarda o JSON já serializado de cada ativo (api_rest/fragmentos.py).
+# As chaves mudam a cada gravação, então as entradas não expiram por tempo: as
+# antigas saem por LRU ao atingir FRAGMENTOS_CACHE_MAX. Com FRAGMENTOS_CACHE_DIR
+# o cache vai para disco e é compartilhado entre os processos do servidor.
+
+FRAGMENTOS_CACHE_OPCOES = {
+    'TIMEOUT': None,
+    'OPTIONS': {
+        'MAX_ENTRIES': int(os.environ.get('FRAGMENTOS_CACHE_MAX', 50_000)),
+        'CULL_FREQUENCY': 10,
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragmentos': (
+        {
+            'BACKEND': 'api_rest.cache.CacheArquivoLRU',
+            'LOCATION': os.environ['FRAGMENTOS_CACHE_DIR'],
+            **FRAGMENTOS_CACHE_OPCOES,
+        }
+        if os.environ.get('FRAGMENTOS_CACHE_DIR')
+        else {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'fragmentos',
+            **FRAGMENTOS_CACHE_OPCOES,
+        }
+    ),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -168,8 +205,22 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=120),  
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),   
+    'TOKEN_USER_CLASS': 'api_rest.autenticacao.UsuarioToken',
 }
 
+# Por quanto tempo a autenticação sem consulta (api_rest/autenticacao.py) confia
+# no is_active guardado em cache antes de consultar o usuário de novo
+USUARIO_ATIVO_CACHE_SEGUNDOS = 30
+
+# Processos para o hash das senhas em POST usuarios/lote/. 1 = no próprio worker
+# web, sem criar processos por requisição; o comando provisionar_usuarios usa
+# todos os núcleos (--processos)
+PROVISIONAMENTO_PROCESSOS = 1
+
+# Se definido, GET /metrics exige "Authorization: Bearer <METRICAS_TOKEN>".
+# Com DEBUG desligado o endpoint só responde se o token estiver definido
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+
 AUTH_USER_MODEL = 'api_rest.Usuario'
 
 
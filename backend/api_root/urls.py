@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
+from api_rest.metricas import exportar_metricas
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -9,4 +10,5 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path('api/', include('api_rest.urls'), name='api_rest_urls'), 
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),  
+    path('metrics', exportar_metricas, name='metricas'),
 ]
\ No newline at end of file